@@ -0,0 +1,113 @@
+import os
+import pygame
+
+
+
+# Decoded images, keyed by (file name, converted), and sounds, keyed by file name
+images = {}
+sounds = {}
+
+# Rotated and scaled images, keyed by (file name, angle bucket, scale)
+rotated_images = {}
+
+# Angular resolution of rotated images [deg], set from the config file
+angle_resolution = 1.0
+
+def get_image(filename, convert=True):
+    """
+    Function to get an image from the img folder, the file is only read from disk and decoded on first use
+
+    Arguments:
+        filename : string - File name of the image in the img folder
+        convert : bool - Whether or not to convert the pixel format to the display format (with alpha channel) for performance improvements
+
+    Return values:
+        img : pygame.Surface - Shared image surface
+
+    Comments:
+        - The surface is shared by all callers and must not be drawn on, callers that modify it have to copy it first
+        - Converting requires the display mode to be set, images needed before that (window icon) are loaded without conversion
+    """
+
+    key = (filename, convert)
+
+    # Read and decode the image only if it is not cached yet
+    if key not in images:
+        img = pygame.image.load(os.path.join('img', filename))
+        if convert:
+            img = img.convert_alpha()
+        images[key] = img
+
+    return images[key]
+
+def get_rotated_image(filename, angle, scale):
+    """
+    Function to get a rotated and scaled version of an image from the img folder, every version is only rendered on first use
+
+    Arguments:
+        filename : string - File name of the image in the img folder
+        angle : float - Rotation angle counterclockwise [deg]
+        scale : float - Scaling factor of the image
+
+    Return values:
+        img : pygame.Surface - Shared rotated and scaled image surface
+
+    Comments:
+        - The angle is rounded to the angular resolution, so there is a limited number of versions per image and scale
+        - The surface is shared by all callers and must not be drawn on
+    """
+
+    # Round angle to the closest multiple of the angular resolution, wrapped to one full turn
+    n_buckets = max(1, round(360 / angle_resolution))
+    bucket = round(angle * n_buckets / 360) % n_buckets
+    key = (filename, bucket, scale)
+
+    # Render this version only if it is not cached yet
+    if key not in rotated_images:
+        rotated_images[key] = pygame.transform.rotozoom(get_image(filename), 360 * bucket / n_buckets, scale)
+
+    return rotated_images[key]
+
+def get_sound(filename):
+    """
+    Function to get a sound from the snd folder, the file is only read from disk and decoded on first use
+
+    Arguments:
+        filename : string - File name of the sound in the snd folder
+
+    Return values:
+        sound : pygame.mixer.Sound - Shared sound
+
+    Comments:
+        - The sound is shared by all callers, so changing its volume affects all of them
+    """
+
+    # Read and decode the sound only if it is not cached yet
+    if filename not in sounds:
+        sounds[filename] = pygame.mixer.Sound(os.path.join('snd', filename))
+
+    return sounds[filename]
+
+def preload(image_files=None, sound_files=None):
+    """
+    Function to load images and sounds into the cache ahead of time, so that no file is read from disk while the game is running
+
+    Arguments:
+        image_files : [string] - File names of the images to load, all files in the img folder if not given
+        sound_files : [string] - File names of the sounds to load, all files in the snd folder if not given
+
+    Comments:
+        - Requires the display mode to be set, since images are converted to the display format
+    """
+
+    # Default to all files of the asset folders
+    if image_files is None:
+        image_files = os.listdir('img')
+    if sound_files is None:
+        sound_files = os.listdir('snd')
+
+    for filename in image_files:
+        get_image(filename)
+
+    for filename in sound_files:
+        get_sound(filename)
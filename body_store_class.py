@@ -0,0 +1,208 @@
+import math
+import numpy
+
+import orbit_functions
+import kepler_functions
+
+
+
+class BodyStore:
+
+    # Names of all per-orbiter arrays
+    arrays = ['pos', 'vel', 'acc', 'type', 'epoch_pos', 'epoch_vel', 'epoch_time', 'a', 'ecc', 'r_periapsis', 'r_apoapsis', 'period', 'elements_valid']
+
+    def __init__(self, capacity=16):
+        """
+        Body store class constructor, keeps the state vectors of orbiters in contiguous arrays (one row per orbiter)
+
+        Arguments:
+            capacity : int - Number of rows to allocate initially, the store grows automatically if more orbiters are added
+        """
+
+        # Set number of rows currently in use
+        self.n = 0
+
+        # Allocate position, velocity and acceleration arrays (one [x, y] row per orbiter) and the type code array
+        self.pos = numpy.zeros((capacity, 2))
+        self.vel = numpy.zeros((capacity, 2))
+        self.acc = numpy.zeros((capacity, 2))
+        self.type = numpy.zeros(capacity, dtype=int)
+
+        # Allocate arrays of the epoch states that coasting orbiters are propagated from analytically
+        # Epoch positions are relative to the main body, an epoch time of NaN means that no epoch has been set yet
+        self.epoch_pos = numpy.zeros((capacity, 2))
+        self.epoch_vel = numpy.zeros((capacity, 2))
+        self.epoch_time = numpy.full(capacity, numpy.nan)
+
+        # Allocate arrays of the cached orbital elements, only recalculated for rows that are not flagged valid
+        self.a = numpy.zeros(capacity)
+        self.ecc = numpy.zeros((capacity, 2))
+        self.r_periapsis = numpy.zeros(capacity)
+        self.r_apoapsis = numpy.zeros(capacity)
+        self.period = numpy.zeros(capacity)
+        self.elements_valid = numpy.zeros(capacity, dtype=bool)
+
+        # List of the orbiter objects owning each row, same order as the arrays
+        self.bodies = []
+
+    def grow(self):
+        """
+        Method to double the number of allocated rows of all arrays
+        """
+
+        # Determine new capacity, at least one row
+        capacity = max(1, 2 * len(self.type))
+
+        # Copy used rows into larger arrays
+        for name in self.arrays:
+            old = getattr(self, name)
+            new = numpy.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def add(self, body, pos, vel, acc=0):
+        """
+        Method to add an orbiter to the store and bind the orbiter to its new row
+
+        Arguments:
+            body : Orbiter instance - Orbiter to be added
+            pos : [float, float] - Position vector of the orbiter [m]
+            vel : [float, float] - Velocity vector of the orbiter [m/s]
+            acc : [float, float] - Acceleration vector of the orbiter [m/s^2]
+        """
+
+        # Allocate more rows if the store is full
+        if self.n == len(self.type):
+            self.grow()
+
+        # Write state vectors and type code into the next free row (copies the values, pos/vel may be views into another store)
+        i = self.n
+        self.pos[i] = pos
+        self.vel[i] = vel
+        self.acc[i] = acc
+        self.type[i] = body.type
+        self.epoch_time[i] = numpy.nan
+        self.elements_valid[i] = False
+        self.bodies.append(body)
+        self.n += 1
+
+        # Bind orbiter to its row
+        body.store = self
+        body.index = i
+
+    def remove(self, body):
+        """
+        Method to remove an orbiter from the store
+
+        Arguments:
+            body : Orbiter instance - Orbiter to be removed
+
+        Comments:
+            - The last row is moved into the freed row to keep the arrays contiguous
+            - The removed orbiter keeps its last state in a private single-row store, so that remaining references to it stay valid
+        """
+
+        # Save state of the removed orbiter
+        i = body.index
+        pos = self.pos[i].copy()
+        vel = self.vel[i].copy()
+        acc = self.acc[i].copy()
+
+        # Move last row into the freed row and rebind the orbiter owning the last row
+        last = self.n - 1
+        if i != last:
+            for name in self.arrays:
+                getattr(self, name)[i] = getattr(self, name)[last]
+            self.bodies[i] = self.bodies[last]
+            self.bodies[i].index = i
+
+        self.bodies.pop()
+        self.n -= 1
+
+        # Detach removed orbiter into its own store
+        BodyStore(1).add(body, pos, vel, acc)
+
+    def rebase(self, rows, mb_pos, t):
+        """
+        Method to set the epoch states of orbiters to their current state vectors
+
+        Arguments:
+            rows : numpy.ndarray - Indices of the rows to rebase
+            mb_pos : [float, float] - Main body position vector [m]
+            t : float - Current simulation time [s]
+
+        Comments:
+            - Needs to be called whenever the orbit of an orbiter is changed by anything else than gravity, for example thrust
+            - Invalidates the cached orbital elements of the rows
+        """
+
+        self.epoch_pos[rows] = self.pos[rows] - mb_pos
+        self.epoch_vel[rows] = self.vel[rows]
+        self.epoch_time[rows] = t
+        self.elements_valid[rows] = False
+
+    def elements(self, gm, mb_pos):
+        """
+        Method to get the orbital elements of all orbiters, only recalculated for orbiters whose orbit has changed since the last call
+
+        Arguments:
+            gm : float - Gravitational parameter
+            mb_pos : [float, float] - Main body position vector [m]
+
+        Return values:
+            a : numpy.ndarray (N,) - Semi-major axes [m], negative for hyperbolic orbits
+            ecc : numpy.ndarray (N,2) - Eccentricity vectors, pointing from the main body towards the periapsis
+            r_periapsis : numpy.ndarray (N,) - Distances of the periapsis from the main body [m]
+            r_apoapsis : numpy.ndarray (N,) - Distances of the apoapsis from the main body [m], infinite for escape trajectories
+            period : numpy.ndarray (N,) - Orbital periods [s], infinite for escape trajectories
+
+        Comments:
+            - The orbit of a coasting orbiter does not change, so its elements are only calculated once after it was added or rebased
+            - The returned arrays are views into the store and must not be modified
+        """
+
+        n = self.n
+
+        # Recalculate the elements of all rows whose cache is not valid from their current state vectors
+        rows = numpy.flatnonzero(~self.elements_valid[:n])
+        if len(rows):
+            a, ecc, r_periapsis, r_apoapsis = orbit_functions.orbit_params_array(gm, mb_pos, self.pos[rows], self.vel[rows])
+            self.a[rows] = a
+            self.ecc[rows] = ecc
+            self.r_periapsis[rows] = r_periapsis
+            self.r_apoapsis[rows] = r_apoapsis
+            self.period[rows] = numpy.where(a > 0, 2 * math.pi * numpy.sqrt(numpy.abs(a)**3 / gm), numpy.inf)
+            self.elements_valid[rows] = True
+
+        return self.a[:n], self.ecc[:n], self.r_periapsis[:n], self.r_apoapsis[:n], self.period[:n]
+
+    def step(self, gm, mb_pos, t, dt, rows=None):
+        """
+        Method to advance the state vectors of coasting orbiters in one batched step using analytic Kepler propagation
+
+        Arguments:
+            gm : float - Gravitational parameter
+            mb_pos : [float, float] - Main body position vector [m]
+            t : float - Simulation time at the start of the step [s]
+            dt : float - Time increment of the step [s]
+            rows : numpy.ndarray - Indices of the rows to advance, all rows if None
+
+        Comments:
+            The state vectors are evaluated from the epoch states, so the result is exact and the cost does not depend on dt
+        """
+
+        # Select all rows if not specified otherwise
+        if rows is None:
+            rows = numpy.arange(self.n)
+
+        # Orbiters that were added since the last step start coasting from their current state
+        new_rows = rows[numpy.isnan(self.epoch_time[rows])]
+        self.rebase(new_rows, mb_pos, t)
+
+        # Evaluate the orbits at the end of the step
+        pos, vel = kepler_functions.propagate(gm, self.epoch_pos[rows], self.epoch_vel[rows], t + dt - self.epoch_time[rows])
+        self.pos[rows] = pos + mb_pos
+        self.vel[rows] = vel
+
+        # Update acceleration vectors to the new positions
+        self.acc[rows] = orbit_functions.get_grav_acc_array(gm, mb_pos, self.pos[rows])
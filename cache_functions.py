@@ -0,0 +1,114 @@
+import os
+import hashlib
+import pygame
+
+
+
+# Folder that generated textures are cached in
+folder = 'cache'
+
+# Maximum total size of the cached textures [byte], set from the config file (0 disables the cache)
+max_size = 200e6
+
+# Version of the texture generation, part of every cache key so that textures of older versions are not reused
+version = 4
+
+def cache_path(params):
+    """
+    Function to find the file path of a cached texture
+
+    Arguments:
+        params : list - Kind of the texture and all parameters (including the seed) that the texture is generated from
+
+    Return values:
+        path : string - Path of the cache file of the texture
+    """
+
+    # Name the file after a hash of the parameters
+    key = hashlib.sha1(repr([version] + list(params)).encode()).hexdigest()
+    return os.path.join(folder, str(params[0]) + '_' + key + '.png')
+
+def load(params):
+    """
+    Function to load a texture from the cache
+
+    Arguments:
+        params : list - Kind of the texture and all parameters (including the seed) that the texture is generated from
+
+    Return values:
+        surface : pygame.Surface - Cached texture, None if the texture is not cached
+
+    Comments:
+        - Loading a texture marks it as recently used, so it is evicted last
+    """
+
+    path = cache_path(params)
+    if max_size <= 0 or not os.path.isfile(path):
+        return None
+
+    # Read texture and update its modification time, which is used as the time of last use
+    try:
+        surface = pygame.image.load(path)
+        os.utime(path)
+    except (pygame.error, OSError):
+        return None
+
+    return surface
+
+def save(params, surface):
+    """
+    Function to save a texture to the cache and evict the least recently used textures if the cache is too large
+
+    Arguments:
+        params : list - Kind of the texture and all parameters (including the seed) that the texture is generated from
+        surface : pygame.Surface - Texture to be cached
+
+    Comments:
+        - Textures are saved as PNG, which is lossless and keeps the alpha channel
+        - The cache is only an optimization, textures that can not be saved (for example in a read-only folder) are silently skipped
+    """
+
+    if max_size <= 0:
+        return
+
+    path = cache_path(params)
+    try:
+        # Write to a temporary file first, so that an interrupted write never leaves a broken texture in the cache
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = path[:-len('.png')] + '.tmp.png'
+        pygame.image.save(surface, tmp_path)
+        os.replace(tmp_path, path)
+
+        # Evict least recently used textures until the cache fits its maximum size again, the new texture is kept in any case
+        files = [os.path.join(folder, filename) for filename in os.listdir(folder) if filename.endswith('.png')]
+        files.sort(key=os.path.getmtime)
+        total_size = sum(os.path.getsize(file) for file in files)
+        for file in files:
+            if total_size <= max_size or file == path:
+                break
+            total_size = total_size - os.path.getsize(file)
+            os.remove(file)
+    except (pygame.error, OSError):
+        pass
+
+def get_texture(params, generate):
+    """
+    Function to get a texture from the cache, or generate and cache it if it is not cached yet
+
+    Arguments:
+        params : list - Kind of the texture and all parameters (including the seed) that the texture is generated from
+        generate : function - Function without arguments that generates the texture
+
+    Return values:
+        surface : pygame.Surface - Cached or generated texture
+
+    Comments:
+        - The texture has to be fully determined by the parameters, otherwise a different texture may be returned from the cache
+    """
+
+    surface = load(params)
+    if surface is None:
+        surface = generate()
+        save(params, surface)
+
+    return surface
@@ -0,0 +1,82 @@
+import numpy
+
+
+
+class Camera:
+
+    def __init__(self, res, scale):
+        """
+        Camera class constructor, the camera defines the view transform from world positions to screen coordinates
+
+        Arguments:
+            res : [int, int] - Screen resolution [px]
+            scale : float - Initial scale of the view [px/m]
+
+        Comments:
+            - The world frame is fixed and centered at the main body, moving the camera never changes any world positions
+            - Screen coordinates have a top-left reference with the y-axis pointing down, world positions have the y-axis pointing up
+        """
+
+        # Set screen resolution and view scale
+        self.res = res
+        self.scale = scale
+
+        # Initialize world position at the center of the screen [m]
+        self.center = numpy.zeros(2)
+
+    def world_to_screen(self, pos):
+        """
+        Method to transform world positions to screen coordinates
+
+        Arguments:
+            pos : numpy.ndarray (...,2) - World position vectors [m]
+
+        Return values:
+            coord : numpy.ndarray (...,2) - Integer pixel coordinates with top-left reference
+        """
+
+        # Scale position relative to the screen center, flip y-axis and move reference to the top-left corner
+        # Rounded down on both sides of the screen center (truncation would round towards the center and make the scene jitter by a pixel while panning)
+        coord = (numpy.asarray(pos, dtype=float) - self.center) * self.scale * [1, -1]
+        return numpy.floor(coord).astype(int) + numpy.array(self.res) // 2
+
+    def screen_to_world(self, coord):
+        """
+        Method to transform screen coordinates to world positions
+
+        Arguments:
+            coord : numpy.ndarray (...,2) - Pixel coordinates with top-left reference
+
+        Return values:
+            pos : numpy.ndarray (...,2) - World position vectors [m]
+        """
+
+        # Inverse of world_to_screen (without the rounding to integer pixels)
+        return (numpy.asarray(coord, dtype=float) - numpy.array(self.res) // 2) * [1, -1] / self.scale + self.center
+
+    def pan(self, d_coord):
+        """
+        Method to move the camera so that the scene moves along with a displacement on the screen, for example of the mouse pointer
+
+        Arguments:
+            d_coord : [int, int] - Displacement on the screen [px]
+        """
+
+        # Move the screen center in the opposite direction of the displacement
+        self.center = self.center - numpy.asarray(d_coord, dtype=float) * [1, -1] / self.scale
+
+    def zoom(self, factor, anchor):
+        """
+        Method to zoom the camera while keeping one point on the screen fixed in the world
+
+        Arguments:
+            factor : float - Factor to multiply the scale with, greater than 1 zooms in
+            anchor : [int, int] - Pixel coordinates with top-left reference of the point that stays in place, for example the mouse pointer
+        """
+
+        # World position under the anchor before zooming
+        anchor_pos = self.screen_to_world(anchor)
+
+        # Change scale and move the screen center so that the same world position is under the anchor again
+        self.scale = self.scale * factor
+        self.center = self.center + anchor_pos - self.screen_to_world(anchor)
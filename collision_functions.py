@@ -0,0 +1,130 @@
+import numpy
+
+
+
+# Cell offsets of the neighbour cells to pair each cell with, half of the 3x3 neighbourhood so that every pair of cells is visited once
+NEIGHBOUR_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+def spatial_hash_pairs(pos, cell_size):
+    """
+    Function to find candidate pairs for collision checks using a uniform grid (spatial hash) broad phase
+
+    Arguments:
+        pos : numpy.ndarray (N,2) - Position vectors of the objects [m]
+        cell_size : float - Edge length of the grid cells [m], must be at least the largest distance at which a pair counts as colliding
+
+    Return values:
+        i : numpy.ndarray (P,) - Indices of the first objects of the candidate pairs
+        j : numpy.ndarray (P,) - Indices of the second objects of the candidate pairs, i < j for every pair
+
+    Comments:
+        - Every pair closer than cell_size is guaranteed to be returned, pairs further apart may be returned as well
+        - The cost grows linearly with the number of objects (plus the number of candidate pairs) instead of quadratically
+    """
+
+    pos = numpy.asarray(pos, dtype=float)
+    n = len(pos)
+    if n < 2:
+        return numpy.empty(0, dtype=int), numpy.empty(0, dtype=int)
+
+    # Find the integer grid cell of every object, relative to the lowest occupied cell so that keys stay small
+    cells = numpy.floor(pos / cell_size).astype(numpy.int64)
+    cells -= cells.min(axis=0) - 1
+    n_rows = cells[:, 1].max() + 2
+
+    # Build a hash key per cell and sort objects by it, objects sharing a cell are then contiguous
+    keys = cells[:, 0] * n_rows + cells[:, 1]
+    order = numpy.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    i_lst = []
+    j_lst = []
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        # Find range of objects in the neighbour cell of every object
+        neighbour_keys = (cells[:, 0] + dx) * n_rows + (cells[:, 1] + dy)
+        lo = numpy.searchsorted(sorted_keys, neighbour_keys, side='left')
+        hi = numpy.searchsorted(sorted_keys, neighbour_keys, side='right')
+        counts = hi - lo
+
+        # Expand ranges into explicit pairs
+        total = counts.sum()
+        if total == 0:
+            continue
+        i = numpy.repeat(numpy.arange(n), counts)
+        starts = numpy.repeat(lo, counts)
+        offsets = numpy.arange(total) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        j = order[starts + offsets]
+
+        # Within the same cell, keep every pair only once and skip pairing an object with itself
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i = i[keep]
+            j = j[keep]
+
+        i_lst.append(i)
+        j_lst.append(j)
+
+    if not i_lst:
+        return numpy.empty(0, dtype=int), numpy.empty(0, dtype=int)
+
+    # Sort indices within every pair
+    i = numpy.concatenate(i_lst)
+    j = numpy.concatenate(j_lst)
+    return numpy.minimum(i, j), numpy.maximum(i, j)
+
+def swept_collision_check_array(rel_pos0, rel_pos1, rel_vel0, rel_vel1, dt, coll_dist, safe_vel):
+    """
+    Function to check pairs of objects for collisions anywhere within a simulation step (continuous collision detection)
+
+    Arguments:
+        rel_pos0 : numpy.ndarray (...,2) - Relative position vectors of the pairs at the start of the step [m]
+        rel_pos1 : numpy.ndarray (...,2) - Relative position vectors of the pairs at the end of the step [m]
+        rel_vel0 : numpy.ndarray (...,2) - Relative velocity vectors of the pairs at the start of the step [m/s]
+        rel_vel1 : numpy.ndarray (...,2) - Relative velocity vectors of the pairs at the end of the step [m/s]
+        dt : float - Time increment of the step [s]
+        coll_dist : float - Distance at and under which a collision occurs [m]
+        safe_vel : float - Velocity at and under which a collision is safe and not harmful
+
+    Return values:
+        collision_modes : numpy.ndarray (...) - Integer values representing the collision modes, same values as orbit_functions.collision_check
+        toi : numpy.ndarray (...) - Time of impact after the start of the step [s], time of closest approach for pairs that do not collide
+        d_min : numpy.ndarray (...) - Minimum separation of the pairs within the step [m]
+
+    Comments:
+        - The relative motion within the step is approximated as linear between the start and end positions, which is accurate as long as a step covers a small part of an orbit
+        - The differential speed of a collision is evaluated at the time of impact, interpolated linearly between start and end of the step
+    """
+
+    rel_pos0 = numpy.asarray(rel_pos0, dtype=float)
+    rel_pos1 = numpy.asarray(rel_pos1, dtype=float)
+    rel_vel0 = numpy.asarray(rel_vel0, dtype=float)
+    rel_vel1 = numpy.asarray(rel_vel1, dtype=float)
+
+    # Relative displacement within the step, separation as a function of the step fraction s is |rel_pos0 + s * disp|
+    disp = rel_pos1 - rel_pos0
+    a = numpy.sum(disp**2, axis=-1)
+    b = numpy.sum(rel_pos0 * disp, axis=-1)
+    c = numpy.sum(rel_pos0**2, axis=-1)
+    moving = a > 0
+    a_safe = numpy.where(moving, a, 1)
+
+    # Step fraction and distance of closest approach
+    s_closest = numpy.where(moving, numpy.clip(- b / a_safe, 0, 1), 0)
+    d_min = numpy.sqrt(numpy.sum((rel_pos0 + s_closest[..., None] * disp)**2, axis=-1))
+
+    # Step fraction at which the separation first drops to the collision distance (first root of a*s^2 + 2*b*s + c - coll_dist^2 = 0)
+    discriminant = numpy.maximum(b**2 - a * (c - coll_dist**2), 0)
+    s_entry = numpy.where(c <= coll_dist**2, 0, numpy.clip((- b - numpy.sqrt(discriminant)) / a_safe, 0, 1))
+
+    # Time of impact for colliding pairs, time of closest approach otherwise
+    collision = d_min <= coll_dist
+    s_impact = numpy.where(collision, s_entry, s_closest)
+
+    # Differential speed at the time of impact
+    rel_vel = rel_vel0 + s_impact[..., None] * (rel_vel1 - rel_vel0)
+    v = numpy.sqrt(numpy.sum(rel_vel**2, axis=-1))
+
+    # No collision (0) if the pair never got close enough, otherwise safe collision (1) or crash (2) depending on the differential speed
+    collision_modes = numpy.where(collision, numpy.where(v <= safe_vel, 1, 2), 0)
+
+    return collision_modes, s_impact * dt, d_min
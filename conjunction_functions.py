@@ -0,0 +1,205 @@
+import math
+import numpy
+
+import orbit_functions
+import kepler_functions
+
+
+
+def apsis_filter(r_periapsis, r_apoapsis, threshold, primary):
+    """
+    Function to find pairs of orbits whose ranges of distance from the main body overlap (apogee/perigee filter)
+
+    Arguments:
+        r_periapsis : numpy.ndarray (N,) - Distances of the periapsis from the main body [m]
+        r_apoapsis : numpy.ndarray (N,) - Distances of the apoapsis from the main body [m], infinite for escape trajectories
+        threshold : float - Separation at and under which a pair counts as a conjunction [m]
+        primary : numpy.ndarray (N,) - Boolean mask of the orbits to pair with all other orbits, pairs of two non-primary orbits are not considered
+
+    Return values:
+        i : numpy.ndarray (P,) - Indices of the first orbits of the candidate pairs
+        j : numpy.ndarray (P,) - Indices of the second orbits of the candidate pairs, i < j for every pair
+
+    Comments:
+        - Two orbits can only come closer than the threshold if the higher periapsis lies less than the threshold above the lower apoapsis
+        - The cost grows with the number of primary orbits times the number of all orbits, so many non-primary orbits (debris) stay cheap
+    """
+
+    n = len(r_periapsis)
+    k = numpy.flatnonzero(primary)
+
+    # Overlap of the distance ranges of every primary orbit with all orbits
+    overlap = (r_periapsis[None, :] - r_apoapsis[k, None] <= threshold) & (r_periapsis[k, None] - r_apoapsis[None, :] <= threshold)
+
+    # Count every pair once, pairs of two primary orbits only from the lower index and no orbit with itself
+    l = numpy.arange(n)
+    overlap &= ~primary[None, :] | (l[None, :] > k[:, None])
+    row, l = numpy.nonzero(overlap)
+    i = k[row]
+
+    return numpy.minimum(i, l), numpy.maximum(i, l)
+
+def path_filter(ecc, p, i, j, threshold, n_samples=64, batch=256):
+    """
+    Function to find pairs of orbits whose paths come close to each other, regardless of the positions of the orbiters on them (orbit path filter)
+
+    Arguments:
+        ecc : numpy.ndarray (N,2) - Eccentricity vectors of the orbits
+        p : numpy.ndarray (N,) - Semi-latus rectums of the orbits [m]
+        i : numpy.ndarray (P,) - Indices of the first orbits of the pairs
+        j : numpy.ndarray (P,) - Indices of the second orbits of the pairs
+        threshold : float - Separation at and under which a pair counts as a conjunction [m]
+        n_samples : int - Number of points that every orbit path is sampled with
+        batch : int - Number of pairs evaluated at once, limits memory use
+
+    Return values:
+        keep : numpy.ndarray (P,) - Boolean mask of the pairs whose orbit paths come closer than the threshold
+
+    Comments:
+        - The minimum distance between the sampled paths is reduced by half the sample spacing of both paths, so no close pair is rejected
+        - Pairs with an escape trajectory are always kept
+    """
+
+    e = numpy.sqrt(numpy.sum(ecc**2, axis=-1))
+    closed = e < 1
+
+    # Sample every closed orbit path (positions relative to the main body) at evenly spaced true anomalies
+    true_anomaly = numpy.linspace(0, 2 * numpy.pi, n_samples, endpoint=False)
+    angle = true_anomaly + numpy.arctan2(ecc[:, 1:], ecc[:, :1])
+    r = p[:, None] / (1 + numpy.where(closed, e, 0)[:, None] * numpy.cos(true_anomaly))
+    path = numpy.stack([r * numpy.cos(angle), r * numpy.sin(angle)], axis=-1)
+
+    path_sq = r**2
+
+    # Largest distance between neighbouring samples of every path
+    spacing = numpy.sqrt(numpy.sum((path - numpy.roll(path, 1, axis=1))**2, axis=-1)).max(axis=1)
+
+    keep = ~(closed[i] & closed[j])
+    for start in range(0, len(i), batch):
+        i_batch = i[start:start + batch]
+        j_batch = j[start:start + batch]
+
+        # Minimum distance between all sample points of both paths of every pair, |a - b|^2 = |a|^2 + |b|^2 - 2 a.b
+        d_sq = (path_sq[i_batch, :, None] + path_sq[j_batch, None, :] - 2 * numpy.matmul(path[i_batch], path[j_batch].transpose(0, 2, 1))).min(axis=(1, 2))
+        d = numpy.sqrt(numpy.maximum(d_sq, 0))
+        keep[start:start + batch] |= d - (spacing[i_batch] + spacing[j_batch]) / 2 <= threshold
+
+    return keep
+
+def screen_conjunctions(gm, main_body_pos, pos, vel, types, horizon, threshold, step, elements=None, iterations=40, max_elements=1000000):
+    """
+    Function to find all pairs of orbiters whose separation falls below a threshold within a look-ahead time span
+
+    Arguments:
+        gm : float - Gravitational parameter
+        main_body_pos : [float, float] - Current position vector of the main body
+        pos : numpy.ndarray (N,2) - Current position vectors of the orbiters [m]
+        vel : numpy.ndarray (N,2) - Current velocity vectors of the orbiters [m/s]
+        types : numpy.ndarray (N,) - Type codes of the orbiters
+        horizon : float - Look-ahead time span [s]
+        threshold : float - Separation at and under which a pair counts as a conjunction [m]
+        step : float - Sampling interval of the relative motion [s]
+        elements : (numpy.ndarray, ...) - Orbital elements of the orbiters as returned by orbit_functions.orbit_params_array (for example cached ones), calculated if not given
+        iterations : int - Number of bisection iterations to refine the time of closest approach
+        max_elements : int - Maximum number of pair samples evaluated at once, limits memory use
+
+    Return values:
+        conjunctions : [(float, float, float, int, int)] - Conjunctions as (time of closest approach from now [s], miss distance [m], relative speed [m/s], index of first orbiter, index of second orbiter), sorted by time of closest approach
+
+    Comments:
+        - Candidate pairs pass the apogee/perigee filter and the orbit path filter before their relative motion is sampled in time
+        - Closest approaches are where the range rate changes sign from negative to positive between two samples, the exact time is found by bisection of the range rate
+        - Pairs that are already separating at the start or still approaching at the end of the time span have their closest approach within it at that end, they are reported at time 0 or at the horizon
+        - Debris-debris pairs are not screened (same as in the collision check)
+        - All orbiters are assumed to coast
+    """
+
+    pos = numpy.asarray(pos, dtype=float).reshape(-1, 2) - numpy.asarray(main_body_pos, dtype=float)
+    vel = numpy.asarray(vel, dtype=float).reshape(-1, 2)
+    types = numpy.asarray(types)
+
+    # Orbit parameters of all orbiters at once
+    if elements is None:
+        elements = orbit_functions.orbit_params_array(gm, [0, 0], pos, vel)
+    _, ecc, r_periapsis, r_apoapsis = elements
+    p = r_periapsis * (1 + numpy.sqrt(numpy.sum(ecc**2, axis=-1)))
+
+    # Apogee/perigee filter, debris-debris pairs are left out
+    i, j = apsis_filter(r_periapsis, r_apoapsis, threshold, types != 0)
+
+    # Orbit path filter
+    keep = path_filter(ecc, p, i, j, threshold)
+    i = i[keep]
+    j = j[keep]
+    if not len(i):
+        return []
+
+    # Only propagate orbiters that are part of a remaining pair
+    involved, inverse = numpy.unique(numpy.concatenate([i, j]), return_inverse=True)
+    i_sub = inverse[:len(i)]
+    j_sub = inverse[len(i):]
+
+    # Sample the relative motion of all remaining pairs, chunk by chunk in time, consecutive chunks overlap by one sample
+    chunk = max(2, min(max_elements // len(i), math.ceil(horizon / step)))
+    cand_pair = []
+    cand_t0 = []
+    conjunctions = []
+    t_start = 0
+    while t_start < horizon:
+        times = numpy.minimum(t_start + step * numpy.arange(chunk + 1), horizon)
+        pos_t, vel_t = kepler_functions.propagate(gm, pos[involved], vel[involved], times[:, None])
+        rel_pos = pos_t[:, i_sub] - pos_t[:, j_sub]
+        rel_vel = vel_t[:, i_sub] - vel_t[:, j_sub]
+
+        # Closest approaches between two samples, where the range rate changes from negative to positive
+        range_rate = numpy.einsum('tpk,tpk->tp', rel_pos, rel_vel)
+        s, k = numpy.nonzero((range_rate[:-1] < 0) & (range_rate[1:] >= 0))
+
+        # Keep only closest approaches that may fall under the threshold, the separation can drop by at most half a step of relative motion between samples
+        d = numpy.sqrt(numpy.minimum(numpy.sum(rel_pos[s, k]**2, axis=-1), numpy.sum(rel_pos[s + 1, k]**2, axis=-1)))
+        v = numpy.sqrt(numpy.maximum(numpy.sum(rel_vel[s, k]**2, axis=-1), numpy.sum(rel_vel[s + 1, k]**2, axis=-1)))
+        close = d - v * step / 2 <= threshold
+        cand_pair.append(k[close])
+        cand_t0.append(times[s[close]])
+
+        # Closest approaches at the ends of the time span, pairs under the threshold that are separating at the first sample or still approaching at the last one
+        ends = []
+        if t_start == 0:
+            ends.append((0, range_rate[0] >= 0))
+        if times[-1] >= horizon:
+            ends.append((-1, range_rate[-1] < 0))
+        for sample, at_end in ends:
+            d = numpy.sqrt(numpy.sum(rel_pos[sample]**2, axis=-1))
+            v = numpy.sqrt(numpy.sum(rel_vel[sample]**2, axis=-1))
+            conjunctions.extend((times[sample], d[c], v[c], i[c], j[c]) for c in numpy.flatnonzero(at_end & (d <= threshold)))
+
+        t_start = times[-1]
+
+    # Refine the times of closest approach of all candidates at once by bisection of the range rate
+    k = numpy.concatenate(cand_pair)
+    t0 = numpy.concatenate(cand_t0)
+    if not len(k):
+        conjunctions.sort()
+        return conjunctions
+    t1 = numpy.minimum(t0 + step, horizon)
+    pos_i, vel_i, pos_j, vel_j = pos[i[k]], vel[i[k]], pos[j[k]], vel[j[k]]
+    for iteration in range(iterations):
+        t_mid = (t0 + t1) / 2
+        p_i, v_i = kepler_functions.propagate(gm, pos_i, vel_i, t_mid)
+        p_j, v_j = kepler_functions.propagate(gm, pos_j, vel_j, t_mid)
+        approaching = numpy.sum((p_i - p_j) * (v_i - v_j), axis=-1) < 0
+        t0 = numpy.where(approaching, t_mid, t0)
+        t1 = numpy.where(approaching, t1, t_mid)
+
+    # Miss distances and relative speeds at the times of closest approach
+    tca = (t0 + t1) / 2
+    p_i, v_i = kepler_functions.propagate(gm, pos_i, vel_i, tca)
+    p_j, v_j = kepler_functions.propagate(gm, pos_j, vel_j, tca)
+    miss = numpy.sqrt(numpy.sum((p_i - p_j)**2, axis=-1))
+    speed = numpy.sqrt(numpy.sum((v_i - v_j)**2, axis=-1))
+
+    # Report the conjunctions under the threshold sorted by time of closest approach
+    conjunctions.extend((tca[c], miss[c], speed[c], i[k[c]], j[k[c]]) for c in numpy.flatnonzero(miss <= threshold))
+    conjunctions.sort()
+
+    return conjunctions
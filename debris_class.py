@@ -0,0 +1,245 @@
+import math
+import numpy
+import pygame
+
+import kepler_functions
+import collision_functions
+import asset_functions
+
+
+
+class DebrisField:
+
+    # Names of all per-fragment arrays
+    arrays = ['pos', 'vel', 'epoch_pos', 'epoch_vel', 'epoch_time', 'sprite']
+
+    # Image scales of the shared fragment sprites and number of pre-rotated orientations per scale
+    sprite_scales = [0.02, 0.03, 0.045, 0.065]
+    sprite_rotations = 8
+
+    def __init__(self, fragments, dv, spread, capacity=256):
+        """
+        Debris field class constructor, keeps the state vectors of all debris fragments in contiguous arrays (one row per fragment)
+
+        Arguments:
+            fragments : int - Number of fragments a crashed body breaks up into
+            dv : float - Typical ejection speed of the fragments relative to the crashed body [m/s]
+            spread : float - Radius around the crash position that the fragments are scattered in [m]
+            capacity : int - Number of rows to allocate initially, the field grows automatically if more fragments are added
+        """
+
+        # Set fragmentation model parameters
+        self.fragments = fragments
+        self.dv = dv
+        self.spread = spread
+
+        # Set number of rows currently in use
+        self.n = 0
+
+        # Allocate position and velocity arrays (one [x, y] row per fragment)
+        self.pos = numpy.zeros((capacity, 2))
+        self.vel = numpy.zeros((capacity, 2))
+
+        # Allocate arrays of the epoch states that the fragments are propagated from analytically
+        # Epoch positions are relative to the main body, an epoch time of NaN means that no epoch has been set yet
+        self.epoch_pos = numpy.zeros((capacity, 2))
+        self.epoch_vel = numpy.zeros((capacity, 2))
+        self.epoch_time = numpy.full(capacity, numpy.nan)
+
+        # Allocate array of the sprite index of every fragment
+        self.sprite = numpy.zeros(capacity, dtype=int)
+
+        # Random number generator for the fragmentation model, replaced by a generator seeded from the mission when the field is given to a mission
+        self.rng = numpy.random.default_rng()
+
+        # Load the sprites shared by all fragments
+        self.load_sprites()
+
+    def load_sprites(self):
+        """
+        Method to get the debris image from the asset cache and pre-render all scaled and rotated sprites
+        """
+
+        # Get shared debris image
+        img = asset_functions.get_image('debris.png')
+
+        # Render every orientation for every scale, sprite index = scale index * number of orientations + orientation index
+        self.sprites = [pygame.transform.rotozoom(img, 360 * k / self.sprite_rotations, scale) for scale in self.sprite_scales for k in range(self.sprite_rotations)]
+
+        # Offsets from the sprite center to its top-left corner, used for blitting
+        self.sprite_offsets = numpy.array([[sprite.get_width() // 2, sprite.get_height() // 2] for sprite in self.sprites])
+
+    def grow(self, capacity):
+        """
+        Method to enlarge all arrays
+
+        Arguments:
+            capacity : int - Minimum number of rows needed, the number of allocated rows is doubled until it fits
+        """
+
+        # Determine new capacity
+        new_capacity = max(1, len(self.sprite))
+        while new_capacity < capacity:
+            new_capacity = 2 * new_capacity
+
+        # Copy used rows into larger arrays
+        for name in self.arrays:
+            old = getattr(self, name)
+            new = numpy.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def add(self, pos, vel, scale):
+        """
+        Method to add fragments to the debris field
+
+        Arguments:
+            pos : numpy.ndarray (N,2) - Position vectors of the fragments [m]
+            vel : numpy.ndarray (N,2) - Velocity vectors of the fragments [m/s]
+            scale : numpy.ndarray (N,) - Image scales of the fragments, the sprite with the closest scale is used
+        """
+
+        pos = numpy.asarray(pos, dtype=float).reshape(-1, 2)
+        vel = numpy.asarray(vel, dtype=float).reshape(-1, 2)
+        n_new = len(pos)
+
+        # Allocate more rows if the field is full
+        if self.n + n_new > len(self.sprite):
+            self.grow(self.n + n_new)
+
+        # Write state vectors into the next free rows, the fragments start coasting from this state at the next step
+        rows = slice(self.n, self.n + n_new)
+        self.pos[rows] = pos
+        self.vel[rows] = vel
+        self.epoch_time[rows] = numpy.nan
+
+        # Pick the sprite of the closest scale in a random orientation
+        size = numpy.abs(numpy.log(numpy.reshape(scale, (-1, 1)) / numpy.array(self.sprite_scales))).argmin(axis=1)
+        self.sprite[rows] = size * self.sprite_rotations + self.rng.integers(0, self.sprite_rotations, n_new)
+
+        self.n += n_new
+
+    def fragment(self, pos, vel, bodyscale):
+        """
+        Method to break up a crashed body into fragments (fragmentation model)
+
+        Arguments:
+            pos : [float, float] - Position vector of the crashed body [m]
+            vel : [float, float] - Velocity vector of the crashed body [m/s]
+            bodyscale : float - Image scale of the crashed body
+
+        Comments:
+            - Fragment sizes are random between 20% and 50% of the crashed body
+            - Fragments are ejected in random directions with random (exponentially distributed) speeds, smaller fragments are ejected faster
+            - Fragments are scattered evenly over a disc of the spread radius around the crash position
+        """
+
+        n = self.fragments
+
+        # Random size of every fragment relative to the crashed body
+        size = self.rng.uniform(0.2, 0.5, n)
+
+        # Random ejection velocities, inversely proportional to the fragment size
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        speed = self.dv * self.rng.exponential(1, n) * 0.5 / size
+        dv = speed[:, None] * numpy.stack([numpy.cos(angle), numpy.sin(angle)], axis=-1)
+
+        # Random scatter around the crash position
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        r = self.spread * numpy.sqrt(self.rng.random(n))
+        offset = r[:, None] * numpy.stack([numpy.cos(angle), numpy.sin(angle)], axis=-1)
+
+        self.add(numpy.asarray(pos) + offset, numpy.asarray(vel) + dv, bodyscale * size)
+
+    def remove(self, rows):
+        """
+        Method to remove fragments from the debris field
+
+        Arguments:
+            rows : numpy.ndarray - Indices of the fragments to remove
+        """
+
+        # Keep all other fragments, in their order
+        keep = numpy.ones(self.n, dtype=bool)
+        keep[rows] = False
+        n_keep = numpy.count_nonzero(keep)
+
+        # Move kept rows to the front of the arrays
+        for name in self.arrays:
+            array = getattr(self, name)
+            array[:n_keep] = array[:self.n][keep]
+
+        self.n = n_keep
+
+    def step(self, gm, mb_pos, t, dt):
+        """
+        Method to advance the state vectors of all fragments in one batched step using analytic Kepler propagation
+
+        Arguments:
+            gm : float - Gravitational parameter
+            mb_pos : [float, float] - Main body position vector [m]
+            t : float - Simulation time at the start of the step [s]
+            dt : float - Time increment of the step [s]
+        """
+
+        n = self.n
+
+        # Fragments that were added since the last step start coasting from their current state
+        new = numpy.isnan(self.epoch_time[:n])
+        self.epoch_pos[:n][new] = self.pos[:n][new] - mb_pos
+        self.epoch_vel[:n][new] = self.vel[:n][new]
+        self.epoch_time[:n][new] = t
+
+        # Evaluate the orbits at the end of the step
+        pos, vel = kepler_functions.propagate(gm, self.epoch_pos[:n], self.epoch_vel[:n], t + dt - self.epoch_time[:n])
+        self.pos[:n] = pos + mb_pos
+        self.vel[:n] = vel
+
+    def check_collisions(self, pos_old, vel_old, body_pos_old, body_vel_old, body_pos, body_vel, dt, coll_dist, safe_vel):
+        """
+        Method to check all fragments for collisions with other (non-debris) bodies within the last simulation step
+
+        Arguments:
+            pos_old : numpy.ndarray (N,2) - Position vectors of the fragments at the start of the step [m]
+            vel_old : numpy.ndarray (N,2) - Velocity vectors of the fragments at the start of the step [m/s]
+            body_pos_old : numpy.ndarray (M,2) - Position vectors of the bodies at the start of the step [m]
+            body_vel_old : numpy.ndarray (M,2) - Velocity vectors of the bodies at the start of the step [m/s]
+            body_pos : numpy.ndarray (M,2) - Position vectors of the bodies at the end of the step [m]
+            body_vel : numpy.ndarray (M,2) - Velocity vectors of the bodies at the end of the step [m/s]
+            dt : float - Time increment of the step [s]
+            coll_dist : float - Distance at and under which a collision occurs [m]
+            safe_vel : float - Velocity at and under which a collision is safe and not harmful
+
+        Return values:
+            fragment : numpy.ndarray (C,) - Indices of the colliding fragments
+            body : numpy.ndarray (C,) - Indices of the bodies they collide with
+            collision_modes : numpy.ndarray (C,) - Collision modes, same values as orbit_functions.collision_check
+            toi : numpy.ndarray (C,) - Times of impact after the start of the step [s]
+
+        Comments:
+            Collisions between fragments are not considered, so the cost grows with the number of fragments times the (small) number of bodies
+        """
+
+        n = self.n
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+
+        # Bounding box test of the paths within the step, keeps only fragments that pass near a body
+        fragment_mid = (pos + pos_old) / 2
+        fragment_reach = numpy.max(numpy.abs(pos - pos_old), axis=-1) / 2
+        body_mid = (body_pos + body_pos_old) / 2
+        body_reach = numpy.max(numpy.abs(body_pos - body_pos_old), axis=-1) / 2
+        near = numpy.max(numpy.abs(fragment_mid[None, :] - body_mid[:, None]), axis=-1) <= coll_dist + fragment_reach[None, :] + body_reach[:, None]
+        body, fragment = numpy.nonzero(near)
+
+        # Swept collision check of the remaining fragment-body pairs
+        collision_modes, toi, _ = collision_functions.swept_collision_check_array(pos_old[fragment] - body_pos_old[body],
+                                                                                  pos[fragment] - body_pos[body],
+                                                                                  vel_old[fragment] - body_vel_old[body],
+                                                                                  vel[fragment] - body_vel[body],
+                                                                                  dt,
+                                                                                  coll_dist,
+                                                                                  safe_vel)
+
+        hit = collision_modes > 0
+        return fragment[hit], body[hit], collision_modes[hit], toi[hit]
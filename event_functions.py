@@ -0,0 +1,189 @@
+import heapq
+import math
+import numpy
+
+import orbit_functions
+import kepler_functions
+import conjunction_functions
+
+
+
+# Display names of the predicted event kinds
+EVENT_NAMES = {'approach' : 'Closest approach to target',
+               'encounter' : 'Encounter',
+               'atmosphere' : 'Atmosphere entry'}
+
+def refine_crossing(func, t0, t1, iterations=50):
+    """
+    Function to find the time at which a function of time drops below zero using bisection
+
+    Arguments:
+        func : function - Function of time, positive at t0 and zero or negative at t1
+        t0 : float - Lower bound of the time interval [s]
+        t1 : float - Upper bound of the time interval [s]
+        iterations : int - Number of bisection iterations
+
+    Return values:
+        t : float - Time of the crossing, on the negative side [s]
+    """
+
+    for iteration in range(iterations):
+        t_mid = (t0 + t1) / 2
+        if func(t_mid) > 0:
+            t0 = t_mid
+        else:
+            t1 = t_mid
+
+    return t1
+
+def refine_minimum(func, t0, t1, iterations=50):
+    """
+    Function to find the time of a local minimum of a function of time using golden section search
+
+    Arguments:
+        func : function - Function of time with a single minimum within the time interval
+        t0 : float - Lower bound of the time interval [s]
+        t1 : float - Upper bound of the time interval [s]
+        iterations : int - Number of golden section iterations
+
+    Return values:
+        t : float - Time of the minimum [s]
+    """
+
+    # Inverse golden ratio
+    ratio = (5**0.5 - 1) / 2
+
+    t_a = t1 - ratio * (t1 - t0)
+    t_b = t0 + ratio * (t1 - t0)
+    f_a = func(t_a)
+    f_b = func(t_b)
+    for iteration in range(iterations):
+        if f_a < f_b:
+            t1, t_b, f_b = t_b, t_a, f_a
+            t_a = t1 - ratio * (t1 - t0)
+            f_a = func(t_a)
+        else:
+            t0, t_a, f_a = t_a, t_b, f_b
+            t_b = t0 + ratio * (t1 - t0)
+            f_b = func(t_b)
+
+    return (t0 + t1) / 2
+
+def predict_events(gm, main_body, bodies, horizon, step, coll_dist, debris_pos=None, debris_vel=None, elements=None, approach=True, chunk=1000, max_elements=1000000):
+    """
+    Function to predict the upcoming significant events from the current orbits of all orbiting bodies
+
+    Arguments:
+        gm : float - Gravitational parameter
+        main_body : MainBody instance - Instance of the main body
+        bodies : [Orbiter instances] - All orbiting bodies (no main body)
+        horizon : float - Look-ahead time span [s]
+        step : float - Sampling interval of the orbits [s], encounters shorter than this may be missed
+        coll_dist : float - Distance at and under which a collision occurs [m]
+        debris_pos : numpy.ndarray (F,2) - Position vectors of the debris fragments [m]
+        debris_vel : numpy.ndarray (F,2) - Velocity vectors of the debris fragments [m/s]
+        elements : (numpy.ndarray, ...) - Orbital elements of the bodies (no debris) as returned by orbit_functions.orbit_params_array (for example cached ones), calculated if not given
+        approach : bool - Whether the closest approach of player and target is predicted, only the events that change the simulation are predicted otherwise
+        chunk : int - Maximum number of sampling times evaluated at once
+        max_elements : int - Maximum number of pair samples evaluated at once, limits memory use
+
+    Return values:
+        events : [(float, string, int, int)] - Priority queue (heapq) of the predicted events as (time from now [s], event kind, index of first body, index of second body), debris fragments are indexed after the bodies
+
+    Comments:
+        - Event kinds are the keys of EVENT_NAMES: closest approach of player and target, two bodies (at least one of them not debris) coming within the collision distance, and a body (not debris) entering the atmosphere
+        - All bodies are assumed to coast
+        - Sampling stops after the first chunk of times that contains an event and only the first encounters of a chunk are refined, so the heap holds the next events and not necessarily all events within the horizon
+    """
+
+    events = []
+
+    # Current state vectors relative to the main body and type codes of all bodies, followed by the debris fragments
+    pos = numpy.array([body.pos for body in bodies], dtype=float).reshape(-1, 2)
+    vel = numpy.array([body.vel for body in bodies], dtype=float).reshape(-1, 2)
+    types = numpy.array([body.type for body in bodies], dtype=int)
+    if elements is None:
+        elements = orbit_functions.orbit_params_array(gm, main_body.pos, pos, vel)
+    _, _, r_periapsis, r_apoapsis = elements
+    if debris_pos is not None:
+        _, _, debris_r_periapsis, debris_r_apoapsis = orbit_functions.orbit_params_array(gm, main_body.pos, debris_pos, debris_vel)
+        pos = numpy.concatenate([pos, debris_pos])
+        vel = numpy.concatenate([vel, debris_vel])
+        types = numpy.concatenate([types, numpy.zeros(len(debris_pos), dtype=int)])
+        r_periapsis = numpy.concatenate([r_periapsis, debris_r_periapsis])
+        r_apoapsis = numpy.concatenate([r_apoapsis, debris_r_apoapsis])
+    pos = pos - main_body.pos
+
+    # Find player and target
+    player = numpy.flatnonzero(types == 1)
+    player = player[0] if len(player) else None
+    target = numpy.flatnonzero(types == 2)
+    target = target[0] if len(target) else None
+
+    # Pairs of bodies to watch for encounters, only pairs that pass the apogee/perigee filter and no debris-debris pairs (same as in the collision check)
+    pair_i, pair_j = conjunction_functions.apsis_filter(r_periapsis, r_apoapsis, coll_dist, types != 0)
+
+    # Radius below which bodies are deorbited, only watch bodies that are not debris and whose orbits reach down to it
+    r_atm = main_body.radius + main_body.atm_thickness * 1.5
+    watch = numpy.flatnonzero((types != 0) & (r_periapsis <= r_atm))
+
+    # Only sample bodies that are part of a watched pair, watched for atmosphere entry or are player and target, lookup of their column in the samples
+    involved = numpy.unique(numpy.concatenate([pair_i, pair_j, watch] + [[k] for k in (player, target) if approach and k is not None]).astype(int))
+    column = numpy.zeros(len(pos), dtype=int)
+    column[involved] = numpy.arange(len(involved))
+
+    # Number of sampling times evaluated at once, limited by memory use
+    chunk = max(2, min(chunk, max_elements // max(len(pair_i), len(involved), 1), math.ceil(horizon / step)))
+
+    # Distance functions of time for the refinement of single events
+    def radius_func(k):
+        return lambda t: numpy.linalg.norm(kepler_functions.propagate(gm, pos[k], vel[k], t)[0]) - r_atm
+
+    def distance_func(i, j, offset=0):
+        def func(t):
+            pos_t = kepler_functions.propagate(gm, pos[[i, j]], vel[[i, j]], t)[0]
+            return numpy.linalg.norm(pos_t[0] - pos_t[1]) - offset
+        return func
+
+    # Sample all orbits chunk by chunk, consecutive chunks overlap by two samples so that no crossing or minimum falls between them
+    t_start = 0
+    while t_start < horizon and len(involved):
+        times = numpy.minimum(t_start + step * numpy.arange(chunk + 2), horizon)
+        pos_t = kepler_functions.propagate(gm, pos[involved], vel[involved], times[:, None])[0]
+        n_events = len(events)
+
+        # Atmosphere entry of any watched body
+        r = numpy.sqrt(numpy.sum(pos_t[:, column[watch]]**2, axis=-1))
+        entering = (r[1:] <= r_atm) & (r[:-1] > r_atm)
+        for w in numpy.flatnonzero(entering.any(axis=0)):
+            s = numpy.argmax(entering[:, w])
+            t = refine_crossing(radius_func(watch[w]), times[s], times[s + 1])
+            heapq.heappush(events, (t, 'atmosphere', watch[w], watch[w]))
+
+        # Encounters, pairs of bodies coming within the collision distance
+        d = numpy.sqrt(numpy.sum((pos_t[:, column[pair_i]] - pos_t[:, column[pair_j]])**2, axis=-1))
+        entering = (d[1:] <= coll_dist) & (d[:-1] > coll_dist)
+        entering_pairs = numpy.flatnonzero(entering.any(axis=0))
+        if len(entering_pairs):
+            # Only encounters within the earliest sample interval can be the next encounter, the later ones are not refined
+            first = numpy.argmax(entering[:, entering_pairs], axis=0)
+            s = first.min()
+            for p in entering_pairs[first == s]:
+                t = refine_crossing(distance_func(pair_i[p], pair_j[p], coll_dist), times[s], times[s + 1])
+                heapq.heappush(events, (t, 'encounter', pair_i[p], pair_j[p]))
+
+        # Closest approach of player and target, first local minimum of their distance
+        if approach and player is not None and target is not None:
+            d = numpy.sqrt(numpy.sum((pos_t[:, column[player]] - pos_t[:, column[target]])**2, axis=-1))
+            minimum = numpy.flatnonzero((d[1:-1] <= d[:-2]) & (d[1:-1] < d[2:]))
+            if len(minimum):
+                s = minimum[0]
+                t = refine_minimum(distance_func(player, target), times[s], times[s + 2])
+                heapq.heappush(events, (t, 'approach', player, target))
+
+        # Later chunks can only contain later events
+        if len(events) > n_events:
+            break
+        t_start = times[-2]
+
+    return events
@@ -0,0 +1,189 @@
+import numpy
+
+
+
+def semi_implicit_euler(pos, vel, acc_func, dt):
+    """
+    Function that advances position and velocity vectors by one step using the semi-implicit (symplectic) Euler method
+
+    Arguments:
+        pos : numpy.ndarray (...,2) - Current position vectors [m]
+        vel : numpy.ndarray (...,2) - Current velocity vectors [m/s]
+        acc_func : function - Function returning the acceleration vectors [m/s^2] for an array of position vectors
+        dt : float - Time increment of the step [s]
+
+    Return values:
+        pos : numpy.ndarray (...,2) - New position vectors [m]
+        vel : numpy.ndarray (...,2) - New velocity vectors [m/s]
+
+    Comments:
+        This is the scheme of orbit_functions.get_vel and orbit_functions.get_pos, first order accurate
+    """
+
+    # Update velocity with the acceleration at the old position, then position with the new velocity
+    vel = vel + acc_func(pos) * dt
+    pos = pos + vel * dt
+
+    return pos, vel
+
+def velocity_verlet(pos, vel, acc_func, dt):
+    """
+    Function that advances position and velocity vectors by one step using the velocity Verlet (leapfrog) method
+
+    Arguments:
+        pos : numpy.ndarray (...,2) - Current position vectors [m]
+        vel : numpy.ndarray (...,2) - Current velocity vectors [m/s]
+        acc_func : function - Function returning the acceleration vectors [m/s^2] for an array of position vectors
+        dt : float - Time increment of the step [s]
+
+    Return values:
+        pos : numpy.ndarray (...,2) - New position vectors [m]
+        vel : numpy.ndarray (...,2) - New velocity vectors [m/s]
+
+    Comments:
+        Symplectic and second order accurate, orbit energy does not drift over many revolutions
+    """
+
+    # Half kick, full drift, half kick
+    vel_half = vel + acc_func(pos) * dt / 2
+    pos = pos + vel_half * dt
+    vel = vel_half + acc_func(pos) * dt / 2
+
+    return pos, vel
+
+def rk4(pos, vel, acc_func, dt):
+    """
+    Function that advances position and velocity vectors by one step using the classic 4th order Runge-Kutta method
+
+    Arguments:
+        pos : numpy.ndarray (...,2) - Current position vectors [m]
+        vel : numpy.ndarray (...,2) - Current velocity vectors [m/s]
+        acc_func : function - Function returning the acceleration vectors [m/s^2] for an array of position vectors
+        dt : float - Time increment of the step [s]
+
+    Return values:
+        pos : numpy.ndarray (...,2) - New position vectors [m]
+        vel : numpy.ndarray (...,2) - New velocity vectors [m/s]
+    """
+
+    # Evaluate the four stages, the derivative of the position is the velocity and the derivative of the velocity is the acceleration
+    k1_pos = vel
+    k1_vel = acc_func(pos)
+
+    k2_pos = vel + k1_vel * dt / 2
+    k2_vel = acc_func(pos + k1_pos * dt / 2)
+
+    k3_pos = vel + k2_vel * dt / 2
+    k3_vel = acc_func(pos + k2_pos * dt / 2)
+
+    k4_pos = vel + k3_vel * dt
+    k4_vel = acc_func(pos + k3_pos * dt)
+
+    # Combine stages
+    pos = pos + (k1_pos + 2 * k2_pos + 2 * k3_pos + k4_pos) * dt / 6
+    vel = vel + (k1_vel + 2 * k2_vel + 2 * k3_vel + k4_vel) * dt / 6
+
+    return pos, vel
+
+# Butcher tableau of the Runge-Kutta-Fehlberg 4(5) method
+RKF45_A = [[],
+           [1/4],
+           [3/32, 9/32],
+           [1932/2197, -7200/2197, 7296/2197],
+           [439/216, -8, 3680/513, -845/4104],
+           [-8/27, 2, -3544/2565, 1859/4104, -11/40]]
+RKF45_B4 = [25/216, 0, 1408/2565, 2197/4104, -1/5, 0]
+RKF45_B5 = [16/135, 0, 6656/12825, 28561/56430, -9/50, 2/55]
+
+def rkf45(pos, vel, acc_func, dt, rtol=1e-9, max_substeps=1000):
+    """
+    Function that advances position and velocity vectors over a time increment using the adaptive Runge-Kutta-Fehlberg 4(5) method
+
+    Arguments:
+        pos : numpy.ndarray (...,2) - Current position vectors [m]
+        vel : numpy.ndarray (...,2) - Current velocity vectors [m/s]
+        acc_func : function - Function returning the acceleration vectors [m/s^2] for an array of position vectors
+        dt : float - Time increment to advance [s]
+        rtol : float - Relative error tolerance per substep
+        max_substeps : int - Maximum number of accepted and rejected substeps, once reached the rest of the time increment is taken in one last substep
+
+    Return values:
+        pos : numpy.ndarray (...,2) - New position vectors [m]
+        vel : numpy.ndarray (...,2) - New velocity vectors [m/s]
+
+    Comments:
+        - The time increment is split into as many substeps as needed to keep the embedded error estimate below the tolerance
+        - The error is measured relative to the size of the state vectors of each body, the worst body determines the substep size
+    """
+
+    # Start with a single substep covering the whole time increment
+    t = 0
+    h = dt
+    substeps = 0
+
+    while t < dt:
+        # Do not step past the end of the time increment, take the rest of the time increment at once if the substep budget is used up
+        substeps += 1
+        if substeps >= max_substeps:
+            h = dt - t
+        else:
+            h = min(h, dt - t)
+
+        # Evaluate the six stages
+        k_pos = []
+        k_vel = []
+        for stage in range(6):
+            stage_pos = pos
+            stage_vel = vel
+            for j, a in enumerate(RKF45_A[stage]):
+                stage_pos = stage_pos + k_pos[j] * a * h
+                stage_vel = stage_vel + k_vel[j] * a * h
+            k_pos.append(stage_vel)
+            k_vel.append(acc_func(stage_pos))
+
+        # 4th and 5th order solutions
+        pos_4 = pos + h * sum(b * k for b, k in zip(RKF45_B4, k_pos))
+        vel_4 = vel + h * sum(b * k for b, k in zip(RKF45_B4, k_vel))
+        pos_5 = pos + h * sum(b * k for b, k in zip(RKF45_B5, k_pos))
+        vel_5 = vel + h * sum(b * k for b, k in zip(RKF45_B5, k_vel))
+
+        # Error estimate relative to the magnitude of the state vectors of each body
+        err_pos = numpy.linalg.norm(pos_5 - pos_4, axis=-1) / numpy.maximum(numpy.linalg.norm(pos, axis=-1), 1)
+        err_vel = numpy.linalg.norm(vel_5 - vel_4, axis=-1) / numpy.maximum(numpy.linalg.norm(vel, axis=-1), 1)
+        err = max(numpy.max(err_pos, initial=0), numpy.max(err_vel, initial=0)) / rtol
+
+        # Accept substep if the error is within tolerance (or the substep budget is used up), continue with the 5th order solution
+        if err <= 1 or substeps >= max_substeps:
+            t = t + h
+            pos = pos_5
+            vel = vel_5
+
+        # Adapt substep size, with safety factor and limits on how fast the substep size may change
+        if err > 0:
+            h = h * min(4, max(0.1, 0.9 * err**-0.2))
+        else:
+            h = h * 4
+
+    return pos, vel
+
+# Integrators selectable through the 'integrator' key in the config file
+INTEGRATORS = {'euler' : semi_implicit_euler,
+               'verlet' : velocity_verlet,
+               'rk4' : rk4,
+               'rkf45' : rkf45}
+
+def get_integrator(name):
+    """
+    Function to look up an integrator by name
+
+    Arguments:
+        name : string - Name of the integrator, one of 'euler', 'verlet', 'rk4' or 'rkf45'
+
+    Return values:
+        integrator : function - The integrator function
+    """
+
+    try:
+        return INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown integrator '{name}', available integrators: {', '.join(INTEGRATORS)}")
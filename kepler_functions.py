@@ -0,0 +1,142 @@
+import numpy
+
+
+
+def stumpff_c(z):
+    """
+    Function to evaluate the Stumpff function C(z) = (1 - cos(sqrt(z))) / z for arrays of arguments
+
+    Arguments:
+        z : numpy.ndarray - Arguments of the Stumpff function
+
+    Return values:
+        c : numpy.ndarray - Values of the Stumpff function C
+    """
+
+    # Use the trigonometric form for positive, the hyperbolic form for negative and the series expansion for small arguments
+    z = numpy.asarray(z, dtype=float)
+    small = numpy.abs(z) < 1e-6
+    pos = z > 0
+    z_safe = numpy.where(small, 1, z)
+    sqrt_abs_z = numpy.sqrt(numpy.abs(z_safe))
+
+    # The hyperbolic form overflows for far hyperbolic arguments, which only occur in unused branches or for bodies far away from the main body
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        return numpy.where(small, 1/2 - z/24 + z**2/720,
+                           numpy.where(pos, (1 - numpy.cos(sqrt_abs_z)) / z_safe,
+                                            (numpy.cosh(sqrt_abs_z) - 1) / -z_safe))
+
+def stumpff_s(z):
+    """
+    Function to evaluate the Stumpff function S(z) = (sqrt(z) - sin(sqrt(z))) / sqrt(z)^3 for arrays of arguments
+
+    Arguments:
+        z : numpy.ndarray - Arguments of the Stumpff function
+
+    Return values:
+        s : numpy.ndarray - Values of the Stumpff function S
+    """
+
+    # Use the trigonometric form for positive, the hyperbolic form for negative and the series expansion for small arguments
+    z = numpy.asarray(z, dtype=float)
+    small = numpy.abs(z) < 1e-6
+    pos = z > 0
+    z_safe = numpy.where(small, 1, z)
+    sqrt_abs_z = numpy.sqrt(numpy.abs(z_safe))
+
+    # The hyperbolic form overflows for far hyperbolic arguments, which only occur in unused branches or for bodies far away from the main body
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        return numpy.where(small, 1/6 - z/120 + z**2/5040,
+                           numpy.where(pos, (sqrt_abs_z - numpy.sin(sqrt_abs_z)) / sqrt_abs_z**3,
+                                            (numpy.sinh(sqrt_abs_z) - sqrt_abs_z) / sqrt_abs_z**3))
+
+def propagate(gm, pos0, vel0, dt, tol=1e-12, max_iter=50):
+    """
+    Function to propagate Keplerian orbits analytically using the universal variable formulation
+
+    Arguments:
+        gm : float - Gravitational parameter
+        pos0 : numpy.ndarray (...,2) - Position vectors relative to the main body at the epoch [m]
+        vel0 : numpy.ndarray (...,2) - Velocity vectors at the epoch [m/s]
+        dt : float or numpy.ndarray (...) - Time since the epoch, broadcast against the leading dimensions of the state vectors [s]
+        tol : float - Convergence tolerance of the universal anomaly, relative
+        max_iter : int - Maximum number of Newton iterations
+
+    Return values:
+        pos : numpy.ndarray (...,2) - Position vectors relative to the main body at epoch + dt [m]
+        vel : numpy.ndarray (...,2) - Velocity vectors at epoch + dt [m/s]
+
+    Comments:
+        - Works for elliptic, parabolic and hyperbolic orbits alike, the cost is independent of dt
+        - For elliptic orbits, whole revolutions are removed from dt before solving, which keeps the iteration well-conditioned at any time warp
+    """
+
+    pos0 = numpy.asarray(pos0, dtype=float)
+    vel0 = numpy.asarray(vel0, dtype=float)
+    dt = numpy.asarray(dt, dtype=float)
+
+    # Broadcast state vectors and time against each other
+    shape = numpy.broadcast_shapes(pos0.shape[:-1], vel0.shape[:-1], dt.shape)
+    pos0 = numpy.broadcast_to(pos0, shape + (2,))
+    vel0 = numpy.broadcast_to(vel0, shape + (2,))
+    dt = numpy.broadcast_to(dt, shape)
+
+    sqrt_gm = gm**0.5
+
+    # Distance, radial velocity and reciprocal semi-major axis at the epoch
+    r0 = numpy.sqrt(numpy.sum(pos0**2, axis=-1))
+    rv0 = numpy.sum(pos0 * vel0, axis=-1)
+    alpha = 2 / r0 - numpy.sum(vel0**2, axis=-1) / gm
+
+    # Remove whole revolutions of elliptic orbits
+    elliptic = alpha > 1e-12
+    period = 2 * numpy.pi / numpy.sqrt(gm * numpy.where(elliptic, alpha, 1)**3)
+    dt = numpy.where(elliptic, numpy.fmod(dt, period), dt)
+
+    # Initial guess of the universal anomaly
+    chi = numpy.where(elliptic, sqrt_gm * dt * alpha, sqrt_gm * dt / r0)
+    hyperbolic = alpha < -1e-12
+    if numpy.any(hyperbolic):
+        a = 1 / numpy.where(hyperbolic, alpha, -1)
+        sign = numpy.where(dt < 0, -1, 1)
+        arg = -2 * gm * alpha * dt / (rv0 + sign * numpy.sqrt(-gm * a) * (1 - r0 * alpha))
+        chi_hyp = sign * numpy.sqrt(-a) * numpy.log(numpy.where(hyperbolic & (arg > 0), arg, 1))
+        chi = numpy.where(hyperbolic & (arg > 0), chi_hyp, chi)
+
+    # Solve the universal Kepler equation with Newton's method, the derivative of the equation is the distance r
+    # Only orbits that have not converged yet are iterated further
+    chi = numpy.array(chi, dtype=float).reshape(-1)
+    flat = [numpy.ravel(x) for x in (alpha, r0, rv0, dt)]
+    active = numpy.arange(chi.size)
+    for iteration in range(max_iter):
+        alpha_a, r0_a, rv0_a, dt_a = [x[active] for x in flat]
+        chi_a = chi[active]
+        z = alpha_a * chi_a**2
+        c = stumpff_c(z)
+        s = stumpff_s(z)
+        r = rv0_a / sqrt_gm * chi_a * (1 - z * s) + (1 - alpha_a * r0_a) * chi_a**2 * c + r0_a
+        f = rv0_a / sqrt_gm * chi_a**2 * c + (1 - alpha_a * r0_a) * chi_a**3 * s + r0_a * chi_a - sqrt_gm * dt_a
+        step = f / r
+        chi[active] = chi_a - step
+        active = active[~(numpy.abs(step) <= tol * numpy.maximum(numpy.abs(chi[active]), 1))]
+        if not active.size:
+            break
+    chi = chi.reshape(shape)
+
+    # Lagrange coefficients
+    z = alpha * chi**2
+    c = stumpff_c(z)
+    s = stumpff_s(z)
+    f = 1 - chi**2 / r0 * c
+    g = dt - chi**3 * s / sqrt_gm
+
+    # New position vectors
+    pos = f[..., None] * pos0 + g[..., None] * vel0
+    r = numpy.sqrt(numpy.sum(pos**2, axis=-1))
+
+    # Time derivatives of the Lagrange coefficients and new velocity vectors
+    f_dot = sqrt_gm / (r * r0) * (alpha * chi**3 * s - chi)
+    g_dot = 1 - chi**2 / r * c
+    vel = f_dot[..., None] * pos0 + g_dot[..., None] * vel0
+
+    return pos, vel
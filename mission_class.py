@@ -1,32 +1,48 @@
 import os
 import io_functions
 import orbiter_class
+import body_store_class
 import math
 import random
+import numpy
 
 
 
 class Mission:
 
-    def __init__(self, mission_folder, mission_file, planet_res):
+    def __init__(self, mission_folder, mission_file, planet_res, debris, seed=None):
         """
         Mission class constructor
         
         Arguments:
             mission_folder : string - The name of the subfolder in the programs root folder that the mission file is located in
             mission_file : string - The name of the mission file in the mission folder
+            debris : DebrisField instance - The debris field that holds all debris fragments of the mission
+            seed : int - Seed of the mission, determines the randomly generated mission and the planet texture (random if not given)
         """
         
         self.planet_res = planet_res
 
+        # Create random number generator for everything random about the mission, the same seed always gives the same mission
+        self.rng = random.Random(seed)
+
+        # Save the debris field, debris is not kept in the list of bodies
+        self.debris = debris
+
+        # Seed the random number generator of the debris field from the mission, so that fragment orientations and breakups are replayed with the mission
+        self.debris.rng = numpy.random.default_rng(self.rng.randrange(2**32))
+
         # Initialize a list of all bodies
         self.bodies = []
         
+        # Initialize the body store that holds the state vectors of all orbiting bodies
+        self.store = body_store_class.BodyStore()
+        
         # If the user selected a randomly generated mission, generate mission
         # If the user selected a premade mission, load that mission
         if mission_file == 'r':
             # Randomize number of hazards
-            hazards = random.randint(0,5)
+            hazards = self.rng.randint(0,5)
             self.generate_mission(hazards)
         else:
             # Read mission file into a dictionary
@@ -37,7 +53,7 @@ class Mission:
 
                 # If the body is the player body, create new player object and append list of bodies
                 if o_data['type'] == 'player':
-                    self.bodies.append(    orbiter_class.Player(o_data['pos_init'],
+                    self.add_body(         orbiter_class.Player(o_data['pos_init'],
                                                                 o_data['vel_init'],
                                                                 o_data['mass_dry'],
                                                                 o_data['mass_prop'],
@@ -48,21 +64,60 @@ class Mission:
 
                 # If the body is the main body, create a new main body object and append list of bodies
                 elif o_data['type'] == 'mainbody':
-                    self.bodies.append(  orbiter_class.MainBody(o_data['mass'],
+                    self.add_body(       orbiter_class.MainBody(o_data['mass'],
                                                                 o_data['radius'],
                                                                 o_data['atm_thickness'],
-                                                                self.planet_res))
+                                                                self.planet_res,
+                                                                o_data.get('seed', self.rng.randrange(2**32))))
+
+                # If the body is debris, add a fragment to the debris field
+                elif o_data['type'] == 0:
+                    self.debris.add(o_data['pos_init'], o_data['vel_init'], o_data['bodyscale'])
 
-                # If body is of another type such as 'debris' or 'hazard', create new orbiter object and append list of bodies
+                # If body is of another type such as 'target' or 'hazard', create new orbiter object and append list of bodies
                 else:
-                    self.bodies.append(   orbiter_class.Orbiter(o_data['type'],
+                    self.add_body(        orbiter_class.Orbiter(o_data['type'],
                                                                 o_data['pos_init'],
                                                                 o_data['vel_init'],
                                                                 o_data['img'],
-                                                                o_data['bodyscale']))
+                                                                o_data['bodyscale'],
+                                                                self.rng.randint(0, 360)))
                 
         
         
+    def add_body(self, body):
+        """
+        Method to add a body to the mission
+        
+        Arguments:
+            body : MainBody/Orbiter/Player instance - The body to be added
+        """
+        
+        # Add body to list of bodies
+        self.bodies.append(body)
+        
+        # Move state vectors of orbiting bodies into the mission body store
+        if body.type >= 0:
+            self.store.add(body, body.pos, body.vel, body.acc)
+    
+    def remove_body(self, body):
+        """
+        Method to remove a body from the mission
+        
+        Arguments:
+            body : MainBody/Orbiter/Player instance - The body to be removed
+            
+        Comments:
+            Raises a ValueError if the body is not part of the mission (anymore), same as list.remove
+        """
+        
+        # Remove body from list of bodies
+        self.bodies.remove(body)
+        
+        # Remove the state vectors of orbiting bodies from the mission body store
+        if body.type >= 0:
+            self.store.remove(body)
+        
     def generate_mission(self, n_hazards):
         """
         Method to generate a random mission
@@ -81,25 +136,26 @@ class Mission:
         
         # Generate main body
         # Randomize main body density between 4000kg/m^3 and 6000kg/m^3, used for mass calculation with the radius
-        mb_density = 4e3 + random.random() * 2e3
+        mb_density = 4e3 + self.rng.random() * 2e3
         
         # Randomize main body radius between 3000km and 13000km
-        mb_radius = 3000e3 + random.random() * 10000e3
+        mb_radius = 3000e3 + self.rng.random() * 10000e3
         
         # Calculation of the mass, done through the planet density and the spherical volume of the planet
         mb_mass = 4/3 * math.pi * mb_radius**3 * mb_density
         
         # Randomize the atmosphere thickness between 5% and 10% of the planet radius
-        mb_atm_thickness = mb_radius * (0.05 + random.random() * 0.05)
+        mb_atm_thickness = mb_radius * (0.05 + self.rng.random() * 0.05)
         
         # Calculate gravitational parameter
         gm = G * mb_mass
         
         # Spawn main body based on mass, radius and atmosphere thickness
-        self.bodies.append(  orbiter_class.MainBody(mb_mass,
+        self.add_body(       orbiter_class.MainBody(mb_mass,
                                                     mb_radius,
                                                     mb_atm_thickness,
-                                                    self.planet_res))
+                                                    self.planet_res,
+                                                    self.rng.randrange(2**32)))
                             
                             
                         
@@ -108,13 +164,13 @@ class Mission:
         
         # Generate target body
         # Randomize the initial pericenter radius from an altitude of 1.5x the end of the atmosphere to 3000km above the end of the atmosphere
-        tg_r_init = mb_radius + mb_atm_thickness * 1.5 + random.random() * 3000e3
+        tg_r_init = mb_radius + mb_atm_thickness * 1.5 + self.rng.random() * 3000e3
         
         # Randomize the inital velocity by assuming the circular velocity and adding between 0% and 20% of the speed
-        tg_v_init = (gm/tg_r_init)**0.5 * (1 + 0.2 * random.random())
+        tg_v_init = (gm/tg_r_init)**0.5 * (1 + 0.2 * self.rng.random())
         
         # Randomize the argument of pericenter (angle in rad from positive x-axis)
-        tg_pos_angle = random.random() * math.pi * 2
+        tg_pos_angle = self.rng.random() * math.pi * 2
         
         # Calculate the direction (angle in rad from positive x-axis) of the initial velocity vector based on the argument of pericenter
         tg_vel_angle = tg_pos_angle + math.pi / 2
@@ -126,11 +182,12 @@ class Mission:
         tg_vel_init = [tg_v_init * math.cos(tg_vel_angle), tg_v_init * math.sin(tg_vel_angle)]
         
         # Spawn target orbiter based on initial position and velocity
-        self.bodies.append(   orbiter_class.Orbiter(    2,
+        self.add_body(        orbiter_class.Orbiter(    2,
                                                         tg_pos_init,
                                                         tg_vel_init,
                                                         'sat2.png',
-                                                        0.15))
+                                                        0.15,
+                                                        self.rng.randint(0, 360)))
         
         
         
@@ -150,7 +207,7 @@ class Mission:
             pl_v_init = (gm/pl_r_init)**0.5
             
             # Randomize starting position direction (angle in rad from positive x-axis) (= argument of pericenter)
-            pl_pos_angle = random.random() * math.pi * 2
+            pl_pos_angle = self.rng.random() * math.pi * 2
             
             # Calculate initial velocity direction (angle in rad from positive x-axis)
             pl_vel_angle = pl_pos_angle + math.pi / 2
@@ -165,19 +222,19 @@ class Mission:
             dt = ((pl_pos_init[0] - tg_pos_init[0])**2 + (pl_pos_init[1] - tg_pos_init[1])**2)**0.5
             
         # Randomize dry mass from 100kg to 1100kg
-        pl_mass_dry = 100 + random.random() * 1000
+        pl_mass_dry = 100 + self.rng.random() * 1000
         
         # Determine if spacecraft will use a chemical or electric propulsion system, 75% chance for chemical, 25% for electric
-        if random.random() < 0.75:
+        if self.rng.random() < 0.75:
             # Chemical propulsion
             # Set a fuel mass taking into account the dry mass and pericenter altitudes of player and target
             pl_mass_fuel = pl_mass_dry * (0.5 + 2 * tg_r_init / pl_r_init)
             
             # Randomize specific impulse between 200s and 450s
-            pl_i_sp = 200 + random.random() * 250
+            pl_i_sp = 200 + self.rng.random() * 250
             
             # Randomize thrust [N] between dry 0.4x and 0.6x the player dry mass
-            pl_thrust = pl_mass_dry * (0.8 + random.random() * 0.4) / 2
+            pl_thrust = pl_mass_dry * (0.8 + self.rng.random() * 0.4) / 2
             
         else:
             # Electric propulsion
@@ -185,14 +242,14 @@ class Mission:
             pl_mass_fuel = pl_mass_dry * (0.2 + 0.5 * tg_r_init / pl_r_init)
             
             # Randomize specific impulse between 1000s and 2000s
-            pl_i_sp = 1000 + random.random() * 1000
+            pl_i_sp = 1000 + self.rng.random() * 1000
             
             # Randomize thrust [N] between dry 0.08x and 0.12x the player dry mass
-            pl_thrust = pl_mass_dry * (0.8 + random.random() * 0.4) / 10
+            pl_thrust = pl_mass_dry * (0.8 + self.rng.random() * 0.4) / 10
                 
             
         # Spawn player body based on inital position and velocity as well as dry mass, propellant mass, thrust and specific impulse
-        self.bodies.append(orbiter_class.Player(pl_pos_init,
+        self.add_body(     orbiter_class.Player(pl_pos_init,
                                                 pl_vel_init,
                                                 pl_mass_dry,
                                                 pl_mass_fuel,
@@ -214,13 +271,13 @@ class Mission:
             # Generate initial conditions for hazard body while ensuring that the distance from either target or player body is at least 1000km
             while dp < 1000e3 or dt < 1000e3:
                 # Randomize hazard body pericenter radius between an altitude of 3 atmospheres and 5000km higher
-                hz_r_init = mb_radius + mb_atm_thickness * 3 + random.random() * 5000e3
+                hz_r_init = mb_radius + mb_atm_thickness * 3 + self.rng.random() * 5000e3
                 
                 # Randomize inital velocity by finding circular velocity and adding between 0% and 40%
-                hz_v_init = (gm/hz_r_init)**0.5 * (1 + 0.4 * random.random())
+                hz_v_init = (gm/hz_r_init)**0.5 * (1 + 0.4 * self.rng.random())
                 
                 # Randomize argument of pericenter (angle in rad from positive x-axis)
-                hz_pos_angle = random.random() * math.pi * 2
+                hz_pos_angle = self.rng.random() * math.pi * 2
                 
                 # Calculate velocity from argument of pericenter (angle in rad from positive x-axis)
                 hz_vel_angle = hz_pos_angle + math.pi / 2
@@ -238,8 +295,9 @@ class Mission:
                 dt = ((tg_pos_init[0] - hz_pos_init[0])**2 + (tg_pos_init[1] - hz_pos_init[1])**2)**0.5
             
             # Spawn hazard based on initial position and velocity
-            self.bodies.append(   orbiter_class.Orbiter(3,
+            self.add_body(        orbiter_class.Orbiter(3,
                                                         hz_pos_init,
                                                         hz_vel_init,
                                                         'sat1.png',
-                                                        0.1))
\ No newline at end of file
+                                                        0.1,
+                                                        self.rng.randint(0, 360)))
\ No newline at end of file
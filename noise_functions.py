@@ -0,0 +1,133 @@
+import math
+import numpy
+
+
+
+# Gradient directions of improved Perlin noise (edge centers of a cube, 4 of them repeated to fill 16 entries)
+GRADIENTS = numpy.array([[1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+                         [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+                         [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+                         [1, 1, 0], [0, -1, 1], [-1, 1, 0], [0, -1, -1]], dtype=float)
+GRADIENTS_X, GRADIENTS_Y, GRADIENTS_Z = GRADIENTS.T.copy()
+
+def permutation_table(seed=0):
+    """
+    Function to create the permutation table that the gradients of the noise lattice are hashed with
+
+    Arguments:
+        seed : int - Seed of the permutation, different seeds give unrelated noise
+
+    Return values:
+        perm : numpy.ndarray (512,) - Random permutation of 0-255, repeated twice so that indices do not need to be wrapped
+    """
+
+    perm = numpy.random.RandomState(seed).permutation(256)
+    return numpy.concatenate([perm, perm])
+
+def perlin3(x, y, z, perm):
+    """
+    Function to evaluate 3D gradient noise (improved Perlin noise) at many points at once
+
+    Arguments:
+        x : numpy.ndarray (...) - X-coordinates of the points
+        y : numpy.ndarray (...) - Y-coordinates of the points
+        z : numpy.ndarray (...) - Z-coordinates of the points, may be a scalar to evaluate a 2D slice
+        perm : numpy.ndarray (512,) - Permutation table, see permutation_table
+
+    Return values:
+        value : numpy.ndarray (...) - Noise values, roughly between -1 and 1
+    """
+
+    # Coordinates are only broadcast against each other where they are combined, so a scalar z stays cheap
+    x = numpy.asarray(x, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    z = numpy.asarray(z, dtype=float)
+
+    # Lattice cell of every point and position within the cell
+    x0 = numpy.floor(x)
+    y0 = numpy.floor(y)
+    z0 = numpy.floor(z)
+    xf = x - x0
+    yf = y - y0
+    zf = z - z0
+    xi = x0.astype(int) & 255
+    yi = y0.astype(int) & 255
+    zi = z0.astype(int) & 255
+
+    # Smooth interpolation weights (6t^5 - 15t^4 + 10t^3)
+    u = xf**3 * (xf * (xf * 6 - 15) + 10)
+    v = yf**3 * (yf * (yf * 6 - 15) + 10)
+    w = zf**3 * (zf * (zf * 6 - 15) + 10)
+
+    # Hash all 8 cell corners
+    a = perm[xi] + yi
+    b = perm[xi + 1] + yi
+    aa = perm[a] + zi
+    ab = perm[a + 1] + zi
+    ba = perm[b] + zi
+    bb = perm[b + 1] + zi
+
+    def corner(hash, dx, dy, dz):
+        # Dot product of the corner gradient with the vector from the corner to the point
+        h = perm[hash] & 15
+        return GRADIENTS_X[h] * (xf - dx) + GRADIENTS_Y[h] * (yf - dy) + GRADIENTS_Z[h] * (zf - dz)
+
+    # Interpolate the corner contributions along x, then y
+    c_aa = corner(aa, 0, 0, 0)
+    c_ab = corner(ab, 0, 1, 0)
+    x00 = c_aa + u * (corner(ba, 1, 0, 0) - c_aa)
+    x10 = c_ab + u * (corner(bb, 1, 1, 0) - c_ab)
+    xy0 = x00 + v * (x10 - x00)
+
+    # Points that lie on lattice planes of z (for example 2D slices at an integer z) do not depend on the upper corners
+    if not numpy.any(w):
+        return xy0
+
+    # Interpolate the upper corner contributions the same way, then along z
+    c_aa = corner(aa + 1, 0, 0, 1)
+    c_ab = corner(ab + 1, 0, 1, 1)
+    x01 = c_aa + u * (corner(ba + 1, 1, 0, 1) - c_aa)
+    x11 = c_ab + u * (corner(bb + 1, 1, 1, 1) - c_ab)
+    xy1 = x01 + v * (x11 - x01)
+
+    return xy0 + w * (xy1 - xy0)
+
+def fbm3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0, step=None, seed=0):
+    """
+    Function to evaluate fractal Brownian motion (several octaves of gradient noise) at many points at once, same parameters as noise.pnoise3
+
+    Arguments:
+        x : numpy.ndarray (...) - X-coordinates of the points
+        y : numpy.ndarray (...) - Y-coordinates of the points
+        z : numpy.ndarray (...) - Z-coordinates of the points, may be a scalar to evaluate a 2D slice
+        octaves : int - Number of octaves
+        persistence : float - Amplitude of every octave relative to the previous one
+        lacunarity : float - Frequency of every octave relative to the previous one
+        step : float - Spacing of the sampling points in noise coordinates, octaves finer than the sampling can resolve are skipped if given
+        seed : int - Seed of the permutation table
+
+    Return values:
+        value : numpy.ndarray (...) - Noise values, roughly between -1 and 1
+
+    Comments:
+        - Octaves with a frequency above the Nyquist limit (half a period per sampling step) would only add aliasing, skipping them makes the cost independent of the number of octaves requested
+        - The result is normalized by the sum of the amplitudes of the evaluated octaves
+    """
+
+    # Limit the number of octaves to the ones that the sampling can resolve
+    if step is not None and step > 0:
+        octaves = max(1, min(octaves, math.floor(math.log(0.5 / step, lacunarity)) + 1))
+
+    perm = permutation_table(seed)
+
+    total = 0
+    amplitude = 1
+    frequency = 1
+    max_amplitude = 0
+    for octave in range(octaves):
+        total = total + amplitude * perlin3(numpy.asarray(x) * frequency, numpy.asarray(y) * frequency, numpy.asarray(z) * frequency, perm)
+        max_amplitude = max_amplitude + amplitude
+        amplitude = amplitude * persistence
+        frequency = frequency * lacunarity
+
+    return total / max_amplitude
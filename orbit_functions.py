@@ -1,4 +1,5 @@
 import math
+import numpy
 import orbiter_class
 
 
@@ -34,6 +35,28 @@ def get_grav_acc(gm, mb_pos, sc_pos):
 
     return acc
 
+def get_grav_acc_array(gm, mb_pos, sc_pos):
+    """
+    Function that determines the current acceleration vectors of several orbiters at once based on their positions in space
+    
+    Arguments:
+        gm : float - Gravitational parameter
+        mb_pos : [float, float] - Main body position vector [m]
+        sc_pos : numpy.ndarray (N,2) - Orbiter position vectors [m]
+        
+    Return values:
+        acc : numpy.ndarray (N,2) - Current acceleration vectors [m/s^2]
+    """
+
+    # Find coordinate position differences of all orbiters relative to the main body
+    diff = numpy.asarray(sc_pos, dtype=float) - numpy.asarray(mb_pos, dtype=float)
+
+    # Determine the distances r from the orbiters to the center of mass of the object they orbit
+    r = numpy.sqrt(numpy.sum(diff**2, axis=-1, keepdims=True))
+
+    # Newtonian gravity, directed towards the main body
+    return - gm * diff / r**3
+
 def get_vel(vel_old, acc, dt):
     """
     Function that determines a new velocity vector based on the old velocity vector, the current acceleration vector and the step in time
@@ -127,6 +150,140 @@ def orbit_params(gm, main_body_pos, pos, vel):
     # Return orbit parameters as list
     return [[ellipse_length,ellipse_width], angle_periapsis, [r_periapsis, r_apoapsis]]
 
+def orbit_params_array(gm, main_body_pos, pos, vel):
+    """
+    Function to determine several orbit parameters of several orbiters at once
+    
+    Arguments:
+        gm : float - Gravitational parameter
+        main_body_pos : [float, float] - Current position vector of the main body
+        pos : numpy.ndarray (...,2) - Current position vectors of the orbiters
+        vel : numpy.ndarray (...,2) - Current velocity vectors of the orbiters
+        
+    Return values:
+        a : numpy.ndarray (...) - Semi-major axes [m], negative for hyperbolic and infinite for parabolic orbits
+        ecc : numpy.ndarray (...,2) - Eccentricity vectors, pointing from the main body towards the periapsis
+        r_periapsis : numpy.ndarray (...) - Distances of the periapsis from the main body [m]
+        r_apoapsis : numpy.ndarray (...) - Distances of the apoapsis from the main body [m], infinite for escape trajectories
+        
+    Comments:
+        Unlike orbit_params, this function is also valid for parabolic and hyperbolic (escape) trajectories
+    """
+
+    # Determine the positon of the orbiters relative to the main body center and their distance from it
+    rel_pos = numpy.asarray(pos, dtype=float) - numpy.asarray(main_body_pos, dtype=float)
+    vel = numpy.asarray(vel, dtype=float)
+    r = numpy.sqrt(numpy.sum(rel_pos**2, axis=-1))
+
+    # Calculation of the angular momentum of the orbiters (result of cross product pos x vel with 3rd component = 0)
+    h = rel_pos[..., 0] * vel[..., 1] - rel_pos[..., 1] * vel[..., 0]
+
+    # Calculation of the eccentricity vectors and scalar eccentricities
+    ecc = numpy.stack([vel[..., 1] * h / gm - rel_pos[..., 0] / r, - vel[..., 0] * h / gm - rel_pos[..., 1] / r], axis=-1)
+    e = numpy.sqrt(numpy.sum(ecc**2, axis=-1))
+
+    # Calculation of the semi-major axes from the orbit energy (vis-viva equation)
+    with numpy.errstate(divide='ignore'):
+        a = 1 / (2 / r - numpy.sum(vel**2, axis=-1) / gm)
+
+    # Distances of periapsis and apoapsis from the main body, from the semi-latus rectum so that they are defined for all orbit types
+    p = h**2 / gm
+    r_periapsis = p / (1 + e)
+    with numpy.errstate(divide='ignore'):
+        r_apoapsis = numpy.where(e < 1, p / numpy.where(e < 1, 1 - e, 1), numpy.inf)
+
+    return a, ecc, r_periapsis, r_apoapsis
+
+def time_to_periapsis(gm, main_body_pos, pos, vel):
+    """
+    Function to determine the time until the next periapsis passage of several orbiters at once
+    
+    Arguments:
+        gm : float - Gravitational parameter
+        main_body_pos : [float, float] - Current position vector of the main body
+        pos : numpy.ndarray (...,2) - Current position vectors of the orbiters
+        vel : numpy.ndarray (...,2) - Current velocity vectors of the orbiters
+        
+    Return values:
+        t : numpy.ndarray (...) - Time until the next periapsis passage [s], infinite for escape trajectories that have already passed their periapsis
+        
+    Comments:
+        - The time follows from the mean anomaly, calculated from the eccentric (elliptic orbits) or hyperbolic (escape trajectories) anomaly of the current state
+        - Parabolic trajectories are treated as hyperbolic ones
+    """
+
+    # Determine the positon of the orbiters relative to the main body center, their distance from it and the radial component of the velocity (times distance)
+    rel_pos = numpy.asarray(pos, dtype=float) - numpy.asarray(main_body_pos, dtype=float)
+    vel = numpy.asarray(vel, dtype=float)
+    r = numpy.sqrt(numpy.sum(rel_pos**2, axis=-1))
+    r_dot_v = numpy.sum(rel_pos * vel, axis=-1)
+
+    # Semi-major axes from the orbit energy (vis-viva equation), nearly parabolic trajectories get a very large negative semi-major axis
+    energy = 2 / r - numpy.sum(vel**2, axis=-1) / gm
+    a = 1 / numpy.where(numpy.abs(energy) > 1e-15 / r, energy, -1e-15 / r)
+    elliptic = a > 0
+    a_abs = numpy.abs(a)
+
+    # Elliptic orbits: eccentric anomaly E from e*cos(E) = 1 - r/a and e*sin(E) = r.v / sqrt(gm*a), mean anomaly M = E - e*sin(E)
+    e_cos = 1 - r / a_abs
+    e_sin = r_dot_v / numpy.sqrt(gm * a_abs)
+    anomaly = numpy.arctan2(e_sin, e_cos)
+    mean_anomaly_ell = (anomaly - e_sin) % (2 * math.pi)
+    t_ell = (2 * math.pi - mean_anomaly_ell) * numpy.sqrt(a_abs**3 / gm)
+
+    # Hyperbolic trajectories: hyperbolic anomaly H from e*cosh(H) = 1 + r/|a| and e*sinh(H) = r.v / sqrt(gm*|a|), mean anomaly M = e*sinh(H) - H, the periapsis is ahead only while H < 0
+    e_cosh = 1 + r / a_abs
+    e_sinh = r_dot_v / numpy.sqrt(gm * a_abs)
+    anomaly = numpy.arcsinh(e_sinh / numpy.sqrt(numpy.maximum(e_cosh**2 - e_sinh**2, 1e-30)))
+    mean_anomaly_hyp = e_sinh - anomaly
+    t_hyp = numpy.where(anomaly < 0, - mean_anomaly_hyp * numpy.sqrt(a_abs**3 / gm), numpy.inf)
+
+    return numpy.where(elliptic, t_ell, t_hyp)
+
+def conic_points(ecc, p, n_points, r_max):
+    """
+    Function to sample the path of an orbit (ellipse, parabola or hyperbola) as a polyline
+    
+    Arguments:
+        ecc : [float, float] - Eccentricity vector of the orbit, pointing from the main body towards the periapsis
+        p : float - Semi-latus rectum of the orbit [m]
+        n_points : int - Number of points to sample the path with
+        r_max : float - Distance from the main body up to which open (escape) trajectories are sampled [m]
+        
+    Return values:
+        points : numpy.ndarray (n_points,2) - Points along the path relative to the main body [m]
+        closed : bool - Whether or not the path is a closed ellipse, in which case the last point connects back to the first one
+        
+    Comments:
+        - Ellipses are sampled at evenly spaced eccentric anomalies, which spaces the points more evenly along the path than the true anomaly
+        - Open trajectories are sampled at evenly spaced true anomalies between the two points at distance r_max
+    """
+
+    e = math.hypot(ecc[0], ecc[1])
+
+    if e < 1:
+        # Points of the ellipse in the perifocal frame (periapsis on the x-axis, main body at the origin)
+        a = p / (1 - e**2)
+        b = a * (1 - e**2)**0.5
+        ecc_anomaly = numpy.linspace(-math.pi, math.pi, n_points, endpoint=False)
+        x = a * (numpy.cos(ecc_anomaly) - e)
+        y = b * numpy.sin(ecc_anomaly)
+        closed = True
+    else:
+        # Largest true anomaly at which the trajectory is still within r_max (r = p / (1 + e*cos(nu))), always short of the asymptotes
+        nu_max = math.acos(min(max((p / max(r_max, p) - 1) / e, -1), 1))
+        true_anomaly = numpy.linspace(-nu_max, nu_max, n_points)
+        r = p / (1 + e * numpy.cos(true_anomaly))
+        x = r * numpy.cos(true_anomaly)
+        y = r * numpy.sin(true_anomaly)
+        closed = False
+
+    # Rotate points from the perifocal frame by the argument of periapsis
+    angle_periapsis = math.atan2(ecc[1], ecc[0])
+    points = numpy.stack([x * math.cos(angle_periapsis) - y * math.sin(angle_periapsis), x * math.sin(angle_periapsis) + y * math.cos(angle_periapsis)], axis=-1)
+
+    return points, closed
+
 def collision_check(orbiter1, orbiter2, coll_dist, safe_vel):
     """
     Function to check for occurance and type of collision between two objects
@@ -157,4 +314,30 @@ def collision_check(orbiter1, orbiter2, coll_dist, safe_vel):
         else:
             return 2 # Unsafe/harmful collision/crash, happens if the differential speed is higher than the safe velocity
     else:
-        return 0 # No collision at all, happens if the distance between the two objects is bigger than the distance required for collision
\ No newline at end of file
+        return 0 # No collision at all, happens if the distance between the two objects is bigger than the distance required for collision
+
+def collision_check_array(pos1, vel1, pos2, vel2, coll_dist, safe_vel):
+    """
+    Function to check for occurance and type of collisions between several pairs of objects at once
+    
+    Arguments:
+        pos1 : numpy.ndarray (...,2) - Position vectors of the first objects of the pairs [m]
+        vel1 : numpy.ndarray (...,2) - Velocity vectors of the first objects of the pairs [m/s]
+        pos2 : numpy.ndarray (...,2) - Position vectors of the second objects of the pairs [m]
+        vel2 : numpy.ndarray (...,2) - Velocity vectors of the second objects of the pairs [m/s]
+        coll_dist : float - Distance at and under which a collision occurs [m]
+        safe_vel : float - Velocity at and under which a collision is safe and not harmful
+        
+    Return values:
+        Collision modes : numpy.ndarray (...) - Integer values representing the collision modes, same values as collision_check
+        
+    Comments:
+        The arguments broadcast against each other, passing pos[:, None], vel[:, None], pos[None, :], vel[None, :] gives the modes of all N x N pairs
+    """
+    
+    # Calculation of the distances and differential speeds between the objects
+    d = numpy.sqrt(numpy.sum((numpy.asarray(pos1, dtype=float) - numpy.asarray(pos2, dtype=float))**2, axis=-1))
+    v = numpy.sqrt(numpy.sum((numpy.asarray(vel1, dtype=float) - numpy.asarray(vel2, dtype=float))**2, axis=-1))
+
+    # No collision (0) if too far apart, otherwise safe collision (1) or crash (2) depending on the differential speed
+    return numpy.where(d <= coll_dist, numpy.where(v <= safe_vel, 1, 2), 0)
@@ -1,16 +1,22 @@
 import math
+import concurrent.futures
 import orbit_functions
 import pygame
-import os
 import random
 import numpy
 import worldgen
+import body_store_class
+import asset_functions
+import cache_functions
 
 
 
+# Background worker for exact rescaling of the main body texture, shared by all main bodies so that no worker threads are left behind by finished missions
+scaling_worker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 class MainBody:
 
-    def __init__(self, mass, radius, atm_thickness, planet_res):
+    def __init__(self, mass, radius, atm_thickness, planet_res, seed=None):
         """
         Main body class constructor
         
@@ -18,6 +24,8 @@ class MainBody:
             mass : float - Mass of the main body [kg]
             radius : float - Radius of the main body from center to surface [m]
             atm_thickness : float - Thickness of the planet atmosphere [m]
+            planet_res : int - Resolution of the planet texture [px]
+            seed : int - Seed of the planet texture, the texture is random if not given
         """
 
         # Set type
@@ -31,32 +39,139 @@ class MainBody:
         self.radius = radius
         self.atm_thickness = atm_thickness
         
-        # Generate planet texture
-        self.img = worldgen.gen_planet(planet_res, self.radius, self.atm_thickness, random.randint(4,8))
+        # Randomize roughness and texture seed from the planet seed
+        rng = random.Random(seed)
+        roughness = rng.randint(4,8)
+        texture_seed = rng.randrange(2**32)
+        
+        # Generate planet texture, or load it from the texture cache if a planet with the same seed and parameters has been generated before
+        if seed is None:
+            self.img = worldgen.gen_planet(planet_res, self.radius, self.atm_thickness, roughness, texture_seed)
+        else:
+            self.img = cache_functions.get_texture(['planet', planet_res, self.radius, self.atm_thickness, roughness, texture_seed],
+                                                   lambda: worldgen.gen_planet(planet_res, self.radius, self.atm_thickness, roughness, texture_seed))
         self.scaled_img = None
+
+        # Initialize the number of scaled images swapped in so far, changes whenever the drawn image changes
+        self.scaled_version = 0
+
+        # Create mipmap pyramid of the planet texture, every level is half the size of the previous one
+        self.mipmaps = [self.img]
+        while self.mipmaps[-1].get_width() > 8:
+            self.mipmaps.append(pygame.transform.smoothscale(self.mipmaps[-1], [max(1, size // 2) for size in self.mipmaps[-1].get_size()]))
+
+        # Initialize the pending rescaling job of the shared background worker
+        self.scaling_job = None
+
+        # Initialize the camera scale that the scaled image was made for, the part of the full scaled image it covers [px] and the offset of its top-left corner from the body center on the screen [px]
+        self.scaled_scale = None
+        self.scaled_area = None
+        self.scaled_offset = [0,0]
         
         # Set velocity to 0
         self.vel = [0,0]
             
-    def scale_img(self, scale):
+    def scale_img(self, camera):
         """
-        Method to scale the original image to the needed zoom level
+        Method to scale the visible part of the original image to the needed zoom level
         
         Arguments:
-            scale : float - Current scale of the viewport
+            camera : Camera instance - Current camera, defines the zoom level and which part of the main body is visible
+
+        Comments:
+            - Only the visible part of the image plus a margin of half a screen on every side is scaled, so the scaled image is at most two and a half times the screen size in each direction at any zoom level
+            - Far beyond the resolution of the texture, scaling whole texture pixels would reach far beyond the margin, the pixels of the visible part plus margin are then sampled directly from the texture instead
+            - The current image is kept as long as it has the right zoom level and covers the visible part, so panning only needs a new image once the margin has been used up
+            - An approximate image is scaled immediately from the closest mipmap level, the exact image is scaled in the background and replaces it once it is done (see update_scaled_img)
+            - Both start from the smallest mipmap level that is not smaller than the needed size, so zooming out does not scale the full texture
         """
 
-        # Determine image scaling factor needed to represent radius accurately with current camera scale
-        bodyscale = 2 * (self.radius + 2 * self.atm_thickness) * scale / self.img.get_size()[0]
+        # Determine image scaling factor and size of the full image needed to represent radius accurately with current camera scale
+        bodyscale = 2 * (self.radius + 2 * self.atm_thickness) * camera.scale / self.img.get_size()[0]
+        full_size = numpy.array(self.img.get_size()) * bodyscale
+
+        # Determine the visible part of the full scaled image in its own pixel coordinates, nothing needs to be scaled if no part is visible
+        res = numpy.array(camera.res)
+        topleft = camera.world_to_screen(self.pos) - full_size / 2
+        visible_lower = numpy.maximum(- topleft, 0)
+        visible_upper = numpy.minimum(res - topleft, full_size)
+        if numpy.any(visible_upper <= visible_lower):
+            return
+
+        # Keep the current image if it was scaled for this zoom level and covers the visible part
+        if self.scaled_scale == camera.scale and numpy.all(visible_lower >= self.scaled_area[0]) and numpy.all(visible_upper <= self.scaled_area[1]):
+            return
+
+        # Find smallest mipmap level that is at least as large as the needed image
+        level = self.mipmaps[0]
+        for mipmap in self.mipmaps:
+            if mipmap.get_width() >= full_size[0]:
+                level = mipmap
+        factor = level.get_width() / full_size[0]
+
+        # Crop the mipmap level to the visible part with a margin of half a screen on every side, rounded outwards to whole pixels of the mipmap level
+        lower = numpy.maximum(visible_lower - res / 2, 0)
+        upper = numpy.minimum(visible_upper + res / 2, full_size)
+        src_lower = numpy.floor(lower * factor).astype(int)
+        src_upper = numpy.maximum(numpy.minimum(numpy.ceil(upper * factor).astype(int), level.get_size()), src_lower + 1)
+        source = level.subsurface(pygame.Rect(src_lower.tolist(), (src_upper - src_lower).tolist()))
+        size = numpy.maximum(numpy.round((src_upper - src_lower) / factor).astype(int), 1)
+
+        # When magnifying far beyond the resolution of the texture, a single texture pixel covers a large part of the screen and the scaled texture pixels at the edges reach more than a quarter screen beyond the margin
+        # Sample the texture pixel under the center of every pixel of the visible part plus margin instead (nearest neighbour), this is the exact image at such magnifications and needs no background scaling
+        if numpy.any(size - (upper - lower) > res / 2):
+            lower = numpy.floor(lower).astype(int)
+            upper = numpy.maximum(numpy.ceil(upper).astype(int), lower + 1)
+            x = numpy.minimum(numpy.floor((numpy.arange(lower[0], upper[0]) + 0.5) * factor).astype(int) - src_lower[0], source.get_width() - 1)
+            y = numpy.minimum(numpy.floor((numpy.arange(lower[1], upper[1]) + 0.5) * factor).astype(int) - src_lower[1], source.get_height() - 1)
+            self.scaled_img = pygame.Surface((upper - lower).tolist(), level.get_flags(), level.get_bitsize(), level.get_masks())
+            pygame.surfarray.pixels2d(self.scaled_img)[...] = pygame.surfarray.array2d(source)[x][:, y]
+            self.scaled_version += 1
+
+            # Save the part of the full scaled image that is covered, its scale and the offset from the body center to its top-left corner on the screen
+            self.scaled_scale = camera.scale
+            self.scaled_area = (lower, upper)
+            self.scaled_offset = numpy.round(lower - full_size / 2).astype(int).tolist()
+
+            # A background job of a previous zoom level must not replace the sampled image
+            if self.scaling_job is not None:
+                self.scaling_job.cancel()
+                self.scaling_job = None
+            return
+        size = size.tolist()
+
+        # Save the part of the full scaled image that is covered, its scale and the offset from the body center to its top-left corner on the screen
+        self.scaled_scale = camera.scale
+        self.scaled_area = (src_lower / factor, src_lower / factor + size)
+        self.scaled_offset = numpy.round(src_lower / factor - full_size / 2).astype(int).tolist()
+
+        # Scale cropped mipmap level quickly (without smoothing) and save scaled image in attribute until the exact image is ready
+        self.scaled_img = pygame.transform.scale(source, size)
+        self.scaled_version += 1
+
+        # Start exact scaling in the background, a job that has not started yet is no longer needed
+        # The worker gets its own copy of the cropped part, the subsurface shares its pixels with the mipmap level that the main thread keeps using
+        if self.scaling_job is not None:
+            self.scaling_job.cancel()
+        self.scaling_job = scaling_worker.submit(pygame.transform.smoothscale, source.copy(), size)
+
+    def update_scaled_img(self):
+        """
+        Method to replace the approximate scaled image with the exact one once background scaling is done, called every frame
+        """
 
-        # Scale original image and save scaled image in attribute
-        self.scaled_img = pygame.transform.rotozoom(self.img, 0, bodyscale)
+        # Only the latest job is kept, so results of older zoom levels are never used
+        if self.scaling_job is not None and self.scaling_job.done():
+            if not self.scaling_job.cancelled():
+                self.scaled_img = self.scaling_job.result()
+                self.scaled_version += 1
+            self.scaling_job = None
         
 
 
 class Orbiter:
 
-    def __init__(self, m_type, pos_init, vel_init, img_path, bodyscale):
+    def __init__(self, m_type, pos_init, vel_init, img_path, bodyscale, angle=0):
         """
         Orbiter class contructor
         
@@ -66,67 +181,91 @@ class Orbiter:
             vel_ init : [float, float] - Initial velocity of the orbiter to be created [m/s]
             img_path : string - File name of the image to represent the orbiter
             bodyscale : float - Scale factor for the image
+            angle : float - Orientation of the image [deg], drawn from the mission's random number generator by the mission
         """
 
         # Set attributes
         self.type = m_type
-        self.pos = pos_init
-        self.vel = vel_init
-        self.acc = 0
         self.img_path = img_path
         self.scaled_img = None
         self.bodyscale = bodyscale
 
+        # Keep state vectors in a private single-row body store until the orbiter is added to a mission
+        body_store_class.BodyStore(1).add(self, pos_init, vel_init)
+
         # Load the image from file
-        self.load_img()
+        self.load_img(angle)
 
-    def update_acc(self, gm, main_body):
+    @property
+    def pos(self):
         """
-        Method to update acceleration vector to new value based on position vector
-        
-        Arguments:
-            gm : float - Gravitational parameter
-            main_body : MainBody instance - Instance of the main body
+        Position vector of the orbiter [m], a view onto the orbiter's row in its body store
         """
+        
+        return self.store.pos[self.index]
+
+    @pos.setter
+    def pos(self, value):
+        self.store.pos[self.index] = value
 
-        #Calculate new gravitational acceleration
-        self.acc = orbit_functions.get_grav_acc(gm, main_body.pos, self.pos)
-    
-    def update_vel(self, dt):
+    @property
+    def vel(self):
+        """
+        Velocity vector of the orbiter [m/s], a view onto the orbiter's row in its body store
         """
-        Method to update velocity vector to new value based on old velocity vector and acceleration vector
         
-        Arugments:
-            dt : float - Time increment since last simulation step [s]
+        return self.store.vel[self.index]
+
+    @vel.setter
+    def vel(self, value):
+        self.store.vel[self.index] = value
+
+    @property
+    def acc(self):
+        """
+        Acceleration vector of the orbiter [m/s^2], a view onto the orbiter's row in its body store
         """
+        
+        return self.store.acc[self.index]
+
+    @acc.setter
+    def acc(self, value):
+        self.store.acc[self.index] = value
 
-        # Calculate new velocity
-        self.vel = orbit_functions.get_vel(self.vel, self.acc, dt)
-    
-    def update_pos(self, dt):
+    def update_state(self, gm, main_body, dt, integrator):
         """
-        Method to update position to new value based on old position and velocity vector
+        Method to advance position and velocity vector by one simulation step using a numerical integrator
         
         Arguments:
+            gm : float - Gravitational parameter
+            main_body : MainBody instance - Instance of the main body
             dt : float - Time increment since last simulation step [s]
+            integrator : function - Integrator from integrator_functions used to advance the state vectors
         """
+        
+        # Gravitational acceleration as a function of the position vector
+        def acc_func(pos):
+            return orbit_functions.get_grav_acc_array(gm, main_body.pos, pos)
+        
+        # Numerical integration of position and velocity
+        self.pos, self.vel = integrator(self.pos, self.vel, acc_func, dt)
+        
+        # Update acceleration vector to the new position
+        self.acc = acc_func(self.pos)
 
-        # Calculate new position
-        self.pos = orbit_functions.get_pos(self.pos, self.vel, dt)
-    
-    def load_img(self):
-        """
-        Method to read image file from disk and save it in attributes
+    def load_img(self, angle=0):
         """
+        Method to get the image from the asset cache and save it in attributes
 
-        # Create path from folder and image file name
-        path = os.path.join('img', self.img_path)
+        Arguments:
+            angle : float - Orientation of the image [deg]
+        """
 
-        # Load image into attribute and convert pixel format for performance improvements
-        self.img = pygame.image.load(path).convert_alpha()
+        # Get shared image (read from disk and converted only once) into attribute
+        self.img = asset_functions.get_image(self.img_path)
 
-        # Scale image down to specified body scale and save scaled image in attribute
-        self.scaled_img = pygame.transform.rotozoom(self.img, random.randint(0, 360), self.bodyscale)
+        # Get image scaled down to specified body scale in the given orientation and save it in attribute
+        self.scaled_img = asset_functions.get_rotated_image(self.img_path, angle, self.bodyscale)
         
         
 
@@ -149,21 +288,22 @@ class Player(Orbiter):
 
         # Set attributes
         self.type = 1
-        self.pos = pos_init
-        self.vel = vel_init
         self.angle = 0
         self.angle_lock_mode = 0
         self.m_dry = mass_dry
         self.m_prop_start = mass_prop
         self.m_prop = mass_prop
         self.i_sp = i_sp
-        self.acc = 0
         self.img_path = img_path
         self.scaled_img = None
         self.bodyscale = bodyscale
         self.firing = 0
         self.thrust = thrust
         self.exhaust_img = None
+        self.exhaust_file = None
+
+        # Keep state vectors in a private single-row body store until the player is added to a mission
+        body_store_class.BodyStore(1).add(self, pos_init, vel_init)
 
         # Load the image from file
         self.load_img()
@@ -174,27 +314,27 @@ class Player(Orbiter):
         # Set engine sound
         # If specific impulse is above 500, assume electric propulsion system, otherwise chemical propulsion system
         if self.i_sp > 500:
-            soundpath = os.path.join('snd', 'ElectricPropulsion.ogg')
+            soundfile = 'electricpropulsion.ogg'
         else:
-            soundpath = os.path.join('snd', 'ChemicalPropulsion.ogg')
+            soundfile = 'chemicalpropulsion.ogg'
             
-        # Initialize propulsion sound 
-        self.prop_sound = pygame.mixer.Sound(soundpath)
+        # Get shared propulsion sound from the asset cache
+        self.prop_sound = asset_functions.get_sound(soundfile)
         self.prop_sound.set_volume(0.1)
             
-    def update_vel(self, dt):
+    def update_state(self, gm, main_body, dt, integrator):
         """
-        Method to update velocity vector to new value based on old velocity vector and acceleration vector, but with added functionality to modify speed through propulsion
+        Method to advance position and velocity vector by one simulation step using a numerical integrator, but with added functionality to modify speed through propulsion
         
         Arguments:
+            gm : float - Gravitational parameter
+            main_body : MainBody instance - Instance of the main body
             dt : float - Time increment since last simulation step [s]
-            
-        Comments:
-            This method is needed as the Orbiter parent class does not provide thrust functionality
+            integrator : function - Integrator from integrator_functions used to advance the state vectors
         """
-
-        # Calculate new velocity
-        self.vel = orbit_functions.get_vel(self.vel, self.acc, dt)
+        
+        # Integrate gravitational motion
+        super().update_state(gm, main_body, dt, integrator)
         
         # If propulsion system is firing, add dv vector to velocity
         if self.firing and self.m_prop > 0:
@@ -251,12 +391,12 @@ class Player(Orbiter):
         elif self.angle_lock_mode == -1: # Retrograde lock
             self.angle = math.atan2(self.vel[1], self.vel[0]) + math.pi
         
-        # Rotate player image based on angle attribute
-        self.scaled_img = pygame.transform.rotozoom(self.img, math.degrees(self.angle), self.bodyscale)
+        # Get player image rotated based on angle attribute from the cache of pre-rotated images
+        self.scaled_img = asset_functions.get_rotated_image(self.img_path, math.degrees(self.angle), self.bodyscale)
         
-        # Rotate exhaust image if thruster is firing
+        # Get rotated exhaust image if thruster is firing
         if self.firing:
-            self.scaled_exhaust_img = pygame.transform.rotozoom(self.exhaust_img, math.degrees(self.angle), self.bodyscale)
+            self.scaled_exhaust_img = asset_functions.get_rotated_image(self.exhaust_file, math.degrees(self.angle), self.bodyscale)
         
     def load_exhaust(self):
         """
@@ -265,13 +405,13 @@ class Player(Orbiter):
         
         # If the specific impulse is over 500, assume electric propulsion, otherwise chemical propulsion
         if self.i_sp > 500:
-            path = os.path.join('img', 'electricexhaust.png')
+            self.exhaust_file = 'electricexhaust.png'
         else:
-            path = os.path.join('img', 'chemicalexhaust.png')
+            self.exhaust_file = 'chemicalexhaust.png'
 
-        # Scale image down to specified body scale and save scaled image in attribute
-        self.exhaust_img = pygame.image.load(path).convert_alpha()
+        # Get shared exhaust image from the asset cache
+        self.exhaust_img = asset_functions.get_image(self.exhaust_file)
         
-        # Scale the exhaust image down to correct scale
-        self.scaled_exhaust_img = pygame.transform.rotozoom(self.exhaust_img, math.degrees(self.angle), self.bodyscale)
+        # Get the exhaust image scaled down to correct scale
+        self.scaled_exhaust_img = asset_functions.get_rotated_image(self.exhaust_file, math.degrees(self.angle), self.bodyscale)
         
@@ -1,34 +1,45 @@
 import os
 from rendezvous_class import Rendezvous
 
-# Read available missions from 'missions' subfolder
-try:
-    missions_available = os.listdir('missions')
+# Only run the game in the main process, worker processes for the texture generation import this file as well on some platforms
+if __name__ == '__main__':
+    # Generate a new seed unless the player selects one
+    seed = None
+
+    # Read available missions from 'missions' subfolder
+    try:
+        missions_available = os.listdir('missions')
     
-    # Print list of available missions
-    print('Available missions: ')
-    for mission in missions_available:
-        print(mission.split('.')[0])
+        # Print list of available missions
+        print('Available missions: ')
+        for mission in missions_available:
+            print(mission.split('.')[0])
 
-    # Ask user to select either random mission generation or a premade mission
-    while 1:
-        text = input("Please select mission to load or type 'r' to generate a random mission: ")
+        # Ask user to select either random mission generation or a premade mission
+        while 1:
+            text = input("Please select mission to load or type 'r' to generate a random mission ('r <seed>' to replay a random mission): ")
         
-        text_with_extension = text + '.txt'
+            text_with_extension = text + '.txt'
         
-        if text == 'r':
-            selection = 'r'
-            break
+            if text == 'r':
+                selection = 'r'
+                break
+
+            # Random mission with a given seed, to replay a previous random mission
+            if text.split(' ')[0] == 'r' and len(text.split(' ')) == 2 and text.split(' ')[1].isdigit():
+                selection = 'r'
+                seed = int(text.split(' ')[1])
+                break
         
-        if text_with_extension in missions_available:
-            selection = text
-            break
-        else:
-            print('Selected mission not available, please try again.')
+            if text_with_extension in missions_available:
+                selection = text
+                break
+            else:
+                print('Selected mission not available, please try again.')
     
-except FileNotFoundError:
-    selection = 'r'
+    except FileNotFoundError:
+        selection = 'r'
 
 
-# Run game with selected mission
-activemission = Rendezvous(selection)
\ No newline at end of file
+    # Run game with selected mission
+    activemission = Rendezvous(selection, seed)
\ No newline at end of file
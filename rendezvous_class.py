@@ -3,24 +3,39 @@ import random
 import math
 import random
 import os
-from itertools import combinations
+import heapq
+import zlib
+import concurrent.futures
 
 import mission_class
 import ui_class
 import orbiter_class
 import io_functions
 import orbit_functions
+import integrator_functions
+import collision_functions
+import event_functions
+import conjunction_functions
+import debris_class
+import asset_functions
+import worldgen
+import cache_functions
+import numpy
 
 
 
+# Background worker for conjunction screening, so that screening many fragments does not stall the frames it falls into
+screening_worker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 class Rendezvous:
 
-    def __init__(self, mission_file):
+    def __init__(self, mission_file, seed=None):
         """
         Main game class constructor
-        
+
         Arugments:
             mission_file : string - File name of the mission file to load OR 'r' in case player wants to generate a random mission
+            seed : int - Seed of the mission and of the generated textures, random for random missions and fixed per mission file for premade missions if not given
         """
 
         # Set gravitational constant
@@ -28,34 +43,69 @@ class Rendezvous:
 
         # Read config file
         self.read_config()
-        
+
+        # Set seed, print seeds of random missions so that they can be replayed
+        if seed is None:
+            if mission_file == 'r':
+                seed = random.randrange(2**32)
+                print('Mission seed: ' + str(seed))
+            else:
+                seed = zlib.crc32(mission_file.encode())
+        self.seed = seed
+
         # Set window icon
-        icon = pygame.image.load(os.path.join('img', 'icon.png'))
+        icon = asset_functions.get_image('icon.png', convert=False)
         pygame.display.set_icon(icon)
 
         # Spawn pygame window
         self.ui = ui_class.UI(self)
-        
+
         # Set window title
         pygame.display.set_caption('Rendezvous')
 
+        # Load all images and sounds into the asset cache, so that no file has to be read from disk once the mission is running
+        asset_functions.preload()
+
         # Read mission from selected mission file
-        self.mission =  mission_class.Mission('missions', mission_file, self.planet_res)
+        self.mission =  mission_class.Mission('missions', mission_file, self.planet_res, debris_class.DebrisField(self.debris_fragments, self.debris_dv, self.debris_spread), self.seed)
 
         # Find main body in list of bodies and calculate the gravitational parameter from it
         for body in self.mission.bodies:
             if type(body) == orbiter_class.MainBody:
                 self.gravparam = body.mass * self.grav_const
-                body.scale_img(self.ui.scale)
+                body.scale_img(self.ui.camera)
                 break
 
         # Set the current mission state to mission ongoing
         self.mission_state = 0
-        
+
         # Set collision parameters
         self.collision_dist = 500e3
         self.safe_vel = 1000
 
+        # Set conjunction screening parameters: separation threshold [m], look-ahead time span [s] and real time between screenings [s]
+        self.screening_dist = 2 * self.collision_dist
+        self.screening_horizon = 6 * 3600
+        self.screening_interval = 1
+
+        # Initialize list of upcoming conjunctions and real time since the last screening [s], screen at the first frame
+        self.conjunctions = []
+        self.screening_timer = self.screening_interval
+
+        # Initialize the screening job running in the background, with the simulation time and bodies it was started for
+        self.screening_job = None
+        self.screening_time = 0
+        self.screening_bodies = []
+
+        # Initialize simulation time [s]
+        self.sim_time = 0
+
+        # Initialize backlog of simulated time that has elapsed but has not been processed by physics substeps yet [s]
+        self.sim_backlog = 0
+
+        # Initialize next predicted event as (event name, simulation time of the event [s]), set when warping to the next event
+        self.next_event = None
+
         # Run main game loop
         self.game_loop()
 
@@ -70,13 +120,13 @@ class Rendezvous:
 
         # Read resultion from config file
         self.res = cfg['resolution']
-        
+
         # Read fullscreen mode from config file
         self.fullscreen = cfg['fullscreen']
-        
+
         # Read target fps from config file
         self.target_fps = cfg['fps']
-        
+
         # Read HUD color from config file
         self.hud_color = cfg['hud_color']
 
@@ -88,13 +138,51 @@ class Rendezvous:
 
         # Read zoom speed for camera zoom in/out from config
         self.zoom_speed = cfg['zoom_speed']
-        
+
         # Read desired planet resolution
         self.planet_res = cfg['planet_res']
-        
+
+        # Read number of worker processes for planet texture generation
+        worldgen.processes = cfg['worldgen_processes']
+
+        # Read maximum size of the texture cache [MB]
+        cache_functions.max_size = cfg['texture_cache_size'] * 1e6
+
         # Read whether or not nebulae should be generated for the background
         self.generate_nebulae = cfg['generate_nebulae']
 
+        # Read maximum simulation time factor
+        self.max_timefactor = cfg['max_timefactor']
+
+        # Read numerical integrator used for propagation of thrusting bodies
+        self.integrator = integrator_functions.get_integrator(cfg['integrator'])
+
+        # Read angular resolution of the pre-rotated orbiter images [deg]
+        asset_functions.angle_resolution = cfg['sprite_angle_resolution']
+
+        # Read maximum simulation time increment of a single physics substep [s]
+        self.physics_step = cfg['physics_step']
+
+        # Read maximum simulation time increment of a single substep while no body is thrusting [s]
+        self.coast_step = cfg['coast_step']
+
+        # Read maximum number of physics substeps per frame
+        self.max_substeps = cfg['max_substeps']
+
+        # Read catch-up budget, the maximum amount of unprocessed simulation time that is kept to be caught up in later frames [s of real time]
+        self.catchup_time = cfg['catchup_time']
+
+        # Read look-ahead time span of the event prediction for warping to the next event [s]
+        self.event_horizon = cfg['event_horizon']
+
+        # Read time span before a predicted event at which a warp to the next event stops [s]
+        self.event_lead = cfg['event_lead']
+
+        # Read fragmentation model parameters: number of fragments per crashed body, typical ejection speed [m/s] and scatter radius [m]
+        self.debris_fragments = cfg['debris_fragments']
+        self.debris_dv = cfg['debris_dv']
+        self.debris_spread = cfg['debris_spread']
+
 
     def game_loop(self):
         """
@@ -194,11 +282,16 @@ class Rendezvous:
                         if self.timefactor / self.timefactor_mult >= 1:
                             self.timefactor = self.timefactor / self.timefactor_mult
 
-                    # Right arrow key, speed up simulation time to a maximum of 10000x real time
+                    # Right arrow key, speed up simulation time up to the maximum simulation time factor
                     elif event.key == pygame.K_RIGHT:
-                        if self.timefactor * self.timefactor_mult <= 1000:
+                        if self.timefactor * self.timefactor_mult <= self.max_timefactor:
                             self.timefactor = self.timefactor * self.timefactor_mult
 
+                    # W key, warp to shortly before the next predicted event
+                    elif event.key == pygame.K_w:
+                        if not self.mission_state:
+                            self.warp_to_next_event()
+
                     # Up arrow key, switch lock mode up
                     elif event.key == pygame.K_UP:
                         if player_body is not None and player_body.angle_lock_mode < 1:
@@ -209,127 +302,429 @@ class Rendezvous:
                         if player_body is not None and player_body.angle_lock_mode > -1:
                             player_body.angle_lock_mode -= 1
 
-            # If frame rate is below a certain threshold (example: frame drawing stops when window is moved), stop simulation to avoid grossly wrong orbit updates
-            if dt / self.timefactor <= 1/20:
-                
-                # Find main body object in list of bodies for future orbiting body member call (gravitational acceleration update requires main body position)
-                main_body = None
-                for body in self.mission.bodies:
-                    if body.type == -1: # Main body type = -1
-                        main_body = body
-                        break
-
-                # Orbit state vector updates for all bodies
-                for body in self.mission.bodies:
-                    # Only update for all orbiting bodies, not for main body
-                    if body.type >= 0:
-
-                        # Update current acceleration vector
-                        body.update_acc(self.gravparam, main_body)
-
-                        # If body is the player body, rotate craft into correct position first
-                        if body.type == 1:
-                            body.rotate_to_angle(self.ui.get_mouse_angle(body))
-                        
-                        # Update body velocity vector
-                        body.update_vel(dt)
-
-                        # Update current body position vector based on current body velocity vector
-                        body.update_pos(dt)
-
-
-                #Collision check between all bodies 
-                for body_combo in combinations(self.mission.bodies, 2):
-                    
-                    # Check for collisions between certain body types
-                    if not (body_combo[0].type or body_combo[1].type): # Do not consider debris-debris collisions, debris type value is 0, not(A or B) yields 1 only if A and B are False
-                        continue
-                    elif body_combo[0].type == -1: # If first body in combo is main body
-                        collision_mode = orbit_functions.collision_check(body_combo[0], body_combo[1], body_combo[0].radius + body_combo[0].atm_thickness * 1.5, 0)
-                        if collision_mode > 0:
-                            if body_combo[1].type == 1: # If second body is the player, set mission to failed by deorbit
-                                #Update mission state, but only if mission is still ongoing
-                                if not self.mission_state:
-                                    self.mission_state = 2
-                            
-                            try: # Delete original body if it hasn't been removed by another collision
-                                self.mission.bodies.remove(body_combo[1])
-                            except ValueError:
-                                pass
-                    elif body_combo[1].type == -1: # If second body in combo is main body
-                        collision_mode = orbit_functions.collision_check(body_combo[1], body_combo[0], body_combo[1].radius + body_combo[1].atm_thickness * 1.5, 0)
-                        if collision_mode > 0:
-                            if body_combo[0].type == 1: # If first body is the player, set mission to failed by deorbit
-                                #Update mission state, but only if mission is still ongoing
-                                if not self.mission_state:
-                                    self.mission_state = 2
-                            try: # Delete original body if it hasn't been removed by another collision
-                                self.mission.bodies.remove(body_combo[0])
-                            except ValueError:
-                                pass
-                    else:
-                        collision_mode = orbit_functions.collision_check(body_combo[0], body_combo[1], self.collision_dist, self.safe_vel)
-                        
-                        if collision_mode == 2: # Crash
-                            
-                            #Update mission state, but only if mission is still ongoing
-                            if not self.mission_state:
-                                # If crash is with target
-                                if (body_combo[0].type == 1 and body_combo[1].type == 2) or (body_combo[1].type == 1 and body_combo[0].type == 2):
-                                    self.mission_state = 3
-                                
-                                # If crash is with another orbiting body
-                                elif (body_combo[0].type == 1 and body_combo[1].type == 3) or (body_combo[1].type == 1 and body_combo[0].type == 3):
-                                    self.mission_state = 4
-                                    
-                                # If crash is with debris
-                                elif (body_combo[0].type == 1 and body_combo[1].type == 0) or (body_combo[1].type == 1 and body_combo[0].type == 0):
-                                    self.mission_state = 5
-                                    
-                                # If target crashed with another orbiting body
-                                elif (body_combo[0].type == 2 and body_combo[1].type == 3) or (body_combo[1].type == 2 and body_combo[0].type == 3):
-                                    self.mission_state = 6
-                                    
-                                # If target crashed with debris
-                                elif (body_combo[0].type == 2 and body_combo[1].type == 0) or (body_combo[1].type == 2 and body_combo[0].type == 0):
-                                    self.mission_state = 7
-                            
-                            
-                            debris_spawn_count = 7 # Number of debris objects to spawn on crash. Only exact for odd numbers!
-                            debris_spawn_range = debris_spawn_count // 2
-                            
-                            
-                            for i in range(-debris_spawn_range, debris_spawn_range):
-                                #Debris scaling
-                                debris_scale_0 = body_combo[0].bodyscale * (1 - 1/(debris_spawn_count) * abs(i)) * 0.5
-                                debris_scale_1 = body_combo[0].bodyscale * (1 - 1/(debris_spawn_count) * abs(i)) * 0.5
-                                
-                                #Debris orbit variation
-                                debris_pos_0 = [body_combo[0].pos[0] + 5000 * i, body_combo[0].pos[1] + 5000 * i]
-                                debris_pos_1 = [body_combo[1].pos[0] + 5000 * i, body_combo[1].pos[1] + 5000 * i]
-                                debris_vel_0 = [body_combo[0].vel[0] + 100 * i, body_combo[0].vel[1] + 100 * i]
-                                debris_vel_1 = [body_combo[1].vel[0] + 100 * i, body_combo[1].vel[1] + 100 * i]
-                                
-                                self.mission.bodies.append(orbiter_class.Orbiter(0, debris_pos_0, body_combo[0].vel, 'debris.png', debris_scale_0))
-                                self.mission.bodies.append(orbiter_class.Orbiter(0, debris_pos_1, body_combo[1].vel, 'debris.png', debris_scale_1))
-                            
-                            try: # Delete both original bodies if they haven't been removed by another collision
-                                self.mission.bodies.remove(body_combo[0])
-                                self.mission.bodies.remove(body_combo[1])
-                                
-                            # Catching potential errors, I was not able to weed out all errors and the only unexpected error that occurs is a value error, so ValueErrors are passed
-                            except ValueError:
-                                pass
-                          
-                        elif collision_mode == 1: # Rendezvous
-                            if ((body_combo[0].type == 1 and body_combo[1].type == 2) or #If the two bodies are player and target
-                                (body_combo[1].type == 1 and body_combo[0].type == 2)):
-                                self.mission_state = 1 # Mission successful
-                        
+            # Add the simulated time elapsed since last frame to the backlog of simulated time still to be processed, bounded by the catch-up budget
+            self.sim_backlog = min(self.sim_backlog + dt, self.catchup_time * self.timefactor)
+
+            # Rotate player craft into correct position, once per frame as the mouse pointer only moves between frames
+            if player_body is not None:
+                player_body.rotate_to_angle(self.ui.get_mouse_angle(player_body))
+
+            # Numerically integrated (thrusting) bodies need the fixed physics step, coasting bodies are propagated exactly and only need substeps for collision checks
+            if player_body is not None and player_body.firing:
+                max_dt_substep = self.physics_step
+            else:
+                max_dt_substep = self.coast_step
+
+                # Jump over the part of the backlog before the next predicted collision or atmosphere entry in one exact step, so that the cost per frame does not grow with the simulation time factor
+                # The jump ends one coast step before the event, the event itself is processed by substeps with collision checks
+                if self.sim_backlog > self.coast_step:
+                    events = self.predict_events(self.sim_backlog, approach=False)
+                    dt_jump = max(events[0][0] - self.coast_step, 0) if events else self.sim_backlog
+                    if dt_jump > 0:
+                        self.jump_physics(dt_jump)
+                        self.sim_backlog = self.sim_backlog - dt_jump
+
+            # Split the backlog into equal substeps no longer than the maximum substep length, but not more substeps than the substep cap allows
+            n_substeps = min(math.ceil(self.sim_backlog / max_dt_substep), self.max_substeps)
+            if n_substeps > 0:
+                dt_substep = min(self.sim_backlog / n_substeps, max_dt_substep)
+
+                # Run physics substeps, time that does not fit into this frame's substeps stays in the backlog and is caught up in the next frames
+                for substep in range(n_substeps):
+                    self.step_physics(dt_substep)
+
+                self.sim_backlog = max(self.sim_backlog - n_substeps * dt_substep, 0)
+
+            # Take over the upcoming conjunctions once the background screening is done
+            self.update_conjunctions()
+
+            # Screen for upcoming conjunctions in regular intervals of real time, a new screening is only started once the previous one is done
+            self.screening_timer = self.screening_timer + dt_frame
+            if self.screening_timer >= self.screening_interval and self.screening_job is None:
+                self.screen_conjunctions()
+                self.screening_timer = 0
+
             # Call to function that handles several non-rendering tasks that have to be executed every frame
             self.ui.frame_routine()
 
             # Render screen
             self.ui.render()
 
-        pygame.quit() #End game
\ No newline at end of file
+        pygame.quit() #End game
+
+
+    def step_physics(self, dt):
+        """
+        Method to advance the simulation by one fixed physics substep; Updates all body state vectors and handles collisions
+
+        Arguments:
+            dt : float - Simulation time increment of the substep [s]
+        """
+
+        # Find main body object and player body in list of bodies (gravitational acceleration update requires main body position)
+        main_body = None
+        player_body = None
+        for body in self.mission.bodies:
+            if body.type == -1: # Main body type = -1
+                main_body = body
+            elif body.type == 1: # Player body type = 1
+                player_body = body
+
+        # Save state vectors at the start of the step for the swept collision checks
+        store = self.mission.store
+        debris = self.mission.debris
+        pos_old = store.pos[:store.n].copy()
+        vel_old = store.vel[:store.n].copy()
+        debris_pos_old = debris.pos[:debris.n].copy()
+        debris_vel_old = debris.vel[:debris.n].copy()
+
+        # Advance all coasting bodies analytically in one batched step, the player only coasts while its thrusters are not firing
+        if player_body is not None and player_body.firing:
+            coasting_rows = numpy.flatnonzero(numpy.arange(store.n) != player_body.index)
+        else:
+            coasting_rows = None
+        store.step(self.gravparam, main_body.pos, self.sim_time, dt, coasting_rows)
+
+        # Advance all debris fragments analytically in one batched step
+        debris.step(self.gravparam, main_body.pos, self.sim_time, dt)
+
+        # Numerically integrate the thrusting player body, then restart its analytic propagation from the new state
+        if coasting_rows is not None:
+            player_body.update_state(self.gravparam, main_body, dt, self.integrator)
+            store.rebase([player_body.index], main_body.pos, self.sim_time + dt)
+
+        # Update simulation time
+        self.sim_time = self.sim_time + dt
+
+        # Check for collisions along the paths of all bodies within the step
+        self.check_collisions(pos_old, vel_old, debris_pos_old, debris_vel_old, dt)
+
+
+    def warp_to_next_event(self):
+        """
+        Method to advance the simulation in a single jump to shortly before the next predicted event
+        
+        Comments:
+            - Only possible while the player's thrusters are not firing, as all bodies must follow their orbits exactly during the jump
+            - If no event is predicted within the look-ahead time span, the simulation jumps ahead by the whole time span
+        """
+
+        # Find player body in list of bodies
+        player_body = None
+        for body in self.mission.bodies:
+            if body.type == 1: # Player body type = 1
+                player_body = body
+
+        # Thrusting bodies are integrated numerically and cannot be jumped ahead
+        if player_body is not None and player_body.firing:
+            return
+
+        # Predict upcoming events from the current orbits of all bodies and debris fragments
+        events = self.predict_events(self.event_horizon)
+
+        # Determine jump time from the earliest event, if the event is already closer than the lead time only half of the remaining time is used as lead
+        if events:
+            t_event, kind, i, j = heapq.heappop(events)
+            dt_jump = t_event - min(self.event_lead, t_event / 2)
+            self.next_event = (event_functions.EVENT_NAMES[kind], self.sim_time + t_event)
+        else:
+            dt_jump = self.event_horizon
+            self.next_event = None
+
+        if dt_jump <= 0:
+            return
+
+        # Advance all bodies and fragments along their orbits in one step, no collision can happen in between as no event was predicted before
+        self.jump_physics(dt_jump)
+
+        # Discard simulated time that was still to be processed
+        self.sim_backlog = 0
+
+        # Upcoming conjunctions have changed, discard the screening of the state before the jump and screen again in the next frame
+        if self.screening_job is not None:
+            self.screening_job.cancel()
+        self.screening_job = None
+        self.screening_timer = self.screening_interval
+
+
+    def predict_events(self, horizon, approach=True):
+        """
+        Method to predict the upcoming events from the current orbits of all bodies in the body store and all debris fragments
+
+        Arguments:
+            horizon : float - Look-ahead time span [s]
+            approach : bool - Whether the closest approach of player and target is predicted
+
+        Return values:
+            events : [(float, string, int, int)] - Priority queue (heapq) of the predicted events, same as event_functions.predict_events
+        """
+
+        # Find main body object in list of bodies
+        main_body = None
+        for body in self.mission.bodies:
+            if body.type == -1: # Main body type = -1
+                main_body = body
+                break
+
+        store = self.mission.store
+        debris = self.mission.debris
+        return event_functions.predict_events(self.gravparam, main_body, list(store.bodies), horizon, self.coast_step, self.collision_dist, debris.pos[:debris.n], debris.vel[:debris.n], store.elements(self.gravparam, main_body.pos)[:4], approach)
+
+    def jump_physics(self, dt):
+        """
+        Method to advance all bodies and debris fragments along their orbits in a single exact step
+
+        Arguments:
+            dt : float - Simulation time increment of the jump [s]
+
+        Comments:
+            - Only valid while no body is thrusting and no event is predicted within the jump, collisions and atmosphere entries of bodies are not checked
+            - Fragments are not watched for atmosphere entry by the event prediction, the fragments that deorbit during the jump are removed at its end
+        """
+
+        # Find main body object in list of bodies
+        main_body = None
+        for body in self.mission.bodies:
+            if body.type == -1: # Main body type = -1
+                main_body = body
+                break
+
+        store = self.mission.store
+        debris = self.mission.debris
+
+        # Find the fragments whose orbits reach into the atmosphere and that pass their periapsis during the jump
+        # The part of an orbit within the atmosphere is centered on the periapsis, so a fragment that has not passed its periapsis can only have entered the atmosphere if it is still in it at the end of the jump (checked after the jump)
+        r_atm = main_body.radius + main_body.atm_thickness * 1.5
+        _, _, r_periapsis, _ = orbit_functions.orbit_params_array(self.gravparam, main_body.pos, debris.pos[:debris.n], debris.vel[:debris.n])
+        t_periapsis = orbit_functions.time_to_periapsis(self.gravparam, main_body.pos, debris.pos[:debris.n], debris.vel[:debris.n])
+        deorbiting = (r_periapsis <= r_atm) & (t_periapsis <= dt)
+
+        # Advance all bodies and fragments along their orbits in one step
+        store.step(self.gravparam, main_body.pos, self.sim_time, dt)
+        debris.step(self.gravparam, main_body.pos, self.sim_time, dt)
+
+        # Remove deorbited fragments, passed the periapsis within the atmosphere or in the atmosphere at the end of the jump
+        r = numpy.sqrt(numpy.sum((debris.pos[:debris.n] - main_body.pos)**2, axis=-1))
+        debris.remove(numpy.flatnonzero(deorbiting | (r <= r_atm)))
+        self.sim_time = self.sim_time + dt
+
+
+    def screen_conjunctions(self):
+        """
+        Method to start screening all orbiting bodies for upcoming conjunctions in the background, used for display in the HUD
+        
+        Comments:
+            - The screening gets its own copies of the state vectors and orbital elements, so the simulation can go on while it runs
+            - The result is taken over by update_conjunctions once the screening is done
+        """
+
+        # Find main body object in list of bodies
+        main_body = None
+        for body in self.mission.bodies:
+            if body.type == -1: # Main body type = -1
+                main_body = body
+                break
+
+        # Screen all bodies in the body store, using their cached orbital elements, and all debris fragments, appended as type 0 rows
+        store = self.mission.store
+        debris = self.mission.debris
+        debris_elements = orbit_functions.orbit_params_array(self.gravparam, main_body.pos, debris.pos[:debris.n], debris.vel[:debris.n])
+        elements = [numpy.concatenate([store_element, debris_element]) for store_element, debris_element in zip(store.elements(self.gravparam, main_body.pos)[:4], debris_elements)]
+        self.screening_job = screening_worker.submit(conjunction_functions.screen_conjunctions, self.gravparam, numpy.array(main_body.pos, dtype=float),
+                                                     numpy.concatenate([store.pos[:store.n], debris.pos[:debris.n]]),
+                                                     numpy.concatenate([store.vel[:store.n], debris.vel[:debris.n]]),
+                                                     numpy.concatenate([store.type[:store.n], numpy.zeros(debris.n, dtype=int)]),
+                                                     self.screening_horizon, self.screening_dist, self.coast_step, elements)
+
+        # Save the simulation time and the bodies that the indices of the result refer to, debris fragments have no body object and are saved as None
+        self.screening_time = self.sim_time
+        self.screening_bodies = list(store.bodies) + [None] * debris.n
+
+    def update_conjunctions(self):
+        """
+        Method to take over the upcoming conjunctions once the background screening is done, called every frame
+        
+        Comments:
+            Conjunctions are saved as (simulation time of closest approach [s], miss distance [m], relative speed [m/s], first body, second body), debris fragments are saved as None instead of a body
+        """
+
+        if self.screening_job is None or not self.screening_job.done():
+            return
+
+        # Convert to simulation time and body objects, as times and indices change with every step
+        conjunctions = self.screening_job.result()
+        bodies = self.screening_bodies
+        self.conjunctions = [(self.screening_time + t, miss, speed, bodies[i], bodies[j]) for t, miss, speed, i, j in conjunctions]
+        self.screening_job = None
+
+
+    def check_collisions(self, pos_old, vel_old, debris_pos_old, debris_vel_old, dt):
+        """
+        Method to check for collisions between all bodies and debris fragments within the last simulation step and to update the mission state, body list and debris field accordingly
+
+        Arguments:
+            pos_old : numpy.ndarray (N,2) - Position vectors of all bodies in the body store at the start of the step [m]
+            vel_old : numpy.ndarray (N,2) - Velocity vectors of all bodies in the body store at the start of the step [m/s]
+            debris_pos_old : numpy.ndarray (F,2) - Position vectors of all debris fragments at the start of the step [m]
+            debris_vel_old : numpy.ndarray (F,2) - Velocity vectors of all debris fragments at the start of the step [m/s]
+            dt : float - Simulation time increment of the step [s]
+
+        Comments:
+            The paths of the bodies within the step are checked (not only their end positions), so that fast bodies cannot pass through each other at high simulation speeds
+        """
+
+        # Find main body object in list of bodies
+        main_body = None
+        for body in self.mission.bodies:
+            if body.type == -1: # Main body type = -1
+                main_body = body
+                break
+
+        # Take a snapshot of the state of all orbiting bodies, removing bodies reorders the body store
+        store = self.mission.store
+        bodies = list(store.bodies)
+        pos = store.pos[:store.n].copy()
+        vel = store.vel[:store.n].copy()
+        types = store.type[:store.n].copy()
+
+        # Deorbit check for all bodies at once, bodies whose path comes closer to the main body than the atmosphere margin deorbit
+        deorbit_modes, deorbit_toi, _ = collision_functions.swept_collision_check_array(pos_old - main_body.pos,
+                                                                                       pos - main_body.pos,
+                                                                                       vel_old,
+                                                                                       vel,
+                                                                                       dt,
+                                                                                       main_body.radius + main_body.atm_thickness * 1.5,
+                                                                                       numpy.inf)
+
+        # Broad phase, find candidate pairs of bodies that are in the same or neighbouring grid cells
+        # Midpoints of the paths are hashed with the cells enlarged by the largest distance travelled, so that no pair can be missed
+        travelled = numpy.sqrt(numpy.sum((pos - pos_old)**2, axis=-1))
+        pair_i, pair_j = collision_functions.spatial_hash_pairs((pos + pos_old) / 2, self.collision_dist + travelled.max(initial=0))
+
+        # Do not consider debris-debris collisions, debris type value is 0
+        keep = (types[pair_i] != 0) | (types[pair_j] != 0)
+        pair_i = pair_i[keep]
+        pair_j = pair_j[keep]
+
+        # Narrow phase, find minimum separation and time of impact of candidate pairs within the step
+        collision_modes, collision_toi, _ = collision_functions.swept_collision_check_array(pos_old[pair_i] - pos_old[pair_j],
+                                                                                          pos[pair_i] - pos[pair_j],
+                                                                                          vel_old[pair_i] - vel_old[pair_j],
+                                                                                          vel[pair_i] - vel[pair_j],
+                                                                                          dt,
+                                                                                          self.collision_dist,
+                                                                                          self.safe_vel)
+
+        # Deorbit check for all debris fragments at once
+        debris = self.mission.debris
+        debris_deorbit_modes, debris_deorbit_toi, _ = collision_functions.swept_collision_check_array(debris_pos_old - main_body.pos,
+                                                                                                     debris.pos[:debris.n] - main_body.pos,
+                                                                                                     debris_vel_old,
+                                                                                                     debris.vel[:debris.n],
+                                                                                                     dt,
+                                                                                                     main_body.radius + main_body.atm_thickness * 1.5,
+                                                                                                     numpy.inf)
+
+        # Collisions of debris fragments with the bodies
+        fragment_hit, fragment_body, fragment_modes, fragment_toi = debris.check_collisions(debris_pos_old, debris_vel_old, pos_old, vel_old, pos, vel, dt, self.collision_dist, self.safe_vel)
+
+        # Handle deorbits and collisions in the order in which they happened within the step
+        # Event types: 0 = body deorbited, 1 = collision of two bodies, 2 = fragment deorbited, 3 = collision of a fragment with a body
+        events = sorted([(deorbit_toi[k], 0, k) for k in numpy.flatnonzero(deorbit_modes)] +
+                        [(collision_toi[k], 1, k) for k in numpy.flatnonzero(collision_modes)] +
+                        [(debris_deorbit_toi[k], 2, k) for k in numpy.flatnonzero(debris_deorbit_modes)] +
+                        [(fragment_toi[k], 3, k) for k in range(len(fragment_hit))])
+
+        # Fragments are only removed after all events are handled, so that fragment indices stay valid
+        removed_fragments = set()
+
+        for toi, event_type, k in events:
+
+            # Body deorbited, remove body
+            if event_type == 0:
+                if bodies[k].type == 1: # If the body is the player, set mission to failed by deorbit
+                    #Update mission state, but only if mission is still ongoing
+                    if not self.mission_state:
+                        self.mission_state = 2
+
+                try: # Delete original body if it hasn't been removed by another collision
+                    self.mission.remove_body(bodies[k])
+                except ValueError:
+                    pass
+                continue
+
+            # Fragment deorbited, remove fragment
+            if event_type == 2:
+                removed_fragments.add(k)
+                continue
+
+            # Fragment collided with a body, skip if either of them has been removed by an earlier event
+            if event_type == 3:
+                body = bodies[fragment_body[k]]
+                if fragment_hit[k] in removed_fragments or body not in self.mission.bodies:
+                    continue
+
+                # Crash, the body breaks up into fragments and the fragment is destroyed, a slow fragment is harmless
+                if fragment_modes[k] == 2:
+                    self.update_crash_state((body.type, 0))
+                    debris.fragment(body.pos, body.vel, body.bodyscale)
+                    self.mission.remove_body(body)
+                    removed_fragments.add(fragment_hit[k])
+                continue
+
+            # Body collided with a body, skip if either of them has been removed by an earlier event
+            body_combo = (bodies[pair_i[k]], bodies[pair_j[k]])
+            collision_mode = collision_modes[k]
+            if body_combo[0] not in self.mission.bodies or body_combo[1] not in self.mission.bodies:
+                continue
+
+            if collision_mode == 2: # Crash
+
+                # Update mission state
+                self.update_crash_state((body_combo[0].type, body_combo[1].type))
+
+                # Break both bodies up into debris fragments and delete the original bodies
+                for body in body_combo:
+                    debris.fragment(body.pos, body.vel, body.bodyscale)
+                    self.mission.remove_body(body)
+
+            elif collision_mode == 1: # Rendezvous
+                if ((body_combo[0].type == 1 and body_combo[1].type == 2) or #If the two bodies are player and target
+                    (body_combo[1].type == 1 and body_combo[0].type == 2)):
+                    # Mission successful, but only if mission is still ongoing
+                    if not self.mission_state:
+                        self.mission_state = 1
+
+        # Remove destroyed and deorbited fragments
+        debris.remove(list(removed_fragments))
+
+
+    def update_crash_state(self, type_combo):
+        """
+        Method to update the mission state after a crash, but only if the mission is still ongoing
+
+        Arguments:
+            type_combo : (int, int) - Type codes of the two crashed objects
+        """
+
+        #Update mission state, but only if mission is still ongoing
+        if not self.mission_state:
+            # If crash is with target
+            if (type_combo[0] == 1 and type_combo[1] == 2) or (type_combo[1] == 1 and type_combo[0] == 2):
+                self.mission_state = 3
+
+            # If crash is with another orbiting body
+            elif (type_combo[0] == 1 and type_combo[1] == 3) or (type_combo[1] == 1 and type_combo[0] == 3):
+                self.mission_state = 4
+
+            # If crash is with debris
+            elif (type_combo[0] == 1 and type_combo[1] == 0) or (type_combo[1] == 1 and type_combo[0] == 0):
+                self.mission_state = 5
+
+            # If target crashed with another orbiting body
+            elif (type_combo[0] == 2 and type_combo[1] == 3) or (type_combo[1] == 2 and type_combo[0] == 3):
+                self.mission_state = 6
+
+            # If target crashed with debris
+            elif (type_combo[0] == 2 and type_combo[1] == 0) or (type_combo[1] == 2 and type_combo[0] == 0):
+                self.mission_state = 7
\ No newline at end of file
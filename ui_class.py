@@ -2,12 +2,15 @@ import pygame, pygame.freetype
 import os
 import math
 import random
-import noise
+import noise_functions
+import cache_functions
 import numpy
 
 import orbiter_class
 import orbit_functions
 import worldgen
+import asset_functions
+import camera_class
 
 class UI:
 
@@ -28,8 +31,8 @@ class UI:
         else:
             self.screen = pygame.display.set_mode(self.game_instance.res, pygame.RESIZABLE | pygame.DOUBLEBUF)
 
-        # Set default camera scale and target scale
-        self.scale = 0.00001
+        # Create camera with the default scale, the camera defines which part of the scene is shown on the screen
+        self.camera = camera_class.Camera(self.game_instance.res, 0.00001)
 
         # Initialize camera move state
         self.moving = 0
@@ -37,21 +40,46 @@ class UI:
         # Initialize time elapsed since last frame
         self.dt = 0
 
-        # Initialize scene center position of the screen in pixels with reference at the center of window
-        self.center = [0,0]
-
         # Initialize mouse position variables to keep track of mouse movement
         self.mouse_pos_old = [0,0]
         self.mouse_pos = [0,0]
         
         # Initialize draw-orbits flag
         self.draw_orbits_toggle = 1
+
+        # Set on-screen spacing of the points that orbit paths are drawn with [px] and maximum number of points per orbit path
+        self.orbit_point_spacing = 6
+        self.max_orbit_points = 2000
+
+        # Set display names of the orbiter types for the HUD
+        self.type_names = {0 : 'Debris', 1 : 'Player', 2 : 'Target', 3 : 'Hazard'}
+
+        # Initialize cache of font objects per font size
+        self.fonts = {}
+
+        # Initialize caches of rendered text surfaces of the current and the last frame, keyed by (text, size, color)
+        self.text_cache = {}
+        self.text_cache_old = {}
         
         # Draw splash/loading screen
         self.draw_splashscreen()
         
-        # Create and save background surface
-        self.bg = self.create_background(self.game_instance.res)
+        # Create background surface once at the largest size the screen can have (at least the desktop size), resizing the window only crops it
+        desktop_res = max(pygame.display.get_desktop_sizes(), key=lambda size: size[0] * size[1])
+        self.bg_full = self.create_background([max(self.game_instance.res[0], desktop_res[0]), max(self.game_instance.res[1], desktop_res[1])], self.game_instance.seed)
+        
+        # Fit background surface to the current resolution
+        self.bg = self.fit_background(self.game_instance.res)
+
+        # Initialize static layer (background, main body and orbits), only redrawn when its contents change, and the state it was drawn for
+        self.static_layer = None
+        self.static_key = None
+
+        # Initialize list of screen areas drawn on in the current frame (dirty rectangles), these are updated on the display and erased in the next frame
+        self.dirty_rects = []
+
+        # Set number of debris fragments above which the fragments are marked dirty as one bounding rectangle instead of one rectangle each
+        self.max_debris_rects = 64
         
         # Initialize current music track variable
         self.currtrack = ''
@@ -66,31 +94,48 @@ class UI:
         # Start playing music
         self.play_music()
 
-    def draw_scene(self):
+    def draw_main_body(self, surface):
         """
-        Method to draw the 2D game scene (only bodies, not HUD!)
+        Method to draw the main body including its atmosphere
+        
+        Arguments:
+            surface : pygame.Surface - Surface to draw on
         """
 
-        # Loop through all bodies in order to draw each one
         for body in self.game_instance.mission.bodies:
-
-            # If the body is the main body, draw the body as well as an atmosphere
             if body.type == -1:
 
                 # Get radius of the outermost part of the atmosphere
                 atm_radius = body.radius + body.atm_thickness
 
-                # Draw body only if main body AND its atmosphere are visible on the screen
-                if self.is_on_screen(self.center_to_topleft(self.pos_to_center_coord(body.pos)), [2 * atm_radius * self.scale, 2 * atm_radius * self.scale]):
-                    self.draw_img(body.scaled_img, self.center_to_topleft(self.pos_to_center_coord(body.pos)))
+                # Draw body only if main body AND its atmosphere are visible on the screen, the scaled image only covers the visible part of the body
+                coord = self.camera.world_to_screen(body.pos).tolist()
+                if self.is_on_screen(coord, [2 * atm_radius * self.camera.scale, 2 * atm_radius * self.camera.scale]):
+                    surface.blit(body.scaled_img, [coord[0] + body.scaled_offset[0], coord[1] + body.scaled_offset[1]])
+                break
+
+    def draw_scene(self):
+        """
+        Method to draw the dynamic part of the 2D game scene (only orbiting bodies and debris, not the main body and not HUD!)
+        """
 
+        # Transform the positions of all bodies to screen coordinates at once
+        bodies = self.game_instance.mission.bodies
+        coords = self.camera.world_to_screen([body.pos for body in bodies]).tolist()
+
+        # Loop through all bodies in order to draw each one
+        for body, coord in zip(bodies, coords):
+
+            # The main body is part of the static layer
+            if body.type == -1:
+                continue
 
             # Draw orbiting bodies, but only if they are visible on the screen
-            elif self.is_on_screen(self.center_to_topleft(self.pos_to_center_coord(body.pos)), body.scaled_img.get_size()):
+            elif self.is_on_screen(coord, body.scaled_img.get_size()):
                 
                 if body.type == 1:
                     
-                    player_pos = self.center_to_topleft(self.pos_to_center_coord(body.pos))
+                    player_pos = coord
                     
                     # Draw exhaust if firing
                     if body.firing:
@@ -100,33 +145,46 @@ class UI:
                         self.draw_img(body.scaled_exhaust_img, [exhaust_pos_x, exhaust_pos_y])
                     
                     # Draw body
-                    self.draw_img(body.scaled_img, self.center_to_topleft(self.pos_to_center_coord(body.pos)))
+                    self.draw_img(body.scaled_img, coord)
                     
                 else:
                     # Draw body
-                    self.draw_img(body.scaled_img, self.center_to_topleft(self.pos_to_center_coord(body.pos)))
+                    self.draw_img(body.scaled_img, coord)
+
+        # Draw all debris fragments
+        self.draw_debris()
 
-    def pos_to_center_coord(self, pos):
+    def draw_debris(self):
         """
-        Method to scale the values of the position to a coordinate on the screen
-        
-        Arguments:
-            pos : [float, float] - Position vector of orbiter
-            
-        Return values:
-            coord : [int, int] - Pixel coordinates on the screen with reference to the center of the screen
+        Method to draw all debris fragments at once, using the sprites shared by all fragments
         """
-        
-        # Declare coord (coordinates of the object on the screen) to be a list of two items (x- and y-coordinates)
-        coord = [0,0] 
 
-        # Scale both components of the spacecraft position vector down to an integer coordinate (in pixels) on the screen
-        coord[0] = int(pos[0] * self.scale)
-        coord[1] = int(pos[1] * self.scale)
+        debris = self.game_instance.mission.debris
+        res = numpy.array(self.game_instance.res)
+
+        # Screen coordinates of all fragments with top-left reference
+        coord = self.camera.world_to_screen(debris.pos[:debris.n])
+
+        # Only draw fragments that are visible on the screen
+        margin = debris.sprite_offsets.max()
+        visible = numpy.flatnonzero(numpy.all((coord >= -margin) & (coord <= res + margin), axis=1))
+
+        if not len(visible):
+            return
+
+        # Blit all visible sprites in one call, centered at the fragment positions
+        topleft = coord[visible] - debris.sprite_offsets[debris.sprite[visible]]
+        blits = [(debris.sprites[sprite], corner) for sprite, corner in zip(debris.sprite[visible].tolist(), topleft.tolist())]
+
+        # Mark the drawn areas as dirty, a single bounding rectangle of all fragments if there are many of them
+        if len(visible) <= self.max_debris_rects:
+            self.dirty_rects.extend(self.screen.blits(blits))
+        else:
+            self.screen.blits(blits, doreturn=False)
+            corner_min = topleft.min(axis=0)
+            corner_max = (coord[visible] + debris.sprite_offsets[debris.sprite[visible]] + 1).max(axis=0)
+            self.dirty_rects.append(pygame.Rect(corner_min.tolist(), (corner_max - corner_min).tolist()).clip(self.screen.get_rect()))
 
-        # Return position in pixels with reference to the center of the screen
-        return coord
-    
     def draw_img(self, img, pos):
         """
         Method to draw an image onto the screen
@@ -139,42 +197,20 @@ class UI:
         # Get image bounding rectangle, centered at the position on the screen (in top-left reference)
         img_rect = img.get_rect(center=pos)
         
-        # Draw image on the screen
-        self.screen.blit(img, img_rect)
+        # Draw image on the screen and mark its area as dirty
+        self.dirty_rects.append(self.screen.blit(img, img_rect))
 
     def update_zooming_imgs(self):
         """
-        Method to update the image scale of all bodies whose images need to scale up or down when zooming the camera
+        Method to update the image scale of all bodies whose images need to scale up or down when zooming or moving the camera
         """
 
         # Find the main body in the list of bodies
         for body in self.game_instance.mission.bodies:
             if body.type == -1:
-                if self.is_on_screen(self.center_to_topleft(self.pos_to_center_coord(body.pos)), body.scaled_img.get_size()):
-                    # Update the image scale of the body
-                    body.scale_img(self.scale)
-                    break
-
-    def center_to_topleft(self, center_coord):
-        """
-        Method to translate coordinates centered in the middle of the screen to usual coordinates with top-left reference point
-        
-        Arguments:
-            center_coord : [int, int] - Screen coordinates with reference at the center of the screen
-            
-        Return values:
-            topleft_coord : [int, int] - Screen coordinates with reference at the top-left corner
-        """
-        
-        # Declare the coordinates with top-left reference to be a list of two items (x- and y-coordinate)
-        topleft_coord = [0,0]
-
-        # Determine the centered coordinates from coordinates with top-left reference and the resolution
-        topleft_coord[0] = center_coord[0] + self.game_instance.res[0] // 2 # Determine integer x-coordinate in top-left reference
-        topleft_coord[1] = - center_coord[1] + self.game_instance.res[1] // 2 # Determine integer y-coordinate in top-left reference
-
-        # Return coordinates with a top-left reference
-        return topleft_coord
+                # Update the image scale and the visible part of the body, nothing is scaled if it is not visible
+                body.scale_img(self.camera)
+                break
 
     def resize_screen(self, newres):
         """
@@ -186,12 +222,16 @@ class UI:
 
         # Save new resolution
         self.game_instance.res = newres
+        self.camera.res = newres
 
         # Create new main game surface with new resolution
         self.screen = pygame.display.set_mode(newres, pygame.RESIZABLE)
         
-        # Create and save new background surface that was generated for the new resolution
-        self.bg = self.create_background(self.game_instance.res)
+        # Fit the background surface to the new resolution, the background is not generated again
+        self.bg = self.fit_background(self.game_instance.res)
+
+        # Update the visible part of the main body image
+        self.update_zooming_imgs()
 
     def get_mouse_angle(self, sc_body):
         """
@@ -205,8 +245,7 @@ class UI:
         """
 
         # Get on screen location of the player object in pixels with a top-left reference
-        x_sc = self.center_to_topleft(self.pos_to_center_coord(sc_body.pos))[0]
-        y_sc = self.center_to_topleft(self.pos_to_center_coord(sc_body.pos))[1]
+        x_sc, y_sc = self.camera.world_to_screen(sc_body.pos).tolist()
 
         # Determine relative position from player body to mouse pointer, y-axis is now positive UPWARDS
         x_rel = self.mouse_pos[0] - x_sc
@@ -228,38 +267,119 @@ class UI:
         if self.moving:
             self.move_camera()
 
+        # Swap in the exactly scaled main body image once it has been scaled in the background
+        for body in self.game_instance.mission.bodies:
+            if body.type == -1:
+                body.update_scaled_img()
+                break
+
     def render(self):
         """
         Method to render all screen contents
+
+        Comments:
+            - The screen is composed of the static layer (background, main body and orbits), which is only redrawn when it changes, and the dynamic contents (orbiters, debris and HUD) on top
+            - Only the areas that were drawn on in this or the last frame (dirty rectangles) are updated on the display, unless the static layer has changed
         """
 
-        # Draw the background texture
-        self.screen.blit(self.bg, [0,0])
+        # Redraw the static layer if anything on it has changed, in which case the whole screen is updated
+        full_update = self.update_static_layer()
 
-        # Draw the orbit ellipses for the player and target objects
-        if self.draw_orbits_toggle:
-            self.draw_orbits()
+        # Erase the dynamic contents of the last frame by restoring the static layer underneath them
+        if full_update:
+            self.screen.blit(self.static_layer, [0,0])
+        else:
+            for rect in self.dirty_rects:
+                self.screen.blit(self.static_layer, rect, rect)
 
-        # Draw the game scene (all bodies)
+        old_rects = self.dirty_rects
+        self.dirty_rects = []
+
+        # Draw the game scene (all orbiting bodies and debris)
         self.draw_scene()
 
         # Draw the HUD on top of the scene
         self.draw_hud()
 
-        # Update window contents to draw changes
-        pygame.display.update()
+        # Update window contents to draw changes, only the changed areas if possible
+        if full_update:
+            pygame.display.update()
+        else:
+            pygame.display.update(old_rects + self.dirty_rects)
+
+    def update_static_layer(self):
+        """
+        Method to redraw the static layer (background, main body and orbits) if anything on it has changed since it was last drawn
+
+        Return values:
+            redrawn : bool - Whether or not the static layer was redrawn
+
+        Comments:
+            The layer changes with the resolution, panning and zooming of the camera, the main body image and the orbits (which only change while thrusting or after collisions)
+        """
+
+        # Find main body in list of bodies
+        main_body = None
+        for body in self.game_instance.mission.bodies:
+            if body.type == -1:
+                main_body = body
+                break
+
+        # Orbits are only drawn while the mission is ongoing and drawing orbits is toggled on
+        show_orbits = bool(self.draw_orbits_toggle and self.game_instance.mission_state == 0)
+
+        # Describe the orbits shown by the cached orbital elements of the orbiters
+        orbit_key = None
+        if show_orbits:
+            store = self.game_instance.mission.store
+            a, ecc, _, _, _ = store.elements(self.game_instance.gravparam, main_body.pos)
+            orbit_key = (store.type[:store.n].tobytes(), a.tobytes(), ecc.tobytes())
+
+        # Describe everything that the layer shows, only redraw the layer if this has changed
+        key = (tuple(self.game_instance.res), self.camera.scale, tuple(self.camera.center), main_body.scaled_version, orbit_key)
+        if key == self.static_key:
+            return False
+
+        # Draw the background texture, the orbits and the main body onto the layer
+        if self.static_layer is None or self.static_layer.get_size() != self.screen.get_size():
+            self.static_layer = pygame.Surface(self.screen.get_size()).convert()
+        self.static_layer.blit(self.bg, [0,0])
+        if show_orbits:
+            self.draw_orbits(self.static_layer)
+        self.draw_main_body(self.static_layer)
+
+        self.static_key = key
+        return True
 
     def draw_hud(self):
         """
         Method to draw all HUD elements besides orbits
         """
 
+        # Keep the text surfaces of the last frame for reuse, texts that are not drawn again this frame are dropped afterwards
+        self.text_cache_old = self.text_cache
+        self.text_cache = {}
+
         # Draw an FPS counter in the top right corner of the window
         #self.draw_text(f"{1/self.dt:.0f} FPS", 30, self.game_instance.hud_color, (self.game_instance.res[0] - 10, 10), 'right')
 
         # Draw the current simulation time factor in the bottom left corner of the window
         self.draw_text(f"x{self.game_instance.timefactor:.0f}", 30, self.game_instance.hud_color, (10, self.game_instance.res[1]-40), 'left')
 
+        # Draw the next predicted event above the simulation time factor while it is still ahead
+        next_event = self.game_instance.next_event
+        if next_event is not None and next_event[1] > self.game_instance.sim_time:
+            self.draw_text(f"{next_event[0]} in {next_event[1] - self.game_instance.sim_time:.0f} s", 30, self.game_instance.hud_color, (10, self.game_instance.res[1]-80), 'left')
+
+        # Draw the next upcoming conjunctions in the top right corner of the window, as long as both bodies still exist (debris fragments are None and can not be tracked)
+        conjunctions = [c for c in self.game_instance.conjunctions if c[0] > self.game_instance.sim_time and all(body is None or body in self.game_instance.mission.bodies for body in c[3:5])]
+        if conjunctions:
+            self.draw_text("Conjunctions:", 30, self.game_instance.hud_color, (self.game_instance.res[0] - 10, 10), 'right')
+            for k, (t, miss, speed, body1, body2) in enumerate(conjunctions[:3]):
+                type1 = body1.type if body1 is not None else 0
+                type2 = body2.type if body2 is not None else 0
+                self.draw_text(f"{self.type_names[type1]} - {self.type_names[type2]} in {t - self.game_instance.sim_time:.0f} s, {miss / 1000:.0f} km", 20, self.game_instance.hud_color, (self.game_instance.res[0] - 10, 45 + 25 * k), 'right')
+
         # Draw player object related HUD elements only when mission is ongoing
         if self.game_instance.mission_state == 0:
 
@@ -287,8 +407,8 @@ class UI:
                     # Draw target icon caption
                     self.draw_text("Target", 30, self.game_instance.hud_color, [self.game_instance.res[0] / 2, 25], 'center')
                     
-                    # Draw target icon
-                    img = pygame.transform.rotozoom(body.img, 0, 0.25)
+                    # Draw target icon, scaled only once and kept in the asset cache
+                    img = asset_functions.get_rotated_image(body.img_path, 0, 0.25)
                     img_size = img.get_size()
                     
                     self.draw_img(img, [self.game_instance.res[0] / 2, 45 + img_size[1] / 2])
@@ -298,7 +418,7 @@ class UI:
                 self.draw_text("Propellant left:", 30, self.game_instance.hud_color, (10,10), 'left')
 
                 barcolor = (255 - prop_fraction * 255, prop_fraction * 255, 0)
-                pygame.draw.line(self.screen, barcolor, (10,55), (10 + 220 * prop_fraction, 55), 30)
+                self.dirty_rects.append(pygame.draw.line(self.screen, barcolor, (10,55), (10 + 220 * prop_fraction, 55), 30))
 
             # Draw differential velocity between player and target
             player_target_dist = ((player_body.pos[0] - target_body.pos[0])**2 + (player_body.pos[1] - target_body.pos[1])**2)**0.5
@@ -322,69 +442,75 @@ class UI:
             text : string - The string to be printed on the screen
             size : int - The font size of the text [pt]
             color : [int, int, int] - The color of the text in rgb format, possible values for each color channel: 0-255
+
+        Comments:
+            - Rendered text surfaces are reused as long as the same text is drawn every frame, only changed texts are rendered again
         """
-        
-        # Set font to be used to the system default font
-        font = pygame.freetype.SysFont(None, size, bold=0, italic=0)
+
+        key = (text, size, tuple(color))
+
+        # Reuse the text surface rendered this or last frame, otherwise render the text
+        textobj = self.text_cache.get(key)
+        if textobj is None:
+            textobj = self.text_cache_old.get(key)
+        if textobj is None:
+            textobj, textrect = self.get_font(size).render(text, color)
+        self.text_cache[key] = textobj
 
         # Consider left, center and right text alignment
         if align == 'center':
-            textobj, textrect = font.render(text, color)
             rect = textobj.get_rect(centerx = coord[0], centery = coord[1])
 
         elif align == 'right':
-            textobj, textrect = font.render(text, color)
             rect = textobj.get_rect(right = coord[0] - 1, top = coord[1])
 
         else:
-            textobj, textrect = font.render(text, color)
             rect = textobj.get_rect(left = coord[0], top = coord[1])
 
-        # Blit text to the screen
-        self.screen.blit(textobj, rect)
+        # Blit text to the screen and mark its area as dirty
+        self.dirty_rects.append(self.screen.blit(textobj, rect))
     
+    def get_font(self, size):
+        """
+        Method to get the system default font in a given size, every size is only created once
+        
+        Arguments:
+            size : int - The font size [pt]
+
+        Return values:
+            font : pygame.freetype.Font - The font object
+        """
+
+        # Create font object only if there is none of this size yet
+        if size not in self.fonts:
+            self.fonts[size] = pygame.freetype.SysFont(None, size, bold=0, italic=0)
+
+        return self.fonts[size]
+
     def zoom_camera(self, mode):
         """
-        Method to start the zoom process
+        Method to zoom the camera in or out
         
         Arguments:
             mode : int - The zoom mode, -1 (zooming in), 1 (zooming out)
         """
 
-        # Update scale and body images that scale with zooming
-        self.scale = self.scale * (1 - self.game_instance.zoom_speed * mode)
+        # Update scale, keep mouse pointer at one specific point in space when zooming, gives the impression that the mouse pointer is the location to which the camera zooms
+        self.camera.zoom(1 - self.game_instance.zoom_speed * mode, self.mouse_pos)
+
+        # Update body images that scale with zooming
         self.update_zooming_imgs()
-        
-        # Keep mouse pointer at one specific point in space when zooming, gives the impression that the mouse pointer is the location to which the camera zooms
-        d_x = - mode * ((self.game_instance.res[0] / 2 - self.mouse_pos[0]) * self.game_instance.zoom_speed / self.scale)
-        d_y = mode * ((self.game_instance.res[1] / 2 - self.mouse_pos[1]) * self.game_instance.zoom_speed / self.scale)
-        
-        # Update all body positions to reflect above effect
-        for body in self.game_instance.mission.bodies:
-            body.pos[0] = body.pos[0] + d_x
-            body.pos[1] = body.pos[1] + d_y
-            
-        # Update center attributes
-        self.center[0] = self.center[0] + d_x
-        self.center[1] = self.center[1] + d_y
 
     def move_camera(self):
         """
-        Method to move the camera, however actually all bodies are moves giving the effect of a moving camera
+        Method to move the camera along with the mouse pointer, only the view changes and no body is moved
         """
 
-        # Determine the difference in mouse position since last frame
-        d_x = self.mouse_pos[0] - self.mouse_pos_old[0]
-        d_y = self.mouse_pos_old[1] - self.mouse_pos[1]
-
-        # Move ever body to its new position, adding the difference in mouse position
-        for body in self.game_instance.mission.bodies:
-            body.pos[0] = body.pos[0] + d_x / self.scale
-            body.pos[1] = body.pos[1] + d_y / self.scale
+        # Move camera by the difference in mouse position since last frame
+        self.camera.pan([self.mouse_pos[0] - self.mouse_pos_old[0], self.mouse_pos[1] - self.mouse_pos_old[1]])
 
-        # Update camera center attribute
-        self.center[0] = self.center[0] + d_x / self.scale
-        self.center[1] = self.center[1] + d_y / self.scale
+        # The visible part of the main body changes, its image only covers the visible part when zoomed in closely
+        self.update_zooming_imgs()
 
     def is_on_screen(self, body_center_topleft, body_img_size):
         """
@@ -445,9 +571,12 @@ class UI:
         # Show text that ENTER key now quits the game
         self.draw_text('Press ENTER to quit.', 30, (255,255,255), [self.game_instance.res[0] / 2, self.game_instance.res[1] / 2 - 15], 'center')
 
-    def draw_orbits(self):
+    def draw_orbits(self, surface):
         """
-        Method to draw the orbit ellipses for player, target and hazards
+        Method to draw the orbit paths (ellipses and escape trajectories) for player, target and hazards
+        
+        Arguments:
+            surface : pygame.Surface - Surface to draw on
         """
 
         # Draw endscreen only if mission has ended
@@ -460,102 +589,107 @@ class UI:
                     main_body = body
                     break
 
-            # Draw ellipses for player, target or hazard type orbiters
-            for body in self.game_instance.mission.bodies:
-                if body.type == 1 or body.type == 2 or body.type == 3:
-                    # Calculate orbit parameters needed for ellipse display
-                    orbit_params = orbit_functions.orbit_params(self.game_instance.gravparam, main_body.pos, body.pos, body.vel)
-
-                    # Find orbit ellipse on-screen size and angle
-                    ellipse_size_x = orbit_params[0][0] * self.scale
-                    ellipse_size_y = orbit_params[0][1] * self.scale
-                    rot_angle_rad = orbit_params[1]
-                    
-                    # Draw orbit ellipses only if they aren't bigger than a certain level
-                    if ellipse_size_x < self.game_instance.res[1]:
-                        # Draw basic orbit ellipse in horizontal orientation onto surface
-                        orbit_bounding_rect = pygame.Rect(0, 0, ellipse_size_x, ellipse_size_y)
-                        orbit_surface = pygame.Surface([ellipse_size_x, ellipse_size_y], pygame.SRCALPHA).convert_alpha()
-                        
-                        # Set ellipse colors, if player use HUD color, if target use green and if hazard use red
-                        if body.type == 1:
-                            color = self.game_instance.hud_color
-                        elif body.type == 2:
-                            color = (0,255,0)
-                        elif body.type == 3:
-                            color = (255,0,0)
-                        
-                        # Draw ellipse and position it correctly
-                        pygame.draw.ellipse(orbit_surface, color, orbit_bounding_rect, 2)
-                        center_before_rot = orbit_surface.get_rect().center
-                        
-                        # Center to ellipse focus vector before rotation
-                        center_to_focus_vector = pygame.math.Vector2(ellipse_size_x / 2 - orbit_params[2][0] * self.scale, 0)
-
-                        # Center to ellipse focus vector after rotation
-                        rot_center_to_focus_vector = center_to_focus_vector.rotate(math.degrees(rot_angle_rad))
-                        
-                        # Rotate surface that contains the ellipse
-                        rot_orbit_surface = pygame.transform.rotate(orbit_surface, math.degrees(rot_angle_rad))
-                        
-                        # Set center of new rotated ellipse to center of old ellipse
-                        rot_orbit_surface.get_rect().center = center_before_rot
-                        
-                        # Build blitting coordinates
-                        x_pos = self.center_to_topleft(self.pos_to_center_coord(self.center))[0] - rot_center_to_focus_vector[0]
-                        y_pos = self.center_to_topleft(self.pos_to_center_coord(self.center))[1] + rot_center_to_focus_vector[1]
-                        
-                        # Create new rectangle from rotated orbit ellipse and center it at the position calculated
-                        newrect = rot_orbit_surface.get_rect(center = [x_pos, y_pos])
-                        
-                        # Blit ellipse to screen
-                        self.screen.blit(rot_orbit_surface, newrect)
+            # Find player, target or hazard type orbiters
+            orbit_bodies = [body for body in self.game_instance.mission.bodies if body.type == 1 or body.type == 2 or body.type == 3]
+            if not orbit_bodies:
+                return
+
+            # Get orbit parameters needed for orbit display from the cached orbital elements of the body store, only recalculated for changed orbits
+            a, ecc, r_periapsis, r_apoapsis, period = self.game_instance.mission.store.elements(self.game_instance.gravparam, main_body.pos)
+            rows = [body.index for body in orbit_bodies]
+            a, ecc, r_periapsis = a[rows], ecc[rows], r_periapsis[rows]
+            e = numpy.sqrt(numpy.sum(ecc**2, axis=-1))
+
+            # Semi-latus rectums, defined for all orbit types
+            p = r_periapsis * (1 + e)
+
+            # Distance from the main body up to which escape trajectories are drawn, far enough to leave the screen in any direction
+            r_max = numpy.sqrt(numpy.sum((main_body.pos - self.camera.center)**2)) + max(self.game_instance.res) / self.camera.scale
+
+            # Draw orbit paths for player, target or hazard type orbiters
+            for i, body in enumerate(orbit_bodies):
+                # Find on-screen length of the path, ellipse circumference (Ramanujan's approximation) or open trajectory up to r_max on both sides
+                if e[i] < 1:
+                    b = a[i] * (1 - e[i]**2)**0.5
+                    path_length = math.pi * (3 * (a[i] + b) - ((3 * a[i] + b) * (a[i] + 3 * b))**0.5) * self.camera.scale
+                else:
+                    path_length = 2 * r_max * self.camera.scale
+
+                # Draw orbits only if they aren't bigger than a certain level, the cost of drawing grows with the number of points, not with the size on screen
+                if e[i] >= 1 or 2 * a[i] * self.camera.scale < 10 * max(self.game_instance.res):
+                    # Sample the path with about one point every few pixels, with a lower limit to keep small orbits round
+                    n_points = int(min(max(path_length / self.orbit_point_spacing, 32), self.max_orbit_points))
+                    points, closed = orbit_functions.conic_points(ecc[i], p[i], n_points, r_max)
+
+                    # Transform the points to screen coordinates with top-left reference
+                    screen_points = self.camera.world_to_screen(points + main_body.pos)
+
+                    # Set orbit colors, if player use HUD color, if target use green and if hazard use red
+                    if body.type == 1:
+                        color = self.game_instance.hud_color
+                    elif body.type == 2:
+                        color = (0,255,0)
+                    elif body.type == 3:
+                        color = (255,0,0)
+
+                    # Draw orbit path straight onto the surface
+                    pygame.draw.lines(surface, color, closed, screen_points.tolist(), 2)
     
-    def create_background(self, res):
+    def create_background(self, res, seed=None):
         """
-        Method to create a simple, random background
+        Method to create a simple, random background, or load it from the texture cache if a background with the same seed and resolution has been generated before
         
         Arguments:
             res : [int, int] - Current screen resolution
+            seed : int - Seed of the background, the background is random (and not cached) if not given
+            
+        Return values:
+            bg_surf : pygame.Surface - The background image
+        """
+        
+        if seed is None:
+            return self.generate_background(res, seed)
+        
+        # Convert the cached image to the display format for faster blitting
+        return cache_functions.get_texture(['background', list(res), self.game_instance.generate_nebulae, seed], lambda: self.generate_background(res, seed)).convert()
+    
+    def generate_background(self, res, seed):
+        """
+        Method to generate a simple, random background
+        
+        Arguments:
+            res : [int, int] - Resolution of the background
+            seed : int - Seed of the background, the same seed and resolution always give the same background
             
         Return values:
             bg_surf : pygame.Surface - The generated background image
         """
         
+        # Create random number generators for the background, the numpy generator draws random values for many pixels at once
+        rng = random.Random(seed)
+        np_rng = numpy.random.RandomState(rng.randrange(2**32))
+        
         # Create black surface to draw on
         bg_surf = pygame.Surface(res)
-        bg_px_arr = pygame.PixelArray(bg_surf)
         bg_surf.fill((0,0,0))
         
         # Generate nebulae if it is set to generate nebulae in cfg file
-        if self.game_instance.generate_nebulae:            
-            bg_surf_arr = pygame.PixelArray(bg_surf)
+        if self.game_instance.generate_nebulae:
 
-            # Create arrays of with the same number of entries as there are pixels on the screen
-            nebula_mask = numpy.empty(res[0] * res[1])
-            nebula_color = numpy.empty(res[0] * res[1])
-            nebula_lightness = numpy.empty(res[0] * res[1])
-            
             # Set random seeds for noise function
-            maskseed = random.random()
-            colorseed = random.random()
-            lightnessseed = random.random()
+            maskseed = rng.randint(0,1000)
+            colorseed = rng.randint(0,1000)
+            lightnessseed = rng.randint(0,1000)
             
-            # Loop through all pixels of the background to fill noise arrays
-            px_index = 0
-            for i in range(res[0]):
-                for j in range(res[1]):
-                    
-                    # Set noise coordinates to normalized pixel coordinates
-                    x_noise = (i * 4) / res[0]
-                    y_noise = (j * 4) / res[1]
-                    
-                    # Generate noise values for pixel
-                    nebula_mask[px_index] = noise.pnoise3(x_noise/1.5, y_noise/1.5, maskseed, 6)
-                    nebula_color[px_index] = noise.pnoise3(x_noise/30, y_noise/30, colorseed)
-                    nebula_lightness[px_index] = noise.pnoise3(x_noise/20, y_noise/20, lightnessseed)
-                    
-                    px_index += 1
+            # Set noise coordinates of all pixels to normalized pixel coordinates
+            i, j = numpy.meshgrid(numpy.arange(res[0]), numpy.arange(res[1]), indexing='ij')
+            x_noise = (i * 4) / res[0]
+            y_noise = (j * 4) / res[1]
+            
+            # Generate noise values for all pixels at once, the seeds select the permutation table of the noise
+            nebula_mask = noise_functions.fbm3(x_noise/1.5, y_noise/1.5, 0, 6, step=4/min(res)/1.5, seed=maskseed)
+            nebula_color = noise_functions.fbm3(x_noise/30, y_noise/30, 0, seed=colorseed)
+            nebula_lightness = noise_functions.fbm3(x_noise/20, y_noise/20, 0, seed=lightnessseed)
                     
             # Normalize noise values between 0 and 1
             nebula_mask = (nebula_mask - nebula_mask.min()) / (nebula_mask.max() - nebula_mask.min())
@@ -563,58 +697,71 @@ class UI:
             nebula_lightness = (nebula_lightness - nebula_lightness.min()) / (nebula_lightness.max() - nebula_lightness.min())
             nebula_mask = nebula_mask**2
             
-            # Loop through all pixels again for color processing
-            px_index = 0
-            for i in range(res[0]):
-                for j in range(res[1]):
-                    
-                    newcolor = pygame.Color(0,0,0)
-                    h, s, l, a = newcolor.hsla
-                    
-                    h = nebula_color[px_index] * 360
-                    s = 50
-                    l = nebula_lightness[px_index] * nebula_mask[px_index] * 40
-                    
-                    newcolor.hsla = h, s, l, a
-                    
-                    bg_surf_arr[i, j] = newcolor
-                    
-                    px_index += 1
-                    
-     
-        
-        # Generate white background stars (by coloring single, random pixels)
-        for bgstars in range(1000):
-            x = random.randint(0,res[0]-1)
-            y = random.randint(0,res[1]-1)
+            # Determine HSL colors of all pixels: hue from the color map, fixed saturation and lightness from the lightness map, faded out by the mask
+            nebula_hsl = numpy.stack([nebula_color * 360, numpy.full(nebula_color.shape, 50), nebula_lightness * nebula_mask * 40], axis=-1)
             
-            bg_px_arr[x,y] = (255,255,255)
+            # Convert colors of all pixels to RGB and write them onto the surface at once
+            pygame.surfarray.blit_array(bg_surf, worldgen.hsl_to_rgb(nebula_hsl).astype(numpy.uint8))
         
+        # Scale the number of stars with the area of the background, so that the star density is the same as with 1000 white and 100 colored stars on a 1920x1080 background
+        star_scale = res[0] * res[1] / (1920 * 1080)
+
+        # Generate white background stars (by coloring single, random pixels), all at once
+        bg_px_arr = pygame.surfarray.pixels3d(bg_surf)
+        bg_px_arr[np_rng.randint(0, res[0], round(1000 * star_scale)), np_rng.randint(0, res[1], round(1000 * star_scale))] = 255
+        del bg_px_arr
         
         # Draw larger, colored stars
-        for fgstars in range(100):
-            color_index = random.randint(0,255)
+        for fgstars in range(round(100 * star_scale)):
+            color_index = rng.randint(0,255)
             
             # Determine random color, but just blue-ish and red-ish tints
             b = color_index
             if b > 200:
                 r = int(b * 0.75)
-                g = random.randint(int(0.75*b),b)
+                g = rng.randint(int(0.75*b),b)
             else:
                 r = 255-b
-                g = random.randint(0,int(0.75*r))
+                g = rng.randint(0,int(0.75*r))
             
             # Select random screen coordinates to draw star at
-            x = random.randint(0,res[0]-1)
-            y = random.randint(0,res[1]-1)
+            x = rng.randint(0,res[0]-1)
+            y = rng.randint(0,res[1]-1)
             
             # Set star radius
-            radius = random.randint(1,5) // 2
+            radius = rng.randint(1,5) // 2
             
             # Draw star
             pygame.draw.circle(bg_surf, (r,g,b), (x,y), radius)
         
         return bg_surf
+    
+    def fit_background(self, res):
+        """
+        Method to fit the full size background to the screen resolution
+        
+        Arguments:
+            res : [int, int] - Current screen resolution
+            
+        Return values:
+            bg_surf : pygame.Surface - Background image with the screen resolution
+            
+        Comments:
+            - The center part of the full size background is cut out, the full size background is only scaled up first if the screen is larger than it in any direction
+        """
+        
+        bg_full = self.bg_full
+        
+        # Scale the full size background up to cover the screen, if necessary
+        factor = max(res[0] / bg_full.get_width(), res[1] / bg_full.get_height())
+        if factor > 1:
+            bg_full = pygame.transform.smoothscale(bg_full, [math.ceil(bg_full.get_width() * factor), math.ceil(bg_full.get_height() * factor)])
+        
+        # Cut out the center part with the screen resolution
+        area = pygame.Rect(0, 0, res[0], res[1])
+        area.center = bg_full.get_rect().center
+        
+        return bg_full.subsurface(area).copy()
       
     def play_music(self): 
         """
@@ -644,11 +791,8 @@ class UI:
         Method to draw a splash/loading screen to let the user know that the game is loading and hasn't crashed
         """
         
-        # Build path to splashscreen
-        path = os.path.join('img', 'splashscreen.png')
-        
-        # Load splashscreen image and scale it to current resolution
-        splashscreen = pygame.image.load(path)
+        # Get splashscreen image and scale it to current resolution
+        splashscreen = asset_functions.get_image('splashscreen.png')
         splashscreen_scaled = pygame.transform.scale(splashscreen, self.game_instance.res)
         
         # Color the splash screen with the hud color
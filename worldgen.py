@@ -1,12 +1,23 @@
 import pygame
 import random
-import noise
+import noise_functions
 import math
 import scipy.interpolate as interp
 import numpy as np
 import matplotlib.pyplot as plt
+import concurrent.futures
+import itertools
+import os
 
-def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
+
+
+# Number of worker processes used for planet texture generation, set from the config file (0 uses one process per CPU core)
+processes = 0
+
+# Width of the tiles that planet textures are generated in [px]
+tile_size = 64
+
+def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness, seed=None):
     """
     Function to generate a random planet texture
     
@@ -15,11 +26,15 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
         planet_radius: float - Planet radius [m]
         planet_atm_thickness: float - Planet atmosphere thickness [m]
         roughness : int - Roughness of the planet texture
+        seed : int - Seed of all random properties of the texture, the same seed and arguments always give the same texture (random if not given)
         
     Return values:
         body_surface : pygame.Surface - Complete texture of the planet
     """
     
+    # Create random number generator for all random properties of the planet
+    rng = random.Random(seed)
+    
     # Create several helpful variables
     # Radius of the outmost part of the atmosphwere [m]
     atm_radius = planet_radius + planet_atm_thickness * 2
@@ -38,13 +53,13 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
     ### PLANET SURFACE GENERATION
     
     # Set step sized for elevation, temperature and humidity map; is a measure of how accurate and how smooth the color gradients will be
-    n_elevation_steps = 25
-    n_temperature_steps = 8
-    n_humidity_steps = 3
+    n_elevation_steps = 100
+    n_temperature_steps = 32
+    n_humidity_steps = 12
     
     # Generate either earth-like planet with earth-like color scheme, or a randomly colored planet, may look like Mars or a gas planet, both options have 50% probability
     # Earth-like planet
-    if random.random() < (1/2):
+    if rng.random() < (1/2):
         # Set the base color to the colorspace default
         base_color = [-1, -1, -1]
         
@@ -58,15 +73,15 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
         trees = 1
         
         # Randomize ice_transition temperature between 0 and 0.1, temperature at which land starts transitioning to arctic climate
-        ice_temperature = random.random() * 0.1
+        ice_temperature = rng.random() * 0.1
         
         # Randomize fraction of the planet is covered with clouds between 0% and 50%
-        cloud_amt = random.random() * 0.5
+        cloud_amt = rng.random() * 0.5
         
     # Randomly colored planet
     else:
         # Generate random planet color
-        base_color = [random.randint(32,255), random.randint(32,255), random.randint(32,255)]
+        base_color = [rng.randint(32,255), rng.randint(32,255), rng.randint(32,255)]
         
         # Vary water and atmosphere color slightly from base color
         bcolor = pygame.Color(base_color[0], base_color[1], base_color[2])
@@ -88,30 +103,29 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
         
         # Randomize if poles have ice caps or not, 50% chance for each case
         # No ice caps on poles
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             ice_temperature = 0
             
         # Ice caps on poles
         else:
-            ice_temperature = random.random() * 0.1
+            ice_temperature = rng.random() * 0.1
             
         # Randomize fraction of the planet is covered with clouds between 0% and 80%
-        cloud_amt = random.random() * 0.8
+        cloud_amt = rng.random() * 0.8
     
     
     # Water elevation, elevation at which the water-land transition happens, randomize between 0 and 1, 0 means no water, 1 means only water
-    water_level = random.random()
+    water_level = rng.random()
     
     # Set elevation above which land transitions to mountainous, summit environment
     mountain_level = 0.8
     
     # Randomize threshold temperature after which desert colors may be present, values range from 0.4 to 0.7
-    desert_temperature = 0.4 + 0.3 * random.random()
+    desert_temperature = 0.4 + 0.3 * rng.random()
     
     
-    # Create new (alpha-enabled) planet surface with the size of the planet radius [px] on the screen and create PixelArray for pixel-wise access
+    # Create new (alpha-enabled) planet surface with the size of the planet radius [px] on the screen
     planet_surface = pygame.Surface([planet_radius_px * 2, planet_radius_px * 2], pygame.SRCALPHA)
-    planet_pxarr = pygame.PixelArray(planet_surface)
     
     # Generate 3D colorspace that contains all used colors
     cspace = colorspace_3d_linear_interp(n_elevation_steps, n_temperature_steps, n_humidity_steps, base_color, water_color, water_level, ice_temperature, mountain_level, desert_temperature)
@@ -121,154 +135,50 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
     
     
     # Generate different seeds for elevation, temperature, humidity, tree and cloud noise maps
-    elevation_seed = random.randint(0,1000)
-    temperature_seed = random.randint(0,1000)
-    humidity_seed = random.randint(0,1000)
-    tree_seed = random.randint(0,1000)
-    cloud_seed = random.randint(0,1000)
-    
-    # Declare noise map lists
-    screen_coords_lst = []
-    elevation_lst = []
-    temperature_lst = []
-    humidity_lst = []
-    tree_lst = []
-    cloud_lst = []
-    
-    # Loop through all pixels contained in planet
-    for i in range(1,planet_res): # X-axis
-        for j in range(1,planet_res): # Y-axis
-            
-            # Draw round shape, generate perlin noise only for pixels contained in planet shape
-            d = ((planet_radius_px - i)**2 + (planet_radius_px - j)**2)**0.5
-            if d < planet_radius_px:
-                
-                # Create normalized value for distance of current pixel from center of the planet, Value limits: 1 (Pixel is on the edge), 0 (Pixel is in the center)
-                d_norm = d/planet_radius_px
-                
-                # Create gradient variable, taken from circle function x^2 + y^2 = z^2, but for unit circle
-                grad = (1-d_norm**2)**0.5
-                
-                # Set center coordinates for noise generation function
-                noise_center_coord_x = (- 2 * roughness + i*roughness/planet_res)
-                noise_center_coord_y = (- 2 * roughness + j*roughness/planet_res)
-                
-                
-                # Generate elevation, temperature and humidity from 3D perlin-simplex noise. Only 2D needed, 3rd dimension used for randomization
-                elevation = (noise.pnoise3(noise_center_coord_x, noise_center_coord_y, elevation_seed, 20) + 1) / 2
-                temperature = ((noise.pnoise3(noise_center_coord_x, noise_center_coord_y, temperature_seed, 8) + 1) / 2) * (- math.cos(2 * math.pi * j / planet_res) + 1) / 2
-                humidity = (noise.pnoise3(noise_center_coord_x, noise_center_coord_y, humidity_seed, 20) + 1) / 2
-                tree = (noise.pnoise3(noise_center_coord_x, noise_center_coord_y, tree_seed, 20) + 1) / 2
-                cloud = (noise.pnoise3(noise_center_coord_x / 2, noise_center_coord_y * 2, cloud_seed, 20) + 1) / 2
-                
-                # append noise map lists
-                screen_coords_lst.append([i,j])
-                elevation_lst.append(elevation)
-                temperature_lst.append(temperature)
-                humidity_lst.append(humidity)
-                tree_lst.append(tree)
-                cloud_lst.append(cloud)
-                
-    
-    # Convert noise map lists to numpy arrays to enable batch processing of the data (needed for normalization of values)
-    elevation_arr = np.array(elevation_lst)
-    temperature_arr = np.array(temperature_lst)
-    humidity_arr = np.array(humidity_lst)
-    tree_arr = np.array(tree_lst)
-    cloud_arr = np.array(cloud_lst)
-    
-    
-    # Normalize perlin noise values, necessary since the noise output never really gets close to 0 and 1 but stays between around 0.3 and 0.7 if not normalized, 0.99999 added since perfectly normalized values caused errors that I did not have time to fix
-    elevation_arr_norm = (elevation_arr - elevation_arr.min()) / (elevation_arr.max() - elevation_arr.min()) * 0.99999
-    temperature_arr_norm = (temperature_arr - temperature_arr.min()) / (temperature_arr.max() - temperature_arr.min()) * 0.99999
-    humidity_arr_norm = (humidity_arr - humidity_arr.min()) / (humidity_arr.max() - humidity_arr.min()) * 0.99999
-    tree_arr_norm = (tree_arr - tree_arr.min()) / (tree_arr.max() - tree_arr.min()) * 0.99999
-    cloud_arr_norm = (cloud_arr - cloud_arr.min()) / (cloud_arr.max() - cloud_arr.min()) * 0.99999
-         
-    
-    # Loop through all points in the noise map lists        
-    for point in range(len(screen_coords_lst)):
-        
-        # Get pixel color from 3D color space and create pygame color from it
-        px_color = cspace[int(elevation_arr_norm[point]*n_elevation_steps)][int(temperature_arr_norm[point]*n_temperature_steps)][int(humidity_arr_norm[point]*n_humidity_steps)]
-        color = pygame.Color(px_color[0], px_color[1], px_color[2])
-        
-        # Get HSLA color values to make forestation effect generation easier
-        h, s, l, a = color.hsla
-        
-        # COLOR POSTPROCESSING
-        # Forestation effect, works through lowering lightness of a pixel if it meets several conditions
-        if (trees and # Forestation effect enabled?
-            tree_arr_norm[point] > 0.5 and # Only generate forestation if tree noise map value is over 0.5
-            (water_level + 0.02) < elevation_arr_norm[point] < mountain_level and # Only generate forestation if elevation is between water and mountain level, with some margin
-            (ice_temperature + 0.1) < temperature_arr_norm[point] and # Only generate forestation if temperature is over the ice temperature, with some margin
-            humidity_arr_norm[point] > 0.5): # Only generate forestation if humidity is over 0.5
-            
-            # Lower lightness to create forestation effect
-            l = l / 2
-            
-            # Update color with new HSLA values
-            color.hsla = h, s, l, a
-        
-        # Cloud generation
-        # Generate clouds if cloud noise map value is lower than the cloud fraction that was randomized
-        if cloud_arr_norm[point] < cloud_amt:
-            # Get color rgb values from current pixel color
-            r = color.r
-            g = color.g
-            b = color.b
-            
-            # Blend current pixel color with white to create cloud effect
-            color_with_cloud = blend_to_white([r,g,b], 1-cloud_arr_norm[point])
-            
-            # Update color with new RGB values
-            color.r = color_with_cloud[0]
-            color.g = color_with_cloud[1]
-            color.b = color_with_cloud[2]
-            
-            
-        # Generate atmospheric glow from increasing view angles to the side of the planet
-        # Get distance of pixel from center of planet
-        d = ((planet_radius_px - screen_coords_lst[point][0])**2 + (planet_radius_px - screen_coords_lst[point][1])**2)**0.5
-        
-        # Produce normalized distance value
-        d_norm = d/planet_radius_px
-        
-        # Create gradient variable that is 1 in the center and 0 at the edges of the planet
-        grad = (1-d_norm**2)**0.5
-        
-        # Apply atmospheric tint
-        # Get RGB values from current pixel color
-        r = color.r
-        g = color.g
-        b = color.b
-        
-        # Find atmosphere color at current pixel
-        atm_color_curr_r = atm_color[0] + (255-atm_color[0]) * grad
-        atm_color_curr_g = atm_color[1] + (255-atm_color[1]) * grad
-        atm_color_curr_b = atm_color[2] + (255-atm_color[2]) * grad
-        
-        # Blend atmosphere color with current pixel color using blend mode Multiply to create atmospheric glow effect
-        color_with_atm = blend_multiply([r,g,b], [atm_color_curr_r, atm_color_curr_g, atm_color_curr_b])
-        
-        # Update color with new RGB values
-        color.r = color_with_atm[0]
-        color.g = color_with_atm[1]
-        color.b = color_with_atm[2]
-        
-        # Apply atmosphere glow on texture (to replicate bight light scattering when looking through the atmosphere at a shallow angle)
-        h, s, l, a = color.hsla
-        l = l + (100 - l) * (1 - grad)**1.5 * 0.75
-        s = s * grad
-        
-        # Update color with new HSLA values
-        color.hsla = h, s, l, a
-        
-        # Set pixel to new color
-        planet_pxarr[screen_coords_lst[point][0],screen_coords_lst[point][1]] = color
-
-    # Close pixel array to enable blitting
-    planet_pxarr.close()
+    elevation_seed = rng.randint(0,1000)
+    temperature_seed = rng.randint(0,1000)
+    humidity_seed = rng.randint(0,1000)
+    tree_seed = rng.randint(0,1000)
+    cloud_seed = rng.randint(0,1000)
+    
+    # Collect all parameters of the texture, tiles are generated from these only (no random values are drawn per tile), so the texture does not depend on how it is split into tiles
+    params = {'planet_res' : planet_res,
+              'roughness' : roughness,
+              'seeds' : [elevation_seed, temperature_seed, humidity_seed, tree_seed, cloud_seed],
+              'cspace' : cspace.astype(np.uint8),
+              'trees' : trees,
+              'water_level' : water_level,
+              'mountain_level' : mountain_level,
+              'ice_temperature' : ice_temperature,
+              'cloud_amt' : cloud_amt,
+              'atm_color' : atm_color}
+    
+    # Split the planet texture into tiles of pixel columns
+    tiles = [[i0, min(i0 + tile_size, planet_radius_px * 2)] for i0 in range(1, planet_radius_px * 2, tile_size)]
+    
+    # Process the tiles in a pool of worker processes, or one after the other if there is only one tile or one process
+    n_processes = min(processes or os.cpu_count() or 1, len(tiles))
+    executor = concurrent.futures.ProcessPoolExecutor(n_processes) if n_processes > 1 else None
+    tile_map = executor.map if executor is not None else map
+    
+    try:
+        # First pass: find the range of the noise maps in every tile, normalization has to use the range over the whole planet so that the tiles match up
+        tile_ranges = list(tile_map(planet_tile_range, tiles, itertools.repeat(params)))
+        params['noise_min'] = np.min([tile_range[0] for tile_range in tile_ranges], axis=0)
+        params['noise_max'] = np.max([tile_range[1] for tile_range in tile_ranges], axis=0)
+        
+        # Second pass: generate the colors of every tile and write them into the planet surface as they arrive, the pixel arrays lock the surface until they are deleted
+        planet_rgb = pygame.surfarray.pixels3d(planet_surface)
+        planet_alpha = pygame.surfarray.pixels_alpha(planet_surface)
+        for tile, (tile_rgb, tile_alpha) in zip(tiles, tile_map(planet_tile_colors, tiles, itertools.repeat(params))):
+            planet_rgb[tile[0]:tile[1]] = tile_rgb
+            planet_alpha[tile[0]:tile[1]] = tile_alpha
+        del planet_rgb
+        del planet_alpha
+    
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     
 
@@ -316,6 +226,149 @@ def gen_planet(planet_res, planet_radius, planet_atm_thickness, roughness):
             
 
 
+def planet_tile_noise(tile, params):
+    """
+    Function to generate the noise maps of one tile of a planet texture
+    
+    Arguments:
+        tile : [int, int] - First and last (exclusive) pixel column of the tile
+        params : dict - Parameters of the planet texture, as collected in gen_planet()
+        
+    Return values:
+        i : numpy.ndarray (N,) - Pixel columns of the pixels of the tile that are contained in the planet
+        j : numpy.ndarray (N,) - Pixel rows of the pixels of the tile that are contained in the planet
+        d : numpy.ndarray (N,) - Distances of the pixels from the center of the planet [px]
+        noise : numpy.ndarray (5,N) - Elevation, temperature, humidity, tree and cloud noise map values of the pixels, not normalized
+    """
+    
+    planet_res = params['planet_res']
+    roughness = params['roughness']
+    elevation_seed, temperature_seed, humidity_seed, tree_seed, cloud_seed = params['seeds']
+    planet_radius_px = int(planet_res / 2)
+    
+    # Find pixel coordinates of all pixels of the tile contained in the planet shape (round shape), noise is only generated for these
+    i, j = np.meshgrid(np.arange(tile[0], tile[1]), np.arange(1, planet_radius_px * 2), indexing='ij')
+    d = ((planet_radius_px - i)**2 + (planet_radius_px - j)**2)**0.5
+    inside = d < planet_radius_px
+    i = i[inside]
+    j = j[inside]
+    d = d[inside]
+
+    # Set center coordinates for noise generation function and the spacing of neighbouring pixels in noise coordinates
+    noise_center_coord_x = (- 2 * roughness + i*roughness/planet_res)
+    noise_center_coord_y = (- 2 * roughness + j*roughness/planet_res)
+    noise_step = roughness / planet_res
+
+    # Generate elevation, temperature and humidity from perlin noise for all pixels at once. Only 2D needed, so the 3rd dimension is kept at 0 and the seeds select the permutation table
+    elevation_arr = (noise_functions.fbm3(noise_center_coord_x, noise_center_coord_y, 0, 20, step=noise_step, seed=elevation_seed) + 1) / 2
+    temperature_arr = ((noise_functions.fbm3(noise_center_coord_x, noise_center_coord_y, 0, 8, step=noise_step, seed=temperature_seed) + 1) / 2) * (- np.cos(2 * math.pi * j / planet_res) + 1) / 2
+    humidity_arr = (noise_functions.fbm3(noise_center_coord_x, noise_center_coord_y, 0, 20, step=noise_step, seed=humidity_seed) + 1) / 2
+    tree_arr = (noise_functions.fbm3(noise_center_coord_x, noise_center_coord_y, 0, 20, step=noise_step, seed=tree_seed) + 1) / 2
+    cloud_arr = (noise_functions.fbm3(noise_center_coord_x / 2, noise_center_coord_y * 2, 0, 20, step=noise_step * 2, seed=cloud_seed) + 1) / 2
+    
+    return i, j, d, np.array([elevation_arr, temperature_arr, humidity_arr, tree_arr, cloud_arr])
+
+def planet_tile_range(tile, params):
+    """
+    Function to find the range of the noise maps of one tile of a planet texture (first pass of the generation)
+    
+    Arguments:
+        tile : [int, int] - First and last (exclusive) pixel column of the tile
+        params : dict - Parameters of the planet texture, as collected in gen_planet()
+        
+    Return values:
+        noise_min : numpy.ndarray (5,) - Minimum values of the elevation, temperature, humidity, tree and cloud noise maps within the tile
+        noise_max : numpy.ndarray (5,) - Maximum values of the noise maps within the tile
+    """
+    
+    i, j, d, noise = planet_tile_noise(tile, params)
+    
+    # Tiles without pixels in the planet do not limit the range
+    return noise.min(axis=1, initial=np.inf), noise.max(axis=1, initial=-np.inf)
+
+def planet_tile_colors(tile, params):
+    """
+    Function to generate the colors of one tile of a planet texture (second pass of the generation)
+    
+    Arguments:
+        tile : [int, int] - First and last (exclusive) pixel column of the tile
+        params : dict - Parameters of the planet texture, as collected in gen_planet(), including the range of the noise maps over the whole planet
+        
+    Return values:
+        tile_rgb : numpy.ndarray (W,H,3) - RGB values of all pixels of the tile (uint8)
+        tile_alpha : numpy.ndarray (W,H) - Alpha values of all pixels of the tile (uint8), pixels outside of the planet are transparent
+    """
+    
+    planet_res = params['planet_res']
+    planet_radius_px = int(planet_res / 2)
+    trees = params['trees']
+    water_level = params['water_level']
+    mountain_level = params['mountain_level']
+    ice_temperature = params['ice_temperature']
+    cloud_amt = params['cloud_amt']
+    atm_color = params['atm_color']
+    cspace = params['cspace']
+    n_elevation_steps, n_temperature_steps, n_humidity_steps = cspace.shape[:3]
+    
+    i, j, d, noise = planet_tile_noise(tile, params)
+    
+    # Normalize perlin noise values with their range over the whole planet, necessary since the noise output never really gets close to 0 and 1 but stays between around 0.3 and 0.7 if not normalized, 0.99999 added since perfectly normalized values caused errors that I did not have time to fix
+    noise_norm = (noise - params['noise_min'][:, None]) / (params['noise_max'] - params['noise_min'])[:, None] * 0.99999
+    elevation_arr_norm, temperature_arr_norm, humidity_arr_norm, tree_arr_norm, cloud_arr_norm = noise_norm
+         
+    
+    # Get pixel colors of all pixels from 3D color space
+    cspace_arr = np.array(cspace, dtype=float)
+    color = cspace_arr[(elevation_arr_norm*n_elevation_steps).astype(int), (temperature_arr_norm*n_temperature_steps).astype(int), (humidity_arr_norm*n_humidity_steps).astype(int)]
+    
+    # COLOR POSTPROCESSING
+    # Forestation effect, works through lowering lightness of pixels that meet several conditions
+    if trees: # Forestation effect enabled?
+        forest = ((tree_arr_norm > 0.5) & # Only generate forestation if tree noise map value is over 0.5
+                  ((water_level + 0.02) < elevation_arr_norm) & (elevation_arr_norm < mountain_level) & # Only generate forestation if elevation is between water and mountain level, with some margin
+                  ((ice_temperature + 0.1) < temperature_arr_norm) & # Only generate forestation if temperature is over the ice temperature, with some margin
+                  (humidity_arr_norm > 0.5)) # Only generate forestation if humidity is over 0.5
+        
+        # Lower lightness to create forestation effect
+        hsl = rgb_to_hsl(color[forest])
+        hsl[:, 2] = hsl[:, 2] / 2
+        color[forest] = hsl_to_rgb(hsl)
+    
+    # Cloud generation
+    # Generate clouds where the cloud noise map value is lower than the cloud fraction that was randomized, blend pixel colors with white to create cloud effect
+    cloud = cloud_arr_norm < cloud_amt
+    color[cloud] = blend_to_white(color[cloud], 1 - cloud_arr_norm[cloud, None])
+    
+    # Generate atmospheric glow from increasing view angles to the side of the planet
+    # Produce normalized distance of the pixels from the center of the planet
+    d_norm = d/planet_radius_px
+    
+    # Create gradient variable that is 1 in the center and 0 at the edges of the planet
+    grad = (1-d_norm**2)**0.5
+    
+    # Apply atmospheric tint
+    # Find atmosphere color at the pixels
+    atm_color_curr = np.array(atm_color) + (255 - np.array(atm_color)) * grad[:, None]
+    
+    # Blend atmosphere color with pixel colors using blend mode Multiply to create atmospheric glow effect
+    color = blend_multiply(color, atm_color_curr)
+    
+    # Apply atmosphere glow on texture (to replicate bight light scattering when looking through the atmosphere at a shallow angle)
+    hsl = rgb_to_hsl(color)
+    hsl[:, 2] = hsl[:, 2] + (100 - hsl[:, 2]) * (1 - grad)**1.5 * 0.75
+    hsl[:, 1] = hsl[:, 1] * grad
+    color = hsl_to_rgb(hsl)
+    
+    # Write colors of the pixels contained in the planet into the tile and make them opaque
+    tile_rgb = np.zeros([tile[1] - tile[0], planet_radius_px * 2, 3], dtype=np.uint8)
+    tile_alpha = np.zeros([tile[1] - tile[0], planet_radius_px * 2], dtype=np.uint8)
+    tile_rgb[i - tile[0], j] = np.clip(color, 0, 255).astype(np.uint8)
+    tile_alpha[i - tile[0], j] = 255
+    
+    return tile_rgb, tile_alpha
+    
+    
+    
 def colorspace_3d_linear_interp(e_res, t_res, h_res, base_color, water_color, wl, it, ml, dt):
     """
     Function to build a 3D color space using 3D linear interpolation in an unstructured grid of points
@@ -332,7 +385,7 @@ def colorspace_3d_linear_interp(e_res, t_res, h_res, base_color, water_color, wl
         dt : float - Desert temperature threshold value
     
     Return values:
-        colorspace : [ [ [int, int, int], ... ], ... ] - A 3 dimensional list of color values, dimension 1: elevation, dimension 2: temperature, dimension 3: humidity
+        colorspace : numpy.ndarray (e_res,t_res,h_res,3) - A 3 dimensional array of RGB color values, dimension 1: elevation, dimension 2: temperature, dimension 3: humidity
         
     Comments:
         This function has a fixed unstructured grid of elevation/temperature/humidity points defined where each of the points has an associated color value
@@ -420,115 +473,42 @@ def colorspace_3d_linear_interp(e_res, t_res, h_res, base_color, water_color, wl
     ]
     
     
-    # Build list for each RGB value of the water color vertices
-    tmp_water = []
-    water_r = []
-    water_g = []
-    water_b = []
-    for point_index in range(len(water_points)):
-        tmp_water.append(water_points[point_index][0])
-        water_r.append(water_points[point_index][1][0])
-        water_g.append(water_points[point_index][1][1])
-        water_b.append(water_points[point_index][1][2])
-    
-    # Build list for each RGB value of the land color vertices  
-    tmp_land = []
-    land_r = []
-    land_g = []
-    land_b = []
-    for point_index in range(len(land_points)):
-        tmp_land.append(land_points[point_index][0])
-        land_r.append(land_points[point_index][1][0])
-        land_g.append(land_points[point_index][1][1])
-        land_b.append(land_points[point_index][1][2])
-        
-    # Build list for each RGB value of the arctic color vertices 
-    tmp_arctic = []
-    arctic_r = []
-    arctic_g = []
-    arctic_b = []
-    for point_index in range(len(arctic_points)):
-        tmp_arctic.append(arctic_points[point_index][0])
-        arctic_r.append(arctic_points[point_index][1][0])
-        arctic_g.append(arctic_points[point_index][1][1])
-        arctic_b.append(arctic_points[point_index][1][2])
+    # Normalized elevation, temperature and humidity values of all cells of the color space, dimension 1: elevation, dimension 2: temperature, dimension 3: humidity
+    e_val, t_val, h_val = np.meshgrid(np.arange(e_res) / e_res, np.arange(t_res) / t_res, np.arange(h_res) / h_res, indexing='ij')
+    grid_points = np.stack([e_val, t_val, h_val], axis=-1)
     
-
+    # Assign each cell to one of the water, land and arctic subspaces
+    # If the temperature value is below the ice threshold, use the arctic subspace
+    arctic = t_val < it
     
+    # If the elevation value is below the water level threshold, use the water subspace
+    water = ~arctic & (e_val < wl)
     
-    # Declare color space list
-    colorspace = []
-
-    # Loop through all possible elevation/temperature/humidity combination given with respect to their resolutions
-    # Loop through elevation levels
-    for e in range(e_res):
-        # Add plane for elevation level
-        colorspace.append([])
-        
-        # Normalize elevation value to between 0 and 1
-        e_val = e / e_res
-        
-        # Loop through temperature levels
-        for t in range(t_res):
-            # Add row of values for elevation/temperature combination
-            colorspace[e].append([])
-            
-            # Normalize temperature value to between 0 and 1
-            t_val = t / t_res
-            
-            # Loop through humidity levels
-            for h in range(h_res):
-                # Normalize humididty value to between 0 and 1
-                h_val = h / h_res
-                
-                # interpolate each of the water, land and arctic subspaces
-                
-                # If the temperature value is below the ice threshold, interpolate arctic list and use color values from actic list
-                if t_val < it:
-                    # Interpolate arctic color subspace
-                    r = interp.griddata(tmp_arctic, arctic_r, [e_val, t_val, h_val], method='linear')[0]
-                    g = interp.griddata(tmp_arctic, arctic_g, [e_val, t_val, h_val], method='linear')[0]
-                    b = interp.griddata(tmp_arctic, arctic_b, [e_val, t_val, h_val], method='linear')[0]
-                    
-                # If the elevation value is below the water level threshold, interpolate water list and use color values from water list
-                elif e_val < wl:
-                    # Interpolate water color subspace
-                    r = interp.griddata(tmp_water, water_r, [e_val, t_val, h_val], method='linear')[0]
-                    g = interp.griddata(tmp_water, water_g, [e_val, t_val, h_val], method='linear')[0]
-                    b = interp.griddata(tmp_water, water_b, [e_val, t_val, h_val], method='linear')[0]
-                    
-                    # Apply water color modification to change hue, but only if generating a randomly colored planet
-                    if not water_color == [-1,-1,-1]:
-                        # Blend current native water color with desired water color using luminosity blend mode
-                        color_with_base = blend_luminosity([r,g,b], water_color)
-                        
-                        # Update color values to reflect color blending
-                        r = color_with_base[0]
-                        g = color_with_base[1]
-                        b = color_with_base[2]
-                
-                # For all other cases use the land color subspace
-                else:
-                    # Interpolate land color subspace
-                    r = interp.griddata(tmp_land, land_r, [e_val, t_val, h_val], method='linear')[0]
-                    g = interp.griddata(tmp_land, land_g, [e_val, t_val, h_val], method='linear')[0]
-                    b = interp.griddata(tmp_land, land_b, [e_val, t_val, h_val], method='linear')[0]
-                    
-                    # Apply base color modification to change hue, but only if generating a randomly colored planet
-                    if not base_color == [-1,-1,-1]:
-                        # Blend current native land color with desired base color using soft light blend mode
-                        color_with_base = blend_softlight([r,g,b], base_color)
-                        
-                        # Update color values to reflect color blending
-                        r = color_with_base[0]
-                        g = color_with_base[1]
-                        b = color_with_base[2]
-                
-                # Add generated/interpolated color to color space
-                colorspace[e][t].append([int(r),int(g),int(b)])
+    # For all other cases use the land subspace
+    land = ~arctic & ~water
+    
+    # Declare color space array
+    colorspace = np.zeros([e_res, t_res, h_res, 3])
+    
+    # Interpolate each subspace for all of its cells at once, the triangulation of the vertices is built once per subspace and interpolates all RGB values together
+    # Subspaces without cells are skipped, their vertices may be degenerate (for example arctic vertices if the ice temperature is 0)
+    for cells, points in [(arctic, arctic_points), (water, water_points), (land, land_points)]:
+        if cells.any():
+            interpolator = interp.LinearNDInterpolator([point[0] for point in points], [point[1] for point in points])
+            colorspace[cells] = interpolator(grid_points[cells])
+    
+    # Apply water color modification to change hue, but only if generating a randomly colored planet
+    if not water_color == [-1,-1,-1] and water.any():
+        # Blend native water colors with desired water color using luminosity blend mode
+        colorspace[water] = blend_luminosity(colorspace[water], water_color)
+    
+    # Apply base color modification to change hue, but only if generating a randomly colored planet
+    if not base_color == [-1,-1,-1] and land.any():
+        # Blend native land colors with desired base color using soft light blend mode
+        colorspace[land] = blend_softlight(colorspace[land], base_color)
     
     # Return color space
-    return colorspace
+    return colorspace.astype(int)
     
     
     
@@ -537,7 +517,7 @@ def show_grad(colorspace, h):
     Function for debugging and tweaking colorspace parameters
     
     Arguments:
-        colorspace : [ [ [int, int, int], ... ], ... ] - A color space as produced by colorspace_3d_linear_interp()
+        colorspace : numpy.ndarray (e_res,t_res,h_res,3) - A color space as produced by colorspace_3d_linear_interp()
         h : int - Humidity value at which to slice the color space and display values in 2D plot
     """
 
@@ -570,112 +550,152 @@ def show_grad(colorspace, h):
 
 def blend_multiply(color1, color2):
     """
-    Function to blend two colors using the Multiply blend mode
+    Function to blend colors using the Multiply blend mode
     
     Arugments:
-        color1 : [float, float, float] - First color as a list of the 3 RGB values (0-255)
-        color2 : [float, float, float] - Second color as a list of the 3 RGB values (0-255)
+        color1 : numpy.ndarray (...,3) - First colors as arrays of the 3 RGB values (0-255)
+        color2 : numpy.ndarray (...,3) - Second colors as arrays of the 3 RGB values (0-255)
         
     Return values:
-        color : [int, int, int] - Blended color as list of the 3 RGB values (0-255)
+        color : numpy.ndarray (...,3) - Blended colors as arrays of the 3 RGB values (integers from 0-255)
     """
     
-    # Unpack and normalize RGB values
-    r1 = color1[0] / 255
-    g1 = color1[1] / 255
-    b1 = color1[2] / 255
-    r2 = color2[0] / 255
-    g2 = color2[1] / 255
-    b2 = color2[2] / 255
+    # Normalize RGB values
+    c1 = np.asarray(color1, dtype=float) / 255
+    c2 = np.asarray(color2, dtype=float) / 255
     
     # Perform Multiply blending
-    r = r1 * r2
-    g = g1 * g2
-    b = b1 * b2
+    c = c1 * c2
     
-    # Return blended color as list of RGB values (integers from 0-255)
-    return [int(r*255),int(g*255),int(b*255)]
+    # Return blended colors as RGB values (integers from 0-255)
+    return (c*255).astype(int)
 
 def blend_softlight(color1, color2):
     """
-    Function to blend two colors using the Soft Light blend mode
+    Function to blend colors using the Soft Light blend mode
     
     Arugments:
-        color1 : [float, float, float] - First color as a list of the 3 RGB values (0-255)
-        color2 : [float, float, float] - Second color as a list of the 3 RGB values (0-255)
+        color1 : numpy.ndarray (...,3) - First colors as arrays of the 3 RGB values (0-255)
+        color2 : numpy.ndarray (...,3) - Second colors as arrays of the 3 RGB values (0-255)
      
     Return values:
-        color : [int, int, int] - Blended color as list of the 3 RGB values (0-255)
+        color : numpy.ndarray (...,3) - Blended colors as arrays of the 3 RGB values (integers from 0-255)
     """
     
-    # Unpack and normalize RGB values
-    r1 = color1[0] / 255
-    g1 = color1[1] / 255
-    b1 = color1[2] / 255
-    r2 = color2[0] / 255
-    g2 = color2[1] / 255
-    b2 = color2[2] / 255
+    # Normalize RGB values
+    c1 = np.asarray(color1, dtype=float) / 255
+    c2 = np.asarray(color2, dtype=float) / 255
     
     # Perform Soft Light blending
-    r = ((1-2*r1)*r2**2+2*r1*r2)
-    g = ((1-2*g1)*g2**2+2*g1*g2)
-    b = ((1-2*b1)*b2**2+2*b1*b2)
+    c = ((1-2*c1)*c2**2+2*c1*c2)
     
-    # Return blended color as list of RGB values (integers from 0-255)
-    return [int(r*255),int(g*255),int(b*255)]
+    # Return blended colors as RGB values (integers from 0-255)
+    return (c*255).astype(int)
 
 def blend_luminosity(color1, color2):
     """
-    Function to blend two colors using the Luminosity blend mode
+    Function to blend colors using the Luminosity blend mode
     
     Arugments:
-        color1 : [float, float, float] - First color as a list of the 3 RGB values (0-255)
-        color2 : [float, float, float] - Second color as a list of the 3 RGB values (0-255)
+        color1 : numpy.ndarray (...,3) - First colors as arrays of the 3 RGB values (0-255)
+        color2 : numpy.ndarray (...,3) - Second colors as arrays of the 3 RGB values (0-255)
      
     Return values:
-        color : [int, int, int] - Blended color as list of the 3 RGB values (0-255)
+        color : numpy.ndarray (...,3) - Blended colors as arrays of the 3 RGB values (integers from 0-255)
     """
     
-    # Create pygame.Color objects from color values in order to use HSLA conversion functions
-    c1 = pygame.Color(int(color1[0]), int(color1[1]), int(color1[2]))
-    c2 = pygame.Color(int(color2[0]), int(color2[1]), int(color2[2]))
-    
-    # Get HSLA values
-    h1, s1, l1, a1 = c1.hsla
-    h2, s2, l2, a2 = c2.hsla
+    # Get HSL values, colors are truncated to integers first like pygame.Color does
+    hsl1 = rgb_to_hsl(np.asarray(color1).astype(int))
+    hsl2 = rgb_to_hsl(np.asarray(color2).astype(int))
     
-    # Perform Luminosity blending
-    h = h2
-    s = s2
-    l = l1
+    # Perform Luminosity blending, hue and saturation of the second colors with lightness of the first colors
+    hsl = hsl2 * np.ones_like(hsl1)
+    hsl[..., 2] = hsl1[..., 2]
     
-    # Update first color to blended color
-    c1.hsla = h, s, l, a1
-    
-    # Return blended color as list of RGB values (integers from 0-255)
-    return [c1.r,c1.g,c1.b]
+    # Return blended colors as RGB values (integers from 0-255)
+    return hsl_to_rgb(hsl).astype(int)
 
 def blend_to_white(color1, alpha):
     """
-    Function to blend one color to white using alpha blending
+    Function to blend colors to white using alpha blending
     
     Arugments:
-        color1 : [float, float, float] - First color as a list of the 3 RGB values (0-255)
-        alpha : float - Alpha value from 0 to 1
+        color1 : numpy.ndarray (...,3) - Colors as arrays of the 3 RGB values (0-255)
+        alpha : numpy.ndarray (...,1) - Alpha values from 0 to 1
      
     Return values:
-        color : [int, int, int] - Blended color as list of the 3 RGB values (0-255)
+        color : numpy.ndarray (...,3) - Blended colors as arrays of the 3 RGB values (integers from 0-255)
     """
     
-    # Get RGB values from color
-    r1 = color1[0]
-    g1 = color1[1]
-    b1 = color1[2]
+    # Get RGB values from colors
+    c1 = np.asarray(color1, dtype=float)
     
     # Perform alpha blending with white
-    r = r1 + (255-r1) * alpha
-    g = g1 + (255-g1) * alpha
-    b = b1 + (255-b1) * alpha
+    c = c1 + (255-c1) * alpha
+    
+    # Return blended colors as RGB values (integers from 0-255)
+    return c.astype(int)
+
+def rgb_to_hsl(color):
+    """
+    Function to convert colors from RGB to HSL, same value ranges as pygame.Color.hsla
+    
+    Arugments:
+        color : numpy.ndarray (...,3) - Colors as arrays of the 3 RGB values (0-255)
+     
+    Return values:
+        hsl : numpy.ndarray (...,3) - Colors as arrays of hue (0-360), saturation (0-100) and lightness (0-100)
+    """
+    
+    # Normalize RGB values
+    c = np.asarray(color, dtype=float) / 255
+    r = c[..., 0]
+    g = c[..., 1]
+    b = c[..., 2]
+    
+    # Find largest and smallest channel of every color
+    c_max = c.max(axis=-1)
+    c_min = c.min(axis=-1)
+    delta = c_max - c_min
+    
+    # Lightness is the mean of largest and smallest channel
+    l = (c_max + c_min) / 2
+    
+    # Saturation and hue are 0 for gray colors (no difference between the channels), avoid division by zero for them
+    gray = delta == 0
+    delta_safe = np.where(gray, 1, delta)
+    s = np.where(gray, 0, delta_safe / np.maximum(1 - np.abs(2*l - 1), 1e-12))
+    
+    # Hue depends on which of the channels is the largest
+    h = np.where(c_max == r, ((g - b) / delta_safe) % 6,
+        np.where(c_max == g, (b - r) / delta_safe + 2,
+                             (r - g) / delta_safe + 4)) * 60
+    h = np.where(gray, 0, h)
+    
+    # Return HSL values in pygame's value ranges
+    return np.stack([h, s*100, l*100], axis=-1)
+
+def hsl_to_rgb(hsl):
+    """
+    Function to convert colors from HSL to RGB, same value ranges as pygame.Color.hsla
+    
+    Arugments:
+        hsl : numpy.ndarray (...,3) - Colors as arrays of hue (0-360), saturation (0-100) and lightness (0-100)
+     
+    Return values:
+        color : numpy.ndarray (...,3) - Colors as arrays of the 3 RGB values (0-255)
+    """
+    
+    # Normalize HSL values
+    hsl = np.asarray(hsl, dtype=float)
+    h = hsl[..., 0, None] % 360
+    s = hsl[..., 1, None] / 100
+    l = hsl[..., 2, None] / 100
+    
+    # Evaluate the piecewise linear channel functions of the hue for red, green and blue at once
+    k = (np.array([0, 8, 4]) + h / 30) % 12
+    a = s * np.minimum(l, 1 - l)
+    c = l - a * np.clip(np.minimum(k - 3, 9 - k), -1, 1)
     
-    # Return blended color as list of RGB values (integers from 0-255)
-    return [int(r),int(g),int(b)]
\ No newline at end of file
+    # Return RGB values (0-255)
+    return c * 255